@@ -0,0 +1,49 @@
+# Grasshopper component for the strand growth core.
+# The repository folder must be on Rhino's Python module search path.
+#
+# Inputs:  boundary, seed, reset, preset (optional, default 'tunnel_chain'),
+#          layout (optional .json to continue), clusters (optional), save (optional .json),
+#          checkpoint (optional path: saved after every cluster, resumed from when it
+#          holds an unfinished run of the same preset, seed, boundary, layout and clusters)
+# Outputs: living, prod, gather, cisterns, tunnels, living_holes, prod_holes, gather_holes, lights, drainage
+#
+# Only the Rhino-free core is imported up front; the RhinoCommon adapter is
+# loaded once curves are actually needed.
+import strand
+from strand.presets import preset as load_preset
+
+EMPTY = ([], [], [], [], [], [], [], [], [], [])
+
+def main():
+    if not 'reset' in globals() or not reset: return EMPTY
+    if not 'boundary' in globals() or not boundary: return EMPTY
+
+    from strand import geometry
+    site = geometry.boundary_from_input(boundary)
+    if site is None: return EMPTY
+
+    name = preset if 'preset' in globals() and preset else 'tunnel_chain'
+    # Keep this component's output layout whatever the preset
+    cfg = load_preset(name, OUTPUTS=strand.Config().OUTPUTS)
+    run_seed = int(seed) if 'seed' in globals() and seed is not None else 0
+
+    base = strand.load_layout(layout) if 'layout' in globals() and layout else None
+    n = None
+    if base is not None: n = int(clusters) if 'clusters' in globals() and clusters else 1
+
+    ckpt = checkpoint if 'checkpoint' in globals() and checkpoint else None
+    if ckpt and strand.checkpoint_matches(ckpt, cfg, run_seed, site, base, n):
+        # Pick up an interrupted run of this very solve where its last cluster
+        # ended; a stale checkpoint is overwritten by the new run instead
+        town = strand.resume(ckpt)
+    elif base is not None:
+        town = base
+        strand.extend(town, site, n, cfg, run_seed, ckpt)
+    else:
+        town = strand.grow(site, cfg, run_seed, ckpt)
+
+    if 'save' in globals() and save: strand.save_layout(town, save)
+    return geometry.component_outputs(town, cfg)
+
+# Execute
+living, prod, gather, cisterns, tunnels, living_holes, prod_holes, gather_holes, lights, drainage = main()
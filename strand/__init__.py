@@ -0,0 +1,16 @@
+"""
+Strand - headless growth core for the subterranean settlement scripts.
+
+Pure Python (no Rhino / .NET imports) so it runs inside Grasshopper's
+IronPython as well as in a plain CPython process.
+"""
+from strand.config import Config
+from strand.blocks import Block
+from strand.boundary import Boundary, site
+from strand.occupancy import OccupancyGrid
+from strand.settlement import Settlement
+from strand.growth import Growth, grow, extend
+from strand.layout import save_layout, load_layout
+from strand.packed import write_packed, open_packed, load_packed
+from strand.checkpoint import save_checkpoint, load_checkpoint, checkpoint_matches, resume
+from strand.presets import PRESETS, preset
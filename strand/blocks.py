@@ -0,0 +1,33 @@
+"""
+Block records on the integer grid. Geometry (curves) is built elsewhere;
+a Block only knows its cells.
+"""
+
+# Stable type codes for compact storage (order must never change)
+BLOCK_TYPES = ('prod', 'living', 'gather', 'cistern', 'tunnel', 'void')
+TYPE_CODES = dict((t, i) for i, t in enumerate(BLOCK_TYPES))
+
+
+class Block:
+    def __init__(self, gx, gy, gw, gh, b_type, cluster_id, attach_side=None, parent=None):
+        self.gx = int(gx); self.gy = int(gy)
+        self.gw = int(gw); self.gh = int(gh)
+        self.type = b_type
+        self.cluster_id = cluster_id
+        self.attach_side = attach_side
+        self.parent = parent
+        self.index = -1  # Position in Settlement.blocks once placed
+
+        self.min_x = self.gx; self.max_x = self.gx + self.gw
+        self.min_y = self.gy; self.max_y = self.gy + self.gh
+
+    def cells(self):
+        return self.gw * self.gh
+
+    def __repr__(self):
+        return "Block(%d, %d, %d, %d, %r, %r)" % (self.gx, self.gy, self.gw, self.gh, self.type, self.cluster_id)
+
+
+def void_block(min_x, min_y, max_x, max_y):
+    # Inner boundary loops occupy cells but are never output
+    return Block(min_x, min_y, max_x - min_x, max_y - min_y, 'void', -1)
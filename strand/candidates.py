@@ -0,0 +1,108 @@
+"""
+Candidate evaluation for one placement attempt.
+
+Each parent's anchors are expanded into plain coordinate tuples and
+screened as a batch: duplicates are dropped (neighbouring parents often
+yield the same rect), the boundary test is a lookup on the half-cell centre
+lattice, and the footprint test runs on raw coordinates. A Block is only
+built for the survivor, picked by its index in the batch. Parents and
+anchors are visited in the same order as the serial loop, so the random
+stream and the chosen candidate are unchanged. Tight anchors whose corner
+runs are already known to be blocked (see strand.extents) are skipped
+before any test. With INTERIOR_BIAS the shuffled batch is tried deepest
+inside the boundary first. With CISTERN_RESERVE a hub candidate that
+passes also needs a free cistern slot beside it (Growth.cistern_slot).
+"""
+from strand.strategies import anchors_tight
+
+
+def first_fit(engine, u_type, gw, gh, parents, anchor_fn):
+    """(parent, gx, gy, side) of the first valid candidate, or None."""
+    cfg = engine.cfg; rng = engine.rng
+    occ = engine.settlement.occupancy; lattice = engine.lattice
+    cid = engine.current_cluster_id
+    cluster_gap = cfg.CLUSTER_GAP; cistern_gap = cfg.CISTERN_BUFFER
+    exempt_parent = cfg.GAP_PARENT_EXEMPT
+    extents = engine.extents if anchor_fn is anchors_tight else None
+    depth = engine.depth if cfg.INTERIOR_BIAS else None
+    reserve = engine.cistern_check(u_type)
+    trace = engine.trace
+    seen = set()
+
+    for parent in parents:
+        anchors = anchor_fn(parent, gw, gh, cfg)
+        if extents is not None:
+            # Blank out pruned anchors in place so the shuffle draws the same stream
+            open_ = extents.open_anchors(parent, gw, gh)
+            if open_ is not None and not all(open_):
+                if trace is not None:
+                    for a, k in zip(anchors, open_):
+                        if not k: engine.reject(u_type, parent, a[0], a[1], gw, gh, a[2], 'pruned')
+                anchors = [a if k else None for a, k in zip(anchors, open_)]
+        rng.shuffle(anchors)
+
+        # Screen the batch: unseen, not pruned and centre inside the boundary
+        batch = []
+        for a in anchors:
+            if a is None: continue
+            key = (a[0], a[1])
+            if key in seen: continue
+            seen.add(key)
+            if lattice.contains(2 * a[0] + gw, 2 * a[1] + gh): batch.append(a)
+            elif trace is not None: engine.reject(u_type, parent, a[0], a[1], gw, gh, a[2], 'outside')
+        if not batch: continue
+        if depth is not None: batch.sort(key=lambda a: -depth(a[0] + gw // 2, a[1] + gh // 2))
+
+        exempt = parent if exempt_parent else None
+        for i in range(len(batch)):
+            nx, ny, side = batch[i]
+            if occ.collides_rect(nx, ny, nx + gw, ny + gh, u_type, cid, cluster_gap, cistern_gap, exempt):
+                # With a parent exemption the same rect may pass for another parent
+                if exempt is not None: seen.discard((nx, ny))
+                if trace is not None: engine.reject(u_type, parent, nx, ny, gw, gh, side, 'collides')
+                continue
+            if reserve is not None and reserve(nx, ny, gw, gh) is None:
+                if trace is not None: engine.reject(u_type, parent, nx, ny, gw, gh, side, 'no_cistern')
+                continue
+            return parent, nx, ny, side
+    return None
+
+
+def first_tunnel_fit(engine, gw, gh, parents, pair_fn):
+    """(parent, tunnel_rect, hub_origin) of the first valid tunnel + hub pair, or None."""
+    cfg = engine.cfg; rng = engine.rng
+    occ = engine.settlement.occupancy; lattice = engine.lattice
+    cid = engine.current_cluster_id
+    cluster_gap = cfg.CLUSTER_GAP; cistern_gap = cfg.CISTERN_BUFFER
+    gap = cfg.TUNNEL_WIDTH_GRID
+    reserve = engine.cistern_check('gather')
+    trace = engine.trace
+    seen = set()
+
+    for parent in parents:
+        pairs = pair_fn(parent, gw, gh, gap)
+        rng.shuffle(pairs)
+        if cfg.INTERIOR_BIAS: pairs.sort(key=lambda p: -engine.depth(p[1][0] + gw // 2, p[1][1] + gh // 2))
+        exempt = parent if cfg.GAP_PARENT_EXEMPT else None
+        for (t, h) in pairs:
+            key = (t, h)
+            if key in seen: continue
+            seen.add(key)
+            hx, hy = h
+            if not lattice.contains(2 * hx + gw, 2 * hy + gh):
+                if trace is not None: engine.reject('gather', parent, hx, hy, gw, gh, None, 'outside')
+                continue
+            tx, ty, tw, th = t
+            if occ.collides_rect(tx, ty, tx + tw, ty + th, 'tunnel', cid, cluster_gap, cistern_gap, exempt):
+                if exempt is not None: seen.discard(key)
+                if trace is not None: engine.reject('tunnel', parent, tx, ty, tw, th, None, 'collides')
+                continue
+            # The hub's parent is the (not yet placed) tunnel, so no exemption
+            if occ.collides_rect(hx, hy, hx + gw, hy + gh, 'gather', cid, cluster_gap, cistern_gap, None):
+                if trace is not None: engine.reject('gather', parent, hx, hy, gw, gh, None, 'collides')
+                continue
+            if reserve is not None and reserve(hx, hy, gw, gh, t) is None:
+                if trace is not None: engine.reject('gather', parent, hx, hy, gw, gh, None, 'no_cistern')
+                continue
+            return parent, t, h
+    return None
@@ -0,0 +1,257 @@
+"""
+Checkpoint and resume for long growth runs.
+
+A checkpoint is taken between clusters (see Growth.run's checkpoint hook)
+and holds everything the engine reads later: the layout, the exact built
+area, the config, the boundary loops, the run's targets, the cluster
+state (build_queue, current hub / blocks / spine / prods, cluster id,
+cistern retry), the fail counters, the Mersenne Twister state and the tip
+index buckets in their current order. Derived caches (occupancy, gap
+layers, free extents, boundary lattice) are rebuilt, and none of them
+changes which candidate wins, so a resumed run continues bit-identically.
+
+A checkpoint is two files. The blocks go to `<path>.blocks`, one JSON row
+per line ([gx, gy, gw, gh, type, cluster_id, attach_side, parent_index],
+as in strand.layout), and are only ever appended: a rollback only removes
+the cluster begun after the last save, so the saved rows stay a prefix of
+the layout. Everything else is a small JSON state file at `path`, written
+next to it and moved over it on every save. A save therefore costs the
+blocks placed since the last one, not the whole layout.
+
+JSON state, version 2:
+    {"version": 2, "blocks": 1234,
+     "layout": {"grid_unit": 3.75, "next_cluster_id": 12, "tunnel_tips": [...]},
+     "area": 1234.5, "config": {...},
+     "boundary": {"outer": [[x, y], ...], "voids": [...]},
+     "run": {"target_area": ..., "max_clusters": ..., "seed": 7},
+     "key": {"config": digest, "seed": 7, "boundary": geometry hash,
+             "mode": "grow" | "extend", "clusters": n, "base": [count, hash]},
+     "engine": {"build_queue": [...], "current_hub": block_index, ...},
+     "rng": [version, [state...], gauss_next],
+     "tips": [[face, extent, [[block_index, face], ...]], ...]}
+
+Rows past "blocks" (a crash between the two writes) are ignored on load.
+A finished run deletes both files, and checkpoint_matches() tells whether
+a checkpoint belongs to a given config, seed and boundary, and to the same
+mode: a fresh grow(), or an extend() by the same number of clusters of the
+same base layout (block count plus a hash of its block records).
+"""
+import os
+
+from strand.boundary import Boundary
+from strand.config import Config
+from strand.growth import Growth
+from strand.layout import LAYOUT_VERSION, settlement_from_dict
+
+CHECKPOINT_VERSION = 2
+
+
+def _index(block):
+    return block.index if block is not None else -1
+
+
+def _row(b):
+    return [b.gx, b.gy, b.gw, b.gh, b.type, b.cluster_id, b.attach_side, _index(b.parent)]
+
+
+def blocks_path(path):
+    return path + '.blocks'
+
+
+def layout_digest(blocks):
+    """[block count, hash of the block records] of the layout a run started from."""
+    import hashlib, json
+    h = hashlib.sha1()
+    for b in blocks: h.update(json.dumps(_row(b), separators=(',', ':')).encode('ascii'))
+    return [len(blocks), h.hexdigest()]
+
+
+def run_key(config, seed, boundary, base=None, clusters=None):
+    """
+    What a checkpoint must match to be resumed: config digest, seed,
+    geometry hash, and for an extend() run (clusters not None) the number
+    of clusters and the digest of the base blocks.
+    """
+    return {'config': config.digest(), 'seed': int(seed), 'boundary': boundary.key(),
+            'mode': 'grow' if clusters is None else 'extend', 'clusters': clusters,
+            'base': layout_digest(base or [])}
+
+
+def engine_key(engine):
+    return run_key(engine.cfg, engine.seed, engine.boundary,
+                   engine.settlement.blocks[:engine.start_index], engine.max_clusters)
+
+
+def checkpoint_to_dict(engine, key=None):
+    """
+    The state file of engine's checkpoint; the block rows are saved apart.
+    key is engine_key(engine), passed in when already known.
+    """
+    s = engine.settlement
+    state, internal, gauss = engine.rng.getstate()
+    return {
+        'version': CHECKPOINT_VERSION,
+        'blocks': len(s.blocks),
+        'layout': {'grid_unit': s.grid_unit, 'next_cluster_id': s.next_cluster_id,
+                   'tunnel_tips': [t.index for t in s.tunnel_tips]},
+        'area': s.area,
+        'config': engine.cfg.to_dict(),
+        'boundary': {'outer': engine.boundary.outer, 'voids': engine.boundary.voids},
+        'run': {'target_area': engine.target_area, 'max_clusters': engine.max_clusters, 'seed': engine.seed},
+        'key': key or engine_key(engine),
+        'engine': {
+            'build_queue': list(engine.build_queue),
+            'current_hub': _index(engine.current_hub),
+            'current_cluster_id': engine.current_cluster_id,
+            'current_blocks': [b.index for b in engine.current_blocks],
+            'current_spine': [b.index for b in engine.current_spine],
+            'current_prods': [b.index for b in engine.current_prods],
+            'cistern_retry': engine.cistern_retry,
+            'fails': engine.fails,
+            'total_fails': engine.total_fails,
+            'clusters_started': engine.clusters_started,
+            'start_index': engine.start_index,
+        },
+        'rng': [state, list(internal), gauss],
+        'tips': [[key[0], key[1], [[tip.index, face] for tip, face in bucket]]
+                 for key, bucket in engine.tips.buckets.items()],
+    }
+
+
+def checkpoint_from_dict(data, rows):
+    """The Growth engine saved in data and rows, ready for engine.run(**engine.run_args())."""
+    if data.get('version') != CHECKPOINT_VERSION:
+        raise ValueError("Unsupported checkpoint version: %r" % data.get('version'))
+    if len(rows) < data['blocks']:
+        raise ValueError("Checkpoint holds %d blocks, the block file only %d" % (data['blocks'], len(rows)))
+
+    layout = dict(data['layout'], version=LAYOUT_VERSION, blocks=rows[:data['blocks']])
+    s = settlement_from_dict(layout)
+    # The running sum is kept exactly; re-adding the blocks may round differently
+    s.area = data['area']
+    site = Boundary(data['boundary']['outer'], data['boundary']['voids'])
+    g = Growth(site, s, Config(**data['config']), data['run']['seed'])
+    blocks = s.blocks
+
+    state, internal, gauss = data['rng']
+    g.rng.setstate((state, tuple(internal), gauss))
+
+    e = data['engine']
+    g.build_queue = list(e['build_queue'])
+    g.current_hub = blocks[e['current_hub']] if e['current_hub'] >= 0 else None
+    g.current_cluster_id = e['current_cluster_id']
+    g.current_blocks = [blocks[i] for i in e['current_blocks']]
+    g.current_spine = [blocks[i] for i in e['current_spine']]
+    g.current_prods = [blocks[i] for i in e['current_prods']]
+    g.cistern_retry = e['cistern_retry']
+    g.fails = e['fails']
+    g.total_fails = e['total_fails']
+    g.clusters_started = e['clusters_started']
+    g.start_index = e['start_index']
+    g.target_area = data['run']['target_area']
+    g.max_clusters = data['run']['max_clusters']
+
+    # Bucket order decides which tip a random pick lands on
+    tips = g.tips
+    tips.buckets = {}; tips.where = {}
+    for face, ext, bucket in data['tips']:
+        key = (face, ext)
+        entries = tips.buckets[key] = []
+        for i, f in bucket:
+            tips.where[(id(blocks[i]), f)] = (key, len(entries))
+            entries.append((blocks[i], f))
+    return g
+
+
+def _replace(path, text):
+    # Written next to the target and moved over it, so a crash mid-write
+    # leaves the previous state intact
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+    if hasattr(os, 'replace'): os.replace(tmp, path)
+    else:
+        if os.path.exists(path): os.remove(path)
+        os.rename(tmp, path)
+
+
+def _read_state(path):
+    import json
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(engine, path):
+    """Write a complete checkpoint of engine to path (and path.blocks)."""
+    Checkpointer(path).save(engine)
+
+
+def load_checkpoint(path):
+    import json
+    data = _read_state(path)
+    rows = []
+    with open(blocks_path(path)) as f:
+        for line in f:
+            if len(rows) == data['blocks']: break
+            rows.append(json.loads(line))
+    return checkpoint_from_dict(data, rows)
+
+
+def checkpoint_matches(path, config, seed, boundary, base=None, clusters=None):
+    """
+    True when path holds an unfinished run of this config, seed and
+    boundary: a grow(), or with clusters given an extend() of the base
+    settlement by that many clusters.
+    """
+    if not path or not os.path.exists(path) or not os.path.exists(blocks_path(path)): return False
+    try: data = _read_state(path)
+    except ValueError: return False
+    key = run_key(config, seed, boundary, base.blocks if base is not None else None, clusters)
+    return data.get('version') == CHECKPOINT_VERSION and data.get('key') == key
+
+
+def remove_checkpoint(path):
+    for p in (path, blocks_path(path)):
+        if os.path.exists(p): os.remove(p)
+
+
+class Checkpointer:
+    """
+    Growth.run checkpoint hook: saves to path every `every` clusters and
+    removes the checkpoint once the run finishes. Its first save writes
+    every block; later saves only append the new ones.
+    """
+    def __init__(self, path, every=1):
+        self.path = path
+        self.every = max(1, int(every))
+        self.written = None   # Rows in the block file, None before the first save
+        self.key = None       # Run key, fixed for the whole run
+
+    def __call__(self, engine):
+        if engine.clusters_started % self.every == 0: self.save(engine)
+
+    def save(self, engine):
+        import json
+        blocks = engine.settlement.blocks
+        fresh = self.written is None or self.written > len(blocks)
+        if fresh: self.key = engine_key(engine)
+        start = 0 if fresh else self.written
+        with open(blocks_path(self.path), 'w' if fresh else 'a') as f:
+            f.write(''.join(json.dumps(_row(b), separators=(',', ':')) + '\n' for b in blocks[start:]))
+        self.written = len(blocks)
+        _replace(self.path, json.dumps(checkpoint_to_dict(engine, self.key), separators=(',', ':')))
+
+    def finish(self, engine):
+        remove_checkpoint(self.path)
+        self.written = None; self.key = None
+
+
+def resume(path, every=1):
+    """
+    Continue the run saved at path to its original targets, still
+    checkpointing to path, which is removed when the run completes.
+    Returns the settlement.
+    """
+    g = load_checkpoint(path)
+    g.run(checkpoint=Checkpointer(path, every), **g.run_args())
+    return g.settlement
@@ -0,0 +1,110 @@
+"""
+Growth settings. The attribute names mirror the module constants of the
+Rhino scripts so a script's configuration block maps 1:1 onto a Config.
+Strategy settings name entries in the strand.strategies registries; the
+defaults are the tunnel-chained growth of temp,py, failure rules included
+(see strand.presets for the rest).
+"""
+import copy
+
+# --- CONFIGURATION ---
+GRID_UNIT = 3.75
+HOLE_RATIO = 0.25
+DENSITY_LIMIT = 0.90
+
+# --- DRAINAGE CONFIGURATION ---
+DRAINAGE_WIDTH = 2.0
+# The tunnel is exactly 1 grid unit wide (3.75m)
+TUNNEL_WIDTH_GRID = 1
+
+# --- LIGHTING CONFIGURATION ---
+LIGHT_DIAMETER = 0.5
+LIGHT_SPACING = 1.875
+LIGHT_TYPES = ('prod', 'living', 'gather')
+
+# --- UNIT SETTINGS ---
+AREAS = {
+    'gather': (800, 1050),
+    'living': (300, 450),
+    'prod': (30, 200),
+    'cistern': (100, 320)
+}
+
+# Used by the 'ratio' queue: prod count follows the cluster's size
+UNIT_RATIOS = {'gather': 1, 'living': 3, 'prod': 12}
+
+# --- CLUSTER SETTINGS ---
+LIVING_MIN = 3
+LIVING_MAX = 5
+PROD_MIN = 5
+PROD_MAX = 12
+CLUSTER_CISTERN = True   # One cistern per cluster, right after the hub
+
+# --- GAP RULES (cells) ---
+CLUSTER_GAP = 0          # Road between different clusters
+CISTERN_BUFFER = 1       # Cisterns cannot touch other cisterns
+GAP_PARENT_EXEMPT = False  # A block may touch its own parent across clusters
+
+# --- OCCUPANCY (see settlement.OCCUPANCY) ---
+OCCUPANCY = 'cells'      # 'cells' (2D), 'rows' (2D, bit rows), 'tiles' (2D, packed) or 'voxels' (stacked levels)
+LEVEL_HEIGHT = 3.0       # m per voxel level; level 0 is the overburden
+DEPTHS = {'prod': (1, 2), 'living': (1, 2), 'gather': (1, 2), 'tunnel': (1, 2),
+          'cistern': (1, 3), 'void': (0, 3)}  # [top, bottom) levels per type
+CONNECTOR_TYPES = ('living', 'gather')  # Own a lightcore / chimney shaft to the surface
+
+# --- STRATEGIES (see strand.strategies) ---
+QUEUE = 'range'          # Cluster queue composition
+PARENTS = 'spine'        # Parent pool + anchor policy
+TUNNELS = 'chain'        # Hub tunnel insertion (None = no tunnels)
+LIVING_FAIL = None       # What a failed living unit does to the cluster (None = retry it)
+CISTERN_FAIL = None      # 'retry_rollback' = retry 2x2, then drop the cluster
+CISTERN_RESERVE = False  # Only place a hub with room for a CISTERN_RETRY_SIZE cistern beside it
+POST_PROCESS = ()        # Passes run after growth, e.g. ('filler',)
+
+# --- SEEDING (see Growth.place_seed) ---
+SEED_POINT = 'centre'    # 'centre' (bbox centre, deepest cell when that fails) or 'deepest'
+SEED_COUNT = 1           # Seed blocks, spread over the deep interior
+INTERIOR_BIAS = False    # Try parents and anchors deepest inside the boundary first
+
+# --- SEARCH LIMITS ---
+PARENT_SAMPLE = 30       # Parents tried per placement attempt
+START_SAMPLE = 50        # Parents tried when a cluster starts away from the last one
+SKIP_AFTER_FAILS = 50    # Drop the current unit after this many misses
+MAX_FAILS = 300          # Stop after this many consecutive misses
+MAX_TOTAL_FAILS = 100000 # Hard stop to prevent hanging
+SIZE_RETRIES = 0         # Redraws of a unit size no sampled parent has room for (opt-in: changes layouts)
+CISTERN_RETRY_SIZE = (2, 2)
+FILLER_SIZE = (2, 2)
+FILLER_PASSES = 40
+
+# --- GRASSHOPPER OUTPUTS (see geometry.component_outputs) ---
+OUTPUTS = ('living', 'prod', 'gather', 'cisterns', 'tunnels', 'living_holes',
+           'prod_holes', 'gather_holes', 'lights', 'drainage')
+
+_DEFAULTS = dict((k, v) for k, v in globals().items() if k.isupper())
+
+
+class Config:
+    def __init__(self, **overrides):
+        for key, value in _DEFAULTS.items():
+            setattr(self, key, copy.deepcopy(value))
+        self.update(**overrides)
+
+    def update(self, **overrides):
+        for key, value in overrides.items():
+            if key not in _DEFAULTS:
+                raise KeyError("Unknown setting: %s" % key)
+            setattr(self, key, value)
+        return self
+
+    def copy(self, **overrides):
+        return Config(**self.to_dict()).update(**overrides)
+
+    def to_dict(self):
+        return dict((k, copy.deepcopy(getattr(self, k))) for k in _DEFAULTS)
+
+    def digest(self):
+        # Stable hash of every setting, used to tag saved layouts
+        import hashlib, json
+        text = json.dumps(self.to_dict(), sort_keys=True)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
@@ -0,0 +1,118 @@
+"""
+Daylight coverage of the rooms lit by lightcores.
+
+Illuminance is evaluated at the centre of every grid cell of a room
+(GRID_UNIT), not on the LIGHT_SPACING lattice the lightcores sit on, so a
+sweep over the light density changes the lights but never how finely
+coverage is measured. Each light adds SHAFT_LUX times the falloff of its
+distance (ignored once the falloff drops below CUTOFF), and walls stop
+light, so a room only sees its own lightcores. The result depends only on
+the room's size in cells, which repeats across a settlement, so each size
+is computed once and every other block of that size is a lookup.
+"""
+import math
+
+from strand.config import Config
+from strand.lighting import light_centres
+
+SHAFT_LUX = 500.0    # Illuminance right under a lightcore at noon
+LIT_LUX = 300.0      # A point counts as lit from here
+CUTOFF = 0.01        # Relative falloff below which a light is ignored
+ROOM_HEIGHT = 3.0    # Default falloff scale: shaft mouth above the floor
+EVALUATED = ('living', 'gather')
+
+
+# --- FALLOFFS ---
+# (distance m, scale m) -> fraction of SHAFT_LUX
+def falloff_inverse_square(d, scale):
+    # Point source scale metres above the floor: cosine-cubed law
+    return (1.0 + (d / scale) ** 2) ** -1.5
+
+
+def falloff_linear(d, scale):
+    return max(0.0, 1.0 - d / scale)
+
+
+def falloff_gaussian(d, scale):
+    return math.exp(-0.5 * (d / scale) ** 2)
+
+
+FALLOFFS = {'inverse_square': falloff_inverse_square, 'linear': falloff_linear, 'gaussian': falloff_gaussian}
+
+
+class Daylight:
+    def __init__(self, config=None, falloff='inverse_square', scale=ROOM_HEIGHT,
+                 shaft_lux=SHAFT_LUX, lit_lux=LIT_LUX, types=EVALUATED):
+        self.cfg = config or Config()
+        self.shaft_lux = shaft_lux
+        self.lit_lux = lit_lux
+        self.types = types
+        self.falloff = FALLOFFS[falloff]
+        self.scale = scale
+        self._rooms = {}   # (gw, gh) -> (lux list, lit fraction, mean lux)
+
+    def _room(self, block):
+        key = (block.gw, block.gh)
+        hit = self._rooms.get(key)
+        if hit is not None: return hit
+        g = self.cfg.GRID_UNIT; fn = self.falloff; scale = self.scale
+        x0 = block.gx * g; y0 = block.gy * g
+        lights = [(x - x0, y - y0) for (x, y) in light_centres(block, self.cfg)]
+        lux = [0.0] * (block.gw * block.gh)   # Cell (i, j) at j * gw + i
+        for j in range(block.gh):
+            cy = (j + 0.5) * g
+            for i in range(block.gw):
+                cx = (i + 0.5) * g
+                total = 0.0
+                for (lx, ly) in lights:
+                    f = fn(math.sqrt((cx - lx) ** 2 + (cy - ly) ** 2), scale)
+                    if f >= CUTOFF: total += f
+                lux[j * block.gw + i] = self.shaft_lux * total
+        lit = 0
+        for v in lux:
+            if v >= self.lit_lux: lit += 1
+        n = float(max(1, len(lux)))
+        hit = (lux, lit / n, sum(lux) / n)
+        self._rooms[key] = hit
+        return hit
+
+    def illuminance(self, block):
+        """(gw, gh, ox, oy, lux) with lux[j * gw + i] at cell centre (ox + i * GRID_UNIT, oy + j * GRID_UNIT)."""
+        g = self.cfg.GRID_UNIT
+        ox = (block.gx + 0.5) * g; oy = (block.gy + 0.5) * g
+        if block.type not in self.cfg.LIGHT_TYPES: return block.gw, block.gh, ox, oy, [0.0] * (block.gw * block.gh)
+        return block.gw, block.gh, ox, oy, self._room(block)[0]
+
+    def coverage(self, block):
+        """(lit fraction, mean lux) over one block's grid cells."""
+        if block.gw * block.gh == 0 or block.type not in self.cfg.LIGHT_TYPES: return 0.0, 0.0
+        return self._room(block)[1:]
+
+    def evaluate(self, blocks):
+        """{block index: (lit fraction, mean lux)} for the evaluated types."""
+        return dict((b.index, self.coverage(b)) for b in blocks if b.type in self.types)
+
+    def summary(self, settlement):
+        """Flat record: area-weighted lit fraction and mean lux per evaluated type."""
+        out = {}
+        for t in self.types:
+            area = lit = lux = 0.0
+            for b in settlement.blocks:
+                if b.type != t: continue
+                a = b.gw * b.gh
+                f, m = self.coverage(b)
+                area += a; lit += f * a; lux += m * a
+            out['%s_lit_fraction' % t] = lit / area if area else 0.0
+            out['%s_mean_lux' % t] = lux / area if area else 0.0
+        return out
+
+
+def daylight(settlement, config=None, **options):
+    return Daylight(config, **options).summary(settlement)
+
+
+def daylight_batch(settlements, config=None, **options):
+    """Yield summary() for each settlement, sharing one room-size cache."""
+    d = Daylight(config, **options)
+    for s in settlements:
+        yield d.summary(s)
@@ -0,0 +1,190 @@
+"""
+Streaming GeoJSON, SVG and ASCII DXF export of generated layouts.
+
+Features are produced one block at a time straight from the block records
+of a Settlement or an open PackedLayout and written out immediately, so
+memory stays constant however large the layout and no Rhino is needed.
+Each block yields its outline (cisterns are circles, as in the scripts),
+its room void (HOLE_RATIO), its lightcores and its drainage band, the
+outline grown by DRAINAGE_WIDTH (a wider circle around a cistern). The bands are written per unit, like the
+scripts' fallback in unit_based_drainage: they overlap where units are
+close, which a filled drawing shows as one band, and the union is left to
+the viewer or CAD package.
+
+LAYERS names what can be exported, in drawing order. Coordinates are
+metres; circles become CIRCLE_SEGMENTS-gon rings in GeoJSON.
+"""
+import math
+
+from strand.blocks import Block
+from strand.config import Config
+from strand.frames import HOLE_TYPES, block_frame, hole_frame
+from strand.lighting import light_centres
+
+LAYERS = ('drainage', 'tunnel', 'prod', 'living', 'gather', 'cistern', 'holes', 'lights')
+CIRCLE_SEGMENTS = 32
+_UNIT_CIRCLE = [(math.cos(2 * math.pi * k / CIRCLE_SEGMENTS), math.sin(2 * math.pi * k / CIRCLE_SEGMENTS))
+                for k in range(CIRCLE_SEGMENTS)]
+
+# SVG fill per layer, and DXF colour index
+COLOURS = {'drainage': '#c8c0b0', 'tunnel': '#9a9a9a', 'prod': '#d9a441', 'living': '#c0504d',
+           'gather': '#4f81bd', 'cistern': '#4bacc6', 'holes': '#ffffff', 'lights': '#ffd966'}
+DXF_COLOURS = {'drainage': 8, 'tunnel': 9, 'prod': 2, 'living': 1, 'gather': 5, 'cistern': 4, 'holes': 7, 'lights': 50}
+
+
+# --- RECORDS ---
+def iter_blocks(source):
+    """Blocks of a Settlement, or of a PackedLayout built one at a time."""
+    if not hasattr(source, 'column'):
+        for b in source.blocks: yield b
+        return
+    col = source.column
+    gx, gy, gw, gh, types, clid = col('GX  '), col('GY  '), col('GW  '), col('GH  '), col('TYPE'), col('CLID')
+    names = source.types
+    for i in range(source.count):
+        yield Block(gx[i], gy[i], gw[i], gh[i], names[types[i]], clid[i])
+
+
+def _grid_unit(source):
+    return source.meta['grid_unit'] if hasattr(source, 'meta') else source.grid_unit
+
+
+def features(source, config=None, layers=LAYERS):
+    """
+    (layer, block, shape) for every exported shape, block by block. shape
+    is ('rect', x, y, w, h) or ('circle', cx, cy, r) in metres.
+    """
+    cfg = (config or Config()).copy(GRID_UNIT=_grid_unit(source))
+    g = cfg.GRID_UNIT; wanted = set(layers)
+    band = cfg.DRAINAGE_WIDTH; radius = cfg.LIGHT_DIAMETER / 2.0
+    for b in iter_blocks(source):
+        if b.type == 'void': continue
+        x, y, w, h = block_frame(b, g)
+        if b.type == 'cistern':
+            # Round cisterns get a round band, the circle offset by DRAINAGE_WIDTH
+            cx = x + w / 2.0; cy = y + h / 2.0; r = min(w, h) / 2.0
+            if 'drainage' in wanted: yield 'drainage', b, ('circle', cx, cy, r + band)
+            if b.type in wanted: yield b.type, b, ('circle', cx, cy, r)
+        else:
+            if 'drainage' in wanted: yield 'drainage', b, ('rect', x - band, y - band, w + 2 * band, h + 2 * band)
+            if b.type in wanted: yield b.type, b, ('rect', x, y, w, h)
+        if 'holes' in wanted and b.type in HOLE_TYPES:
+            yield 'holes', b, ('rect',) + hole_frame((x, y, w, h), cfg.HOLE_RATIO)
+        if 'lights' in wanted:
+            for cx, cy in light_centres(b, cfg): yield 'lights', b, ('circle', cx, cy, radius)
+
+
+def extent(source, config=None):
+    """(min_x, min_y, max_x, max_y) in metres of everything features() can draw."""
+    cfg = config or Config()
+    g = _grid_unit(source); pad = cfg.DRAINAGE_WIDTH
+    box = None
+    for b in iter_blocks(source):
+        if b.type == 'void': continue
+        if box is None: box = [b.min_x, b.min_y, b.max_x, b.max_y]; continue
+        if b.min_x < box[0]: box[0] = b.min_x
+        if b.min_y < box[1]: box[1] = b.min_y
+        if b.max_x > box[2]: box[2] = b.max_x
+        if b.max_y > box[3]: box[3] = b.max_y
+    if box is None: return (0.0, 0.0, 0.0, 0.0)
+    return (box[0] * g - pad, box[1] * g - pad, box[2] * g + pad, box[3] * g + pad)
+
+
+def _ring(shape):
+    # Closed ring of (x, y) for a shape
+    if shape[0] == 'rect':
+        _, x, y, w, h = shape
+        return [(x, y), (x + w, y), (x + w, y + h), (x, y + h), (x, y)]
+    _, cx, cy, r = shape
+    ring = [(cx + r * c, cy + r * s) for c, s in _UNIT_CIRCLE]
+    ring.append(ring[0])
+    return ring
+
+
+class _Output:
+    # A path is opened (and closed) here; a file object is written to as is
+    def __init__(self, target):
+        self.own = not hasattr(target, 'write')
+        self.f = open(target, 'w') if self.own else target
+
+    def __enter__(self):
+        return self.f
+
+    def __exit__(self, *exc):
+        if self.own: self.f.close()
+
+
+# --- WRITERS ---
+def write_geojson(source, target, config=None, layers=LAYERS):
+    """FeatureCollection of Polygons with layer, type and cluster properties."""
+    n = 0
+    with _Output(target) as f:
+        f.write('{"type":"FeatureCollection","features":[')
+        for layer, b, shape in features(source, config, layers):
+            coords = ','.join('[%.3f,%.3f]' % p for p in _ring(shape))
+            f.write('%s\n{"type":"Feature","properties":{"layer":"%s","type":"%s","cluster":%s},'
+                    '"geometry":{"type":"Polygon","coordinates":[[%s]]}}'
+                    % (',' if n else '', layer, b.type, 'null' if b.cluster_id is None else int(b.cluster_id), coords))
+            n += 1
+        f.write('\n]}\n')
+    return n
+
+
+def write_svg(source, target, config=None, layers=LAYERS, scale=1.0):
+    """
+    SVG drawing, 1 m = scale px, north up. One pass for the extent, then
+    one per layer so layers stack in LAYERS order; every shape is written
+    as it is produced.
+    """
+    x0, y0, x1, y1 = extent(source, config)
+    w = (x1 - x0) * scale; h = (y1 - y0) * scale
+    n = 0
+    with _Output(target) as f:
+        f.write('<svg xmlns="http://www.w3.org/2000/svg" width="%.1f" height="%.1f" viewBox="%.3f %.3f %.3f %.3f">\n'
+                % (w, h, x0, -y1, x1 - x0, y1 - y0))
+        f.write('<style>%s</style>\n' % ' '.join('.%s{fill:%s;stroke:none}' % (k, v) for k, v in sorted(COLOURS.items())))
+        # Flip y so the drawing is in plan orientation
+        f.write('<g transform="scale(1,-1)">\n')
+        for layer in layers:
+            f.write('<g class="%s">\n' % layer)
+            for _, b, shape in features(source, config, (layer,)):
+                if shape[0] == 'rect': f.write('<rect x="%.3f" y="%.3f" width="%.3f" height="%.3f"/>\n' % shape[1:])
+                else: f.write('<circle cx="%.3f" cy="%.3f" r="%.3f"/>\n' % shape[1:])
+                n += 1
+            f.write('</g>\n')
+        f.write('</g>\n</svg>\n')
+    return n
+
+
+def write_dxf(source, target, config=None, layers=LAYERS):
+    """ASCII DXF (R12 entities): closed POLYLINEs and CIRCLEs on one layer per feature layer."""
+    n = 0
+    with _Output(target) as f:
+        f.write('0\nSECTION\n2\nTABLES\n0\nTABLE\n2\nLAYER\n70\n%d\n' % len(layers))
+        for layer in layers:
+            f.write('0\nLAYER\n2\n%s\n70\n0\n62\n%d\n6\nCONTINUOUS\n' % (layer.upper(), DXF_COLOURS.get(layer, 7)))
+        f.write('0\nENDTAB\n0\nENDSEC\n0\nSECTION\n2\nENTITIES\n')
+        for layer, b, shape in features(source, config, layers):
+            name = layer.upper()
+            if shape[0] == 'circle':
+                f.write('0\nCIRCLE\n8\n%s\n10\n%.3f\n20\n%.3f\n30\n0.0\n40\n%.3f\n' % ((name,) + shape[1:]))
+            else:
+                f.write('0\nPOLYLINE\n8\n%s\n66\n1\n70\n1\n' % name)
+                for px, py in _ring(shape)[:-1]:
+                    f.write('0\nVERTEX\n8\n%s\n10\n%.3f\n20\n%.3f\n30\n0.0\n' % (name, px, py))
+                f.write('0\nSEQEND\n8\n%s\n' % name)
+            n += 1
+        f.write('0\nENDSEC\n0\nEOF\n')
+    return n
+
+
+WRITERS = {'.geojson': write_geojson, '.json': write_geojson, '.svg': write_svg, '.dxf': write_dxf}
+
+
+def export(source, path, config=None, layers=LAYERS):
+    """Write path in the format named by its extension; returns the shape count."""
+    import os
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in WRITERS:
+        raise KeyError("Unknown export format: %s (choose from %s)" % (ext, ', '.join(sorted(WRITERS))))
+    return WRITERS[ext](source, path, config, layers)
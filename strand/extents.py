@@ -0,0 +1,113 @@
+"""
+Cached free extents around each block, for pruning sizes that cannot fit.
+
+A tight anchor places the child flush against one corner of a parent side,
+so the child always covers two straight runs of cells starting at that
+corner: one leading away from the parent (its depth) and one running along
+the side (its width). If either run is blocked short of the child's size,
+the candidate is certain to collide and can be dropped without an overlap
+test. The runs are measured once per block, capped at the largest unit side,
+and cached. The cache is invalidated locally: each entry is filed under the
+small tiles its runs pass through, and placing or removing a block only
+clears the tiles it touches.
+
+Runs are measured by the size conditioning (Growth.fitting_dims), which is
+opt-in through SIZE_RETRIES because a redrawn size changes the layout.
+Pruning only reads what is cached and never changes which candidate wins,
+so with SIZE_RETRIES = 0 the scripts' layouts are reproduced unchanged.
+"""
+import math
+
+TILE = 8   # Invalidation tile side, in cells
+
+
+def side_range(cfg, u_type):
+    # Smallest / largest grid side get_grid_dims can return for a unit type
+    lo_a, hi_a = cfg.AREAS[u_type]
+    g = cfg.GRID_UNIT
+    if u_type == 'cistern':
+        lo, hi = math.sqrt(lo_a), math.sqrt(hi_a)
+    else:
+        lo = min(math.sqrt(lo_a * 0.6), lo_a / math.sqrt(hi_a * 1.5))
+        hi = max(math.sqrt(hi_a * 1.5), hi_a / math.sqrt(lo_a * 0.6))
+    return max(1, int(round(lo / g))), max(1, int(round(hi / g)))
+
+
+def _corners(p):
+    # (x, y, dx, dy) for each anchor of anchors_tight, in the same order:
+    # the child's corner cell touching the parent and the directions its
+    # x and y runs grow in
+    return (
+        (p.max_x, p.max_y - 1, 1, -1), (p.max_x, p.min_y, 1, 1),          # Right
+        (p.min_x - 1, p.max_y - 1, -1, -1), (p.min_x - 1, p.min_y, -1, 1),  # Left
+        (p.min_x, p.max_y, 1, 1), (p.max_x - 1, p.max_y, -1, 1),          # Top
+        (p.min_x, p.min_y - 1, 1, -1), (p.max_x - 1, p.min_y - 1, -1, -1),  # Bottom
+    )
+
+
+class FreeExtents:
+    def __init__(self, occupancy, cfg):
+        self.occupancy = occupancy
+        self.cap = max(side_range(cfg, t)[1] for t in cfg.AREAS)
+        self.tile = TILE
+        self.cache = {}   # block -> ((run_x, run_y), ...) per tight anchor
+        self.tiles = {}   # (tx, ty) -> {block, ...} cached entries reaching the tile
+
+    # --- MEASURE ---
+    def runs(self, block):
+        """Free (x run, y run) at each tight anchor corner of block, cached."""
+        entry = self.cache.get(block)
+        if entry is not None: return entry
+        run = self.occupancy.free_run; cap = self.cap
+        t = self.tile; tiles = self.tiles
+        entry = []
+        for (x, y, dx, dy) in _corners(block):
+            rx = run(x, y, dx, 0, cap); ry = run(x, y, 0, dy, cap)
+            entry.append((rx, ry))
+            # A run depends on its free cells and the cell that stopped it
+            ex = x + dx * min(rx, cap - 1); ey = y + dy * min(ry, cap - 1)
+            ty = y // t
+            for tx in range(min(x, ex) // t, max(x, ex) // t + 1):
+                tiles.setdefault((tx, ty), set()).add(block)
+            tx = x // t
+            for ty in range(min(y, ey) // t, max(y, ey) // t + 1):
+                tiles.setdefault((tx, ty), set()).add(block)
+        self.cache[block] = entry
+        return entry
+
+    # --- INVALIDATION ---
+    def touch(self, block):
+        # Cells of block changed state: drop every entry whose runs may cross it
+        t = self.tile; cache = self.cache; tiles = self.tiles
+        for tx in range(block.min_x // t, (block.max_x - 1) // t + 1):
+            for ty in range(block.min_y // t, (block.max_y - 1) // t + 1):
+                keys = tiles.pop((tx, ty), None)
+                if not keys: continue
+                for b in keys: cache.pop(b, None)
+
+    # --- QUERIES ---
+    def _need(self, w, h):
+        # A run that reached the cap is not known to be blocked
+        return min(w, self.cap), min(h, self.cap)
+
+    def open_anchors(self, parent, w, h):
+        """
+        Per anchors_tight candidate of parent: False where a w x h child
+        cannot fit. Only answers from the cache (None when parent has no
+        fresh entry), so it never costs a measurement.
+        """
+        entry = self.cache.get(parent)
+        if entry is None: return None
+        w, h = self._need(w, h)
+        return [rx >= w and ry >= h for (rx, ry) in entry]
+
+    def fits(self, parent, w, h):
+        w, h = self._need(w, h)
+        for rx, ry in self.runs(parent):
+            if rx >= w and ry >= h: return True
+        return False
+
+    def any_fit(self, parents, w, h):
+        for p in parents:
+            if self.fits(p, w, h): return True
+        return False
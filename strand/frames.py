@@ -0,0 +1,51 @@
+"""
+World-space rectangles for blocks and their room voids, computed straight
+from grid coordinates. A hole is the outline scaled by HOLE_RATIO about its
+centre, which for an axis-aligned rectangle is plain arithmetic.
+"""
+
+# Types that get a room void cut out
+HOLE_TYPES = ('living', 'prod', 'gather')
+
+
+def block_frame(block, grid_unit):
+    return (block.gx * grid_unit, block.gy * grid_unit, block.gw * grid_unit, block.gh * grid_unit)
+
+
+def hole_frame(frame, ratio):
+    x, y, w, h = frame
+    hw = w * ratio; hh = h * ratio
+    return (x + (w - hw) / 2.0, y + (h - hh) / 2.0, hw, hh)
+
+
+def room_frames(blocks, grid_unit, hole_ratio):
+    """One pass over the blocks: [(block, outer_frame, hole_frame or None), ...]"""
+    out = []
+    for b in blocks:
+        frame = block_frame(b, grid_unit)
+        hole = hole_frame(frame, hole_ratio) if b.type in HOLE_TYPES else None
+        out.append((b, frame, hole))
+    return out
+
+
+def side_tunnel_rect(block):
+    """
+    Grid rect of the connection cut for a block placed against a side of its
+    parent (cluster_logic's get_tunnel_crv). Living units cut into the hub,
+    other units cut a strip along their own attached edge.
+    """
+    side = block.attach_side
+    if side is None: return None
+    gx, gy, gw, gh = block.gx, block.gy, block.gw, block.gh
+
+    if block.type == 'living':
+        if block.parent is None: return None
+        if side == 0: return (gx, gy + gh, gw, 1)
+        if side == 1: return (gx - 1, gy, 1, gh)
+        if side == 2: return (gx, gy - 1, gw, 1)
+        return (gx + gw, gy, 1, gh)
+
+    if side == 0: return (gx, gy + gh - 1, gw, 1)
+    if side == 1: return (gx, gy, 1, gh)
+    if side == 2: return (gx, gy, gw, 1)
+    return (gx + gw - 1, gy, 1, gh)
@@ -0,0 +1,135 @@
+"""
+Dilated obstacle layers for the gap rules.
+
+favourite.py keeps a drainage buffer between clusters, favourite2.py a
+one-cell road with no gap inside a cluster, and both keep cisterns apart.
+The scripts test those rules pairwise against every block near a
+candidate. Here each cluster's footprint is grown once by CLUSTER_GAP when
+a block is placed and merged into one shared layer, and cisterns are grown
+by CISTERN_BUFFER into another. A rect then breaks a gap rule exactly when
+it meets a cell that is forbidden to its cluster:
+
+    forbidden(c) = shared | (near & ~own[c])
+
+near is the union of every cluster's grown footprint, shared the cells at
+least two clusters cover and own[c] the cluster's own, all as one bit-packed
+integer per row. Voids never take part.
+
+Every planar occupancy backend keeps a GapLayer. A parent exemption across
+clusters is not encoded in the layers, so a hit with an exempt parent (and
+any query with other gaps than the layers were grown with) is answered by
+the backend's exact ring scan instead.
+"""
+from strand.config import Config
+
+
+def _ones(n):
+    return (1 << n) - 1 if n > 0 else 0
+
+
+class GapLayer:
+    def __init__(self, config=None):
+        cfg = config or Config()
+        self.gap = cfg.CLUSTER_GAP
+        self.cistern_gap = cfg.CISTERN_BUFFER
+        self.origin = 0
+        self.near = {}       # y -> bits grown by any cluster
+        self.shared = {}     # y -> bits grown by two clusters or more
+        self.own = {}        # cluster id -> {y: bits}
+        self.members = {}    # cluster id -> placed blocks
+        self.cisterns = []
+        self.cistern_rows = {}
+
+    # --- MASKS ---
+    def _span(self, min_x, max_x):
+        lo = min_x + self.origin
+        if lo < 0:
+            # Grown past bit 0: move every layer so negative x stay addressable
+            shift = max(-lo, 64)
+            self.origin += shift
+            for masks in [self.near, self.shared, self.cistern_rows] + list(self.own.values()):
+                for y in masks: masks[y] <<= shift
+            lo += shift
+        return _ones(max_x + self.origin - lo) << lo
+
+    def _query_span(self, min_x, max_x):
+        lo = max(min_x + self.origin, 0)
+        return _ones(max_x + self.origin - lo) << lo
+
+    def _grow(self, cid, block):
+        r = self.gap
+        span = self._span(block.min_x - r, block.max_x + r)
+        own = self.own.setdefault(cid, {})
+        near = self.near; shared = self.shared
+        for y in range(block.min_y - r, block.max_y + r):
+            o = own.get(y, 0); n = near.get(y, 0)
+            # Cells another cluster already covers become shared
+            others = (n & ~o) | shared.get(y, 0)
+            if span & others: shared[y] = shared.get(y, 0) | (span & others)
+            own[y] = o | span
+            near[y] = n | span
+
+    def _grow_cistern(self, block):
+        r = self.cistern_gap
+        span = self._span(block.min_x - r, block.max_x + r)
+        rows = self.cistern_rows
+        for y in range(block.min_y - r, block.max_y + r):
+            rows[y] = rows.get(y, 0) | span
+
+    # --- UPDATES ---
+    def add(self, block):
+        if block.type == 'void': return
+        if self.gap > 0:
+            self.members.setdefault(block.cluster_id, []).append(block)
+            self._grow(block.cluster_id, block)
+        if block.type == 'cistern' and self.cistern_gap > 0:
+            self.cisterns.append(block)
+            self._grow_cistern(block)
+
+    def remove(self, block):
+        # Layers are unions: regrow the cluster, then recount the rows it covered
+        if block.type == 'void': return
+        cid = block.cluster_id
+        members = self.members.get(cid)
+        if members is not None and block in members:
+            members.remove(block)
+            self.own.pop(cid, None)
+            if not members: del self.members[cid]
+            r = self.gap
+            y0 = block.min_y - r; y1 = block.max_y + r
+            own = self.own.setdefault(cid, {}) if members else None
+            for b in members:
+                span = self._span(b.min_x - r, b.max_x + r)
+                for y in range(b.min_y - r, b.max_y + r):
+                    own[y] = own.get(y, 0) | span
+            layers = list(self.own.values())
+            for y in range(y0, y1):
+                once = twice = 0
+                for masks in layers:
+                    bits = masks.get(y, 0)
+                    twice |= once & bits; once |= bits
+                self.near[y] = once; self.shared[y] = twice
+        if block.type == 'cistern' and block in self.cisterns:
+            self.cisterns.remove(block)
+            self.cistern_rows = {}
+            for b in self.cisterns: self._grow_cistern(b)
+
+    # --- QUERIES ---
+    def answers(self, cluster_gap, cistern_gap, is_cistern):
+        # True when the layers were grown with the gaps asked for
+        return cluster_gap == self.gap and (not is_cistern or cistern_gap == self.cistern_gap)
+
+    def hits(self, min_x, min_y, max_x, max_y, is_cistern, cluster_id):
+        """True when the rect meets a cell its cluster or, as a cistern, its type must keep clear of."""
+        span = self._query_span(min_x, max_x)
+        if self.gap > 0:
+            near = self.near; shared = self.shared
+            own = self.own.get(cluster_id, {})
+            for y in range(min_y, max_y):
+                n = near.get(y, 0) & span
+                if n and (n & ~own.get(y, 0) or shared.get(y, 0) & span): return True
+        if is_cistern and self.cistern_gap > 0:
+            rows = self.cistern_rows
+            for y in range(min_y, max_y):
+                if rows.get(y, 0) & span: return True
+        return False
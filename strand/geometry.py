@@ -0,0 +1,186 @@
+"""
+RhinoCommon adapter: turns Block records into curves and Rhino boundary
+input into a strand.Boundary. Rhino modules are imported on first use
+only, so importing strand never pulls in Rhino or .NET.
+"""
+from strand.frames import room_frames, side_tunnel_rect
+from strand.lighting import light_centres
+
+_rg = None
+
+
+def rhino_geometry():
+    global _rg
+    if _rg is None:
+        import Rhino.Geometry as rg
+        _rg = rg
+    return _rg
+
+
+# --- CURVES ---
+def rect_crv(x, y, w, h):
+    rg = rhino_geometry()
+    return rg.Rectangle3d(rg.Plane.WorldXY, rg.Point3d(x, y, 0), rg.Point3d(x + w, y + h, 0)).ToNurbsCurve()
+
+
+def circle_crv(cx, cy, radius):
+    rg = rhino_geometry()
+    return rg.Circle(rg.Plane.WorldXY, rg.Point3d(cx, cy, 0), radius).ToNurbsCurve()
+
+
+def frame_outer_crv(b_type, frame):
+    x, y, w, h = frame
+    if b_type == 'cistern':
+        return circle_crv(x + w / 2.0, y + h / 2.0, min(w, h) / 2.0)
+    return rect_crv(x, y, w, h)
+
+
+def light_crvs(block, cfg):
+    radius = cfg.LIGHT_DIAMETER / 2.0
+    return [circle_crv(cx, cy, radius) for cx, cy in light_centres(block, cfg)]
+
+
+def unit_based_drainage(outer_crvs, width):
+    rg = rhino_geometry()
+    individual_offsets = []
+    for crv in outer_crvs:
+        offset_crvs = crv.Offset(rg.Plane.WorldXY, width, 0.01, rg.CurveOffsetCornerStyle.Sharp)
+        if offset_crvs: individual_offsets.extend(offset_crvs)
+
+    final_drainage = rg.Curve.CreateBooleanUnion(individual_offsets)
+    if not final_drainage: return individual_offsets
+    return list(final_drainage)
+
+
+# --- BOUNDARY ---
+def _polyline_pts(crv, tolerance=0.01):
+    ok, polyline = crv.TryGetPolyline()
+    if not ok:
+        ok, polyline = crv.ToPolyline(tolerance, 0.1, 0.0, 0.0).TryGetPolyline()
+    return [(p.X, p.Y) for p in polyline]
+
+
+def _input_key(brep, crv):
+    # Cheap fingerprint of the input: vertices and edge midpoints (control
+    # points for a curve), so an unchanged boundary skips the loop walk
+    import hashlib
+    if brep is not None:
+        pts = [v.Location for v in brep.Vertices] + [e.PointAt(e.Domain.Mid) for e in brep.Edges]
+    else:
+        pts = [p.Location for p in crv.ToNurbsCurve().Points]
+    text = ';'.join('%.6f,%.6f' % (p.X, p.Y) for p in pts)
+    return ('brep' if brep is not None else 'crv', hashlib.sha1(text.encode('ascii')).hexdigest())
+
+
+_INPUTS = {}   # input fingerprint -> Boundary
+
+
+def boundary_from_input(boundary):
+    """
+    Accepts a Brep (outer + inner loops) or closed curve, as object or id.
+    The Boundary is memoised on the input's geometry, so repeated solves
+    on the same site share its area, lattice, mask and distance field.
+    """
+    from strand.boundary import site, SITE_CACHE
+    import rhinoscriptsyntax as rs
+    rg = rhino_geometry()
+
+    boundary_brep = rs.coercebrep(boundary)
+    crv = None if boundary_brep else rs.coercecurve(boundary)
+    if not boundary_brep and not crv: return None
+    key = _input_key(boundary_brep, crv)
+    cached = _INPUTS.get(key)
+    if cached is not None: return cached
+
+    outer = None; voids = []
+    if boundary_brep:
+        for loop in boundary_brep.Loops:
+            curve = loop.To3dCurve()
+            if loop.LoopType == rg.BrepLoopType.Outer: outer = _polyline_pts(curve)
+            elif loop.LoopType == rg.BrepLoopType.Inner: voids.append(_polyline_pts(curve))
+    else:
+        outer = _polyline_pts(crv)
+    if not outer: return None
+    if len(_INPUTS) >= SITE_CACHE: _INPUTS.clear()
+    b = _INPUTS[key] = site(outer, voids)
+    return b
+
+
+# --- OUTPUT ---
+def _boolean_union(crvs):
+    rg = rhino_geometry()
+    if not crvs: return []
+    union = rg.Curve.CreateBooleanUnion(crvs)
+    return list(union) if union else list(crvs)
+
+
+def cluster_outlines(outer_by_cluster):
+    outlines = []
+    for cid in sorted(outer_by_cluster):
+        outlines.extend(_boolean_union(outer_by_cluster[cid]))
+    return outlines
+
+
+def offset_all(crvs, width):
+    rg = rhino_geometry()
+    out = []
+    for crv in crvs:
+        offsets = crv.Offset(rg.Plane.WorldXY, width, 0.01, rg.CurveOffsetCornerStyle.Sharp)
+        if offsets: out.extend(offsets)
+    return out
+
+
+def component_outputs(settlement, cfg):
+    """
+    Curves for the Grasshopper outputs named in cfg.OUTPUTS, in that order.
+    Per-block curves come from one pass over the block frames; unions and
+    offsets are only computed when an output asks for them.
+    """
+    g = settlement.grid_unit
+    by_type = {'living': [], 'prod': [], 'gather': [], 'cistern': [], 'tunnel': []}
+    holes = {'living': [], 'prod': [], 'gather': []}
+    all_lights, all_outer, walls, side_tunnels = [], [], [], []
+    by_cluster = {}
+    wanted = set(cfg.OUTPUTS)
+
+    # Outline and void come from the same frame; each curve is built once
+    for b, frame, hole_frame in room_frames(settlement.blocks, g, cfg.HOLE_RATIO):
+        outer = frame_outer_crv(b.type, frame)
+        by_type[b.type].append(outer)
+        all_outer.append(outer)
+        if b.type == 'tunnel': continue
+
+        walls.append(outer)
+        by_cluster.setdefault(b.cluster_id, []).append(outer)
+        if hole_frame is not None: holes[b.type].append(rect_crv(*hole_frame))
+        if 'lights' in wanted: all_lights.extend(light_crvs(b, cfg))
+        if 'side_tunnels' in wanted:
+            rect = side_tunnel_rect(b)
+            if rect: side_tunnels.append(rect_crv(rect[0] * g, rect[1] * g, rect[2] * g, rect[3] * g))
+
+    outputs = []
+    for name in cfg.OUTPUTS:
+        if name in ('living', 'prod', 'gather'): outputs.append(by_type[name])
+        elif name == 'cisterns': outputs.append(by_type['cistern'])
+        elif name == 'tunnels': outputs.append(by_type['tunnel'])
+        elif name.endswith('_holes'): outputs.append(holes[name[:-6]])
+        elif name == 'walls': outputs.append(walls)
+        elif name == 'lights': outputs.append(all_lights)
+        elif name == 'side_tunnels': outputs.append(_boolean_union(side_tunnels))
+        elif name == 'drainage': outputs.append(unit_based_drainage(all_outer, cfg.DRAINAGE_WIDTH))
+        elif name == 'cluster_outlines': outputs.append(cluster_outlines(by_cluster))
+        elif name == 'cluster_drainage': outputs.append(offset_all(cluster_outlines(by_cluster), cfg.DRAINAGE_WIDTH))
+        elif name == 'empty': outputs.append([])
+        else: raise KeyError("Unknown output: %s" % name)
+    return tuple(outputs)
+
+
+def run_component(preset_name, boundary, seed, **overrides):
+    """Grow a preset inside a Grasshopper component and return its outputs."""
+    from strand.growth import grow
+    from strand.presets import preset, empty_outputs
+
+    site = boundary_from_input(boundary)
+    if site is None: return empty_outputs(preset_name)
+    cfg = preset(preset_name, **overrides)
+    return component_outputs(grow(site, cfg, int(seed)), cfg)
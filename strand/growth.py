@@ -0,0 +1,434 @@
+"""
+The shared growth engine behind every script preset.
+
+A Growth either starts a new settlement from a seed block or continues an
+existing Settlement. Existing blocks are never moved or removed, and every
+lookup goes through the occupancy index or a bounded random sample, so the
+cost of a run scales with what it adds rather than with what is already built.
+Script-specific behaviour comes from the strategies named in the Config.
+"""
+import math
+import random
+
+from strand.blocks import Block, void_block
+from strand.config import Config
+from strand.settlement import Settlement, OCCUPANCY
+from strand import strategies
+from strand.strategies import sample, anchors_with_tunnel
+from strand.candidates import first_fit, first_tunnel_fit
+from strand.tips import TipIndex, face_pairs
+from strand.extents import FreeExtents
+
+
+def get_grid_dims(u_type, cfg, rng):
+    target_area = rng.uniform(*cfg.AREAS[u_type])
+
+    # Force Cisterns to be square so the circle fits nicely
+    if u_type == 'cistern':
+        side_m = math.sqrt(target_area)
+        g_side = max(1, int(round(side_m / cfg.GRID_UNIT)))
+        return g_side, g_side
+
+    aspect = rng.uniform(0.6, 1.5)
+    w_m = math.sqrt(target_area * aspect); h_m = target_area / w_m
+    gw = max(1, int(round(w_m / cfg.GRID_UNIT))); gh = max(1, int(round(h_m / cfg.GRID_UNIT)))
+    if rng.random() > 0.5: gw, gh = gh, gw
+    return gw, gh
+
+
+class Growth:
+    def __init__(self, boundary, settlement=None, config=None, seed=0):
+        self.cfg = config or Config()
+        self.boundary = boundary
+        self.seed = int(seed)
+        self.rng = random.Random(self.seed)
+        backend = OCCUPANCY[self.cfg.OCCUPANCY]
+        if settlement is None:
+            settlement = Settlement(self.cfg.GRID_UNIT, backend(self.cfg))
+        elif type(settlement.occupancy) is not backend or not self.gaps_match(settlement.occupancy):
+            # e.g. a loaded 2D layout grown on in voxels, or with other gap rules
+            settlement.use_occupancy(backend(self.cfg))
+        self.settlement = settlement
+        if self.settlement.grid_unit != self.cfg.GRID_UNIT:
+            raise ValueError("Layout grid unit %s does not match config GRID_UNIT %s" % (self.settlement.grid_unit, self.cfg.GRID_UNIT))
+
+        self.lattice = boundary.lattice(self.cfg.GRID_UNIT)
+        self._field = None   # Boundary distance field, built on first use
+        for rect in boundary.void_rects(self.cfg.GRID_UNIT):
+            self.settlement.add_void(void_block(*rect))
+
+        # Strategies resolved once, not per attempt
+        cfg = self.cfg
+        self.make_queue = strategies.QUEUES[cfg.QUEUE]
+        self.parent_policy = strategies.PARENT_POLICIES[cfg.PARENTS]
+        self.tunnel_policy = strategies.TUNNEL_POLICIES[cfg.TUNNELS] if cfg.TUNNELS else None
+        self.living_fail = strategies.LIVING_FAIL[cfg.LIVING_FAIL] if cfg.LIVING_FAIL else None
+        self.post_process = [strategies.POST_PROCESS[name] for name in cfg.POST_PROCESS]
+
+        # Free runs around each parent, for pruning sizes that cannot fit
+        self.extents = FreeExtents(self.settlement.occupancy, cfg)
+
+        # Live tunnel tips, bucketed by free face and extent
+        self.tips = TipIndex(self.settlement.occupancy, cfg)
+        for tip in self.settlement.tunnel_tips: self.tips.add(tip)
+
+        # Per-cluster state
+        self.build_queue = []
+        self.current_hub = None
+        self.current_cluster_id = self.settlement.next_cluster_id - 1
+        self.current_blocks = []
+        self.current_spine = []
+        self.current_prods = []
+        self.cistern_retry = False
+
+        self.fails = 0
+        self.total_fails = 0
+        self.clusters_started = 0
+        self.aborted = False
+        self.start_index = len(self.settlement.blocks)
+        self.target_area = None
+        self.max_clusters = None
+        self.trace = None          # strand.trace.Trace, when recording
+
+    # --- HELPERS ---
+    def gaps_match(self, occupancy):
+        gaps = getattr(occupancy, 'gaps', None)
+        return gaps is None or gaps.answers(self.cfg.CLUSTER_GAP, self.cfg.CISTERN_BUFFER, True)
+
+    def inside(self, block):
+        # Seed test: centre clear of the outline, as the scripts' `== Inside`
+        return self.lattice.interior(2 * block.gx + block.gw, 2 * block.gy + block.gh)
+
+    def within(self, block):
+        # Candidate test: centre not outside, as the scripts' `!= Outside`
+        return self.lattice.contains(2 * block.gx + block.gw, 2 * block.gy + block.gh)
+
+    def collides(self, block):
+        cfg = self.cfg
+        exempt = block.parent if cfg.GAP_PARENT_EXEMPT else None
+        return self.settlement.occupancy.collides(block, cfg.CLUSTER_GAP, cfg.CISTERN_BUFFER, exempt)
+
+    def add_block(self, block):
+        self.settlement.add(block)
+        if self.trace is not None: self.trace.place(block)
+        self.extents.touch(block)
+        return block
+
+    def commit(self, block):
+        self.add_block(block)
+        self.current_blocks.append(block)
+        if block.type == 'gather': self.current_hub = block
+        elif block.type == 'prod': self.current_prods.append(block)
+        return block
+
+    # --- INTERIOR ---
+    def depth(self, gx, gy):
+        """Distance in cells from grid cell (gx, gy) to the boundary (0 outside)."""
+        if self._field is None: self._field = self.boundary.distance_field(self.cfg.GRID_UNIT)
+        x0, y0, w, h, dist = self._field
+        x = gx - x0; y = gy - y0
+        return dist[y * w + x] if 0 <= x < w and 0 <= y < h else 0.0
+
+    def block_depth(self, block):
+        return self.depth(block.gx + block.gw // 2, block.gy + block.gh // 2)
+
+    def seed_cells(self, count):
+        """
+        Grid cells for seed blocks, deepest first. With count > 1 the rest
+        are farthest-point picks among the cells at least half as deep, so
+        the seeds spread over the interior. Every other deep cell follows
+        as a fallback, deepest first.
+        """
+        if self._field is None: self._field = self.boundary.distance_field(self.cfg.GRID_UNIT)
+        x0, y0, w, h, dist = self._field
+        order = sorted((i for i in range(w * h) if dist[i] > 0), key=lambda i: -dist[i])
+        if not order: return []
+        picks = [order[0]]
+        if count > 1:
+            floor = dist[order[0]] / 2.0
+            deep = [i for i in order if dist[i] >= floor]
+            near = dict((i, (i % w - order[0] % w) ** 2 + (i // w - order[0] // w) ** 2) for i in deep)
+            while len(picks) < count and near:
+                i = max(deep, key=lambda k: near.get(k, -1))
+                if near.get(i, -1) <= 0: break
+                picks.append(i)
+                for k in deep:
+                    if k in near: near[k] = min(near[k], (k % w - i % w) ** 2 + (k // w - i // w) ** 2)
+        chosen = set(picks)
+        return [(x0 + i % w, y0 + i // w) for i in picks + [i for i in order if i not in chosen]]
+
+    def _seed_block(self, cells, limit):
+        # First cell of cells (up to limit tried) where a centred seed block fits
+        cfg = self.cfg
+        seed_w, seed_h = get_grid_dims('prod', cfg, self.rng)
+        for cx, cy in cells[:limit]:
+            b = Block(cx - seed_w // 2, cy - seed_h // 2, seed_w, seed_h, 'prod', self.settlement.next_cluster_id)
+            if self.inside(b) and not self.collides(b): return b
+        return None
+
+    def place_seed(self):
+        cfg = self.cfg
+        first_block = None
+        if cfg.SEED_POINT == 'centre':
+            cx, cy = self.boundary.center()
+            start_gx = int(cx / cfg.GRID_UNIT); start_gy = int(cy / cfg.GRID_UNIT)
+            seed_w, seed_h = get_grid_dims('prod', cfg, self.rng)
+            first_block = Block(start_gx, start_gy, seed_w, seed_h, 'prod', self.settlement.next_cluster_id)
+            if not self.inside(first_block) or self.collides(first_block): first_block = None
+
+        cells = None
+        if first_block is None or cfg.SEED_COUNT > 1:
+            # A centre outside the site or inside a void no longer ends the run
+            cells = self.seed_cells(cfg.SEED_COUNT)
+        if first_block is None:
+            first_block = self._seed_block(cells, cfg.START_SAMPLE)
+            if first_block is None: return None
+        self.current_cluster_id = first_block.cluster_id
+        self.commit(first_block)
+
+        # Further seeds start clusters of their own
+        for k in range(1, cfg.SEED_COUNT):
+            extra = self._seed_block(cells[k:], cfg.START_SAMPLE)
+            if extra is None: break
+            self.add_block(extra)
+        return first_block
+
+    def start_cluster(self):
+        self.build_queue = self.make_queue(self.cfg, self.rng)
+        self.current_hub = None
+        self.current_blocks = []
+        self.current_spine = []
+        self.current_prods = []
+        self.cistern_retry = False
+        self.current_cluster_id = self.settlement.next_cluster_id
+        # Reserve the id even if the cluster never places a block
+        self.settlement.next_cluster_id += 1
+        self.clusters_started += 1
+        if self.trace is not None: self.trace.cluster(self.current_cluster_id)
+
+    def rollback_cluster(self):
+        if self.trace is not None: self.trace.rollback(self.current_cluster_id)
+        for b in self.settlement.remove_cluster(self.current_cluster_id):
+            self.extents.touch(b)
+            if b.type == 'tunnel': self.tips.discard(b)
+        self.build_queue = []
+        self.current_hub = None
+        self.current_blocks = []
+        self.current_spine = []
+        self.current_prods = []
+        self.cistern_retry = False
+
+    def reject(self, u_type, parent, gx, gy, gw, gh, side, reason):
+        # Trace one rejected candidate; 'collides' is split into overlap and gap
+        if reason == 'collides':
+            free = self.settlement.occupancy.is_free(gx, gy, gx + gw, gy + gh, u_type)
+            reason = 'gap' if free else 'overlap'
+        self.trace.reject(u_type, self.current_cluster_id, parent, gx, gy, gw, gh, side, reason)
+
+    # --- CISTERN RESERVATION ---
+    def cistern_check(self, u_type):
+        """
+        cistern_slot while the hub about to be placed must be followed by its
+        cistern and CISTERN_RESERVE is on, else None.
+        """
+        if u_type != 'gather' or not self.cfg.CISTERN_RESERVE: return None
+        queue = self.build_queue
+        if len(queue) < 2 or queue[1] != 'cistern': return None
+        return self.cistern_slot
+
+    def cistern_slot(self, hx, hy, gw, gh, tunnel=None):
+        """
+        (gx, gy, side) of a free CISTERN_RETRY_SIZE slot tight against a hub
+        at (hx, hy), clear of its tunnel rect, or None. Nothing is placed
+        between the hub and its cistern, so the cistern step is then sure to
+        find a slot (at worst on its retry) and the cluster is never built
+        only to be rolled back.
+        """
+        cfg = self.cfg
+        occ = self.settlement.occupancy; lattice = self.lattice
+        cw, ch = cfg.CISTERN_RETRY_SIZE
+        hub = Block(hx, hy, gw, gh, 'gather', self.current_cluster_id)
+        for cx, cy, side in strategies.anchors_tight(hub, cw, ch, cfg):
+            if not lattice.contains(2 * cx + cw, 2 * cy + ch): continue
+            if tunnel is not None:
+                tx, ty, tw, th = tunnel
+                if cx < tx + tw and tx < cx + cw and cy < ty + th and ty < cy + ch: continue
+            if occ.collides_rect(cx, cy, cx + cw, cy + ch, 'cistern', self.current_cluster_id,
+                                 cfg.CLUSTER_GAP, cfg.CISTERN_BUFFER, None): continue
+            return cx, cy, side
+        return None
+
+    # --- PLACEMENT ---
+    def commit_tunnel_fit(self, fit, gw, gh):
+        parent, (tx, ty, tw, th), (hx, hy) = fit
+        cid = self.current_cluster_id
+        tunnel = self.commit(Block(tx, ty, tw, th, 'tunnel', cid, None, parent))
+        self.settlement.tunnel_tips.append(tunnel)
+        self.tips.add(tunnel)
+        self.current_spine.append(tunnel)
+        return self.commit(Block(hx, hy, gw, gh, 'gather', cid, None, tunnel))
+
+    def place_hub_via_tunnel(self, gw, gh, parents):
+        fit = first_tunnel_fit(self, gw, gh, parents, anchors_with_tunnel)
+        if fit is None: return None
+        return self.commit_tunnel_fit(fit, gw, gh)
+
+    def place_hub_from_tips(self, gw, gh):
+        # Up to PARENT_SAMPLE indexed picks; boxed-in faces retire themselves
+        for attempt in range(self.cfg.PARENT_SAMPLE):
+            pick = self.tips.pick(self.rng, gw, gh)
+            if pick is None: return None
+            tip, face = pick
+            fit = first_tunnel_fit(self, gw, gh, [tip], face_pairs(anchors_with_tunnel, face))
+            if fit is not None: return self.commit_tunnel_fit(fit, gw, gh)
+        return None
+
+    def place_standard(self, u_type, gw, gh, parents, anchor_fn):
+        fit = first_fit(self, u_type, gw, gh, parents, anchor_fn)
+        if fit is None: return None
+        parent, nx, ny, side_idx = fit
+        return self.commit(Block(nx, ny, gw, gh, u_type, self.current_cluster_id, side_idx, parent))
+
+    def fitting_dims(self, u_type, gw, gh, parents):
+        # Condition the drawn size on the room the sampled parents actually have:
+        # try it turned, then redraw; None when nothing drawn can fit
+        cfg = self.cfg; extents = self.extents
+        for retry in range(cfg.SIZE_RETRIES + 1):
+            if retry: gw, gh = get_grid_dims(u_type, cfg, self.rng)
+            if extents.any_fit(parents, gw, gh): return gw, gh
+            if extents.any_fit(parents, gh, gw): return gh, gw
+        return None
+
+    def step(self):
+        cfg = self.cfg
+        u_type = self.build_queue[0]
+        retry_size = u_type == 'cistern' and self.cistern_retry
+        if retry_size: gw, gh = cfg.CISTERN_RETRY_SIZE
+        else: gw, gh = get_grid_dims(u_type, cfg, self.rng)
+
+        pool, anchor_name, limit = self.parent_policy(self, u_type)
+        parents = sample(self.rng, pool, limit)
+        if cfg.INTERIOR_BIAS: parents.sort(key=self.block_depth, reverse=True)
+
+        placed = None
+        reason = 'blocked'
+        if u_type == 'gather' and self.tunnel_policy is not None:
+            placed = self.tunnel_policy(self, gw, gh, parents)
+        else:
+            dims = (gw, gh)
+            if anchor_name == 'tight' and cfg.SIZE_RETRIES and not retry_size:
+                dims = self.fitting_dims(u_type, gw, gh, parents)
+            if dims is not None:
+                placed = self.place_standard(u_type, dims[0], dims[1], parents, strategies.ANCHORS[anchor_name])
+            else: reason = 'no_room'
+
+        if placed is not None:
+            self.build_queue.pop(0)
+            self.fails = 0
+            if u_type == 'cistern': self.cistern_retry = False
+            return placed
+
+        # FAILURE HANDLING
+        if self.trace is not None:
+            self.trace.miss(u_type, self.current_cluster_id, gw, gh, reason if parents else 'no_parent')
+        self.fails += 1
+        self.total_fails += 1
+        if u_type == 'cistern' and cfg.CISTERN_FAIL == 'retry_rollback':
+            if not self.cistern_retry:
+                self.cistern_retry = True
+                return None
+            # A cluster without water is not a cluster
+            self.rollback_cluster()
+        elif u_type == 'living' and self.living_fail is not None:
+            self.living_fail(self)
+
+        # Skip difficult block
+        if cfg.SKIP_AFTER_FAILS and self.fails >= cfg.SKIP_AFTER_FAILS and self.build_queue:
+            if self.trace is not None: self.trace.skip(self.build_queue[0], self.current_cluster_id)
+            # No hub means no cistern: drop the cluster now, not after its cistern
+            # fails. The misses keep counting, so a full site ends at MAX_FAILS
+            if self.cistern_check(self.build_queue[0]) is not None: self.build_queue = []
+            else:
+                self.build_queue.pop(0)
+                self.fails = 0
+        return None
+
+    def finished(self, target_area=None):
+        cfg = self.cfg
+        if target_area is not None and self.settlement.area >= target_area: return True
+        if cfg.MAX_FAILS and self.fails >= cfg.MAX_FAILS: return True
+        if cfg.MAX_TOTAL_FAILS and self.total_fails >= cfg.MAX_TOTAL_FAILS: return True
+        return False
+
+    def run_args(self):
+        return {'target_area': self.target_area, 'max_clusters': self.max_clusters}
+
+    def run(self, target_area=None, max_clusters=None, abort=None, checkpoint=None):
+        """
+        Grow until the built area reaches target_area and/or max_clusters new
+        clusters have been started and finished, then run the post-processing
+        passes. Returns the new blocks.
+
+        abort(engine) is asked before each new cluster; when it returns True
+        the run stops at once, without post-processing, and self.aborted is set.
+        checkpoint(engine) is called at the same point, after abort, e.g. with
+        a strand.checkpoint.Checkpointer; its finish(engine), if it has one,
+        is called once the run completes.
+        """
+        self.target_area = target_area; self.max_clusters = max_clusters
+        start = self.start_index
+        # A resumed run already has its seed block
+        if start == 0 and not self.settlement.blocks and self.place_seed() is None: return []
+
+        while not self.finished(target_area):
+            if len(self.build_queue) == 0:
+                if max_clusters is not None and self.clusters_started >= max_clusters: break
+                if abort is not None and abort(self):
+                    self.aborted = True
+                    return self.settlement.blocks[start:]
+                if checkpoint is not None: checkpoint(self)
+                self.start_cluster()
+            self.step()
+
+        for post in self.post_process: post(self)
+        # A finished run leaves nothing to resume
+        if checkpoint is not None and hasattr(checkpoint, 'finish'): checkpoint.finish(self)
+        return self.settlement.blocks[start:]
+
+
+def _checkpointer(checkpoint):
+    # A path means "save there after every cluster"
+    if checkpoint is None or callable(checkpoint): return checkpoint
+    from strand.checkpoint import Checkpointer
+    return Checkpointer(checkpoint)
+
+
+def _tracer(trace, engine, seed):
+    # A path means "record a new trace file there"
+    if trace is None or hasattr(trace, 'place'): return trace
+    from strand.trace import Trace
+    return Trace(trace, {'grid_unit': engine.cfg.GRID_UNIT, 'seed': seed, 'config_hash': engine.cfg.digest(),
+                         'start_blocks': len(engine.settlement.blocks)})
+
+
+def grow(boundary, config=None, seed=0, checkpoint=None, trace=None):
+    # Fresh settlement filled up to DENSITY_LIMIT of the boundary area
+    g = Growth(boundary, None, config, seed)
+    g.trace = _tracer(trace, g, seed)
+    try: g.run(target_area=boundary.area * g.cfg.DENSITY_LIMIT, checkpoint=_checkpointer(checkpoint))
+    finally:
+        if g.trace is not None and g.trace is not trace: g.trace.close()
+    return g.settlement
+
+
+def extend(settlement, boundary, n_clusters, config=None, seed=0, checkpoint=None, trace=None):
+    """
+    Append n_clusters new clusters to an existing settlement in place.
+    Existing blocks, cluster ids and tunnel tips are left untouched.
+    Returns the list of newly placed blocks.
+    """
+    g = Growth(boundary, settlement, config, seed)
+    g.trace = _tracer(trace, g, seed)
+    try: return g.run(max_clusters=n_clusters, checkpoint=_checkpointer(checkpoint))
+    finally:
+        if g.trace is not None and g.trace is not trace: g.trace.close()
@@ -0,0 +1,201 @@
+"""
+Runoff routing over the settlement raster.
+
+Every cell inside the boundary sheds rain in proportion to its surface
+(RUNOFF coefficients: the crust over buried units and the lined drainage
+bands around them shed most, open ground soaks most up). Water follows one
+downstream cell per cell (D8) until it reaches a cistern, which keeps it,
+or leaves the site.
+
+Only with an elevation (a function of metres or one value per raster cell)
+is runoff routed: water follows steepest descent and collects in pits.
+Without one the site is assumed graded to its cisterns, as the drainage
+bands are meant to do, and each cell drains one step closer to the nearest
+cistern. That is a proximity assignment, not routing: every catchment is
+its cistern's nearest-cell region, so every cell connected to a cistern is
+captured by construction. summary() labels the two as 'proximity' and
+'descent'; compare layouts on captured water only under 'descent'.
+
+Each pass is linear in the number of cells: directions come from one
+breadth-first sweep (or one sort by elevation), accumulation and catchment
+labels from a single sweep in that order.
+"""
+import array
+import math
+
+from strand.blocks import TYPE_CODES
+from strand.raster import Raster, SOIL
+
+RAINFALL_MM = 10.0   # Design storm depth
+
+# Fraction of rain that runs off, by surface
+RUNOFF = {'soil': 0.3, 'drainage': 0.95, 'prod': 0.9, 'living': 0.9, 'gather': 0.9,
+          'tunnel': 0.9, 'cistern': 1.0}
+
+OUT = -1    # Water leaves the site
+SINK = -2   # Water stays: a cistern cell or a pit
+
+# Orthogonal steps first, so ties prefer them
+_D8 = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def _surfaces(raster):
+    # Runoff coefficient per cell; soil touching a unit is a drainage band
+    w = raster.w; h = raster.h
+    code = raster.code; inside = raster.inside
+    by_code = {}
+    for t, c in TYPE_CODES.items(): by_code[c] = RUNOFF.get(t, 0.0)
+    coeff = array.array('d', [0.0]) * raster.n
+    for i in range(raster.n):
+        if not inside[i]: continue
+        c = code[i]
+        if c != SOIL:
+            coeff[i] = by_code[c]; continue
+        x = i % w; y = i // w
+        band = False
+        for dx, dy in _D8:
+            nx = x + dx; ny = y + dy
+            if 0 <= nx < w and 0 <= ny < h and code[ny * w + nx] != SOIL:
+                band = True; break
+        coeff[i] = RUNOFF['drainage'] if band else RUNOFF['soil']
+    return coeff
+
+
+def graded_directions(raster):
+    """
+    (down, order) for a site graded towards its cisterns: each cell is
+    assigned to its nearest cistern. down[i] is the next cell, SINK or OUT;
+    order lists inside cells upstream first.
+    """
+    w = raster.w; h = raster.h; n = raster.n
+    inside = raster.inside; code = raster.code
+    cistern = TYPE_CODES['cistern']
+    down = array.array('i', [OUT]) * n
+    dist = array.array('i', [-1]) * n
+
+    # Breadth-first from every cistern cell at once
+    queue = [i for i in range(n) if code[i] == cistern]
+    for i in queue:
+        dist[i] = 0; down[i] = SINK
+    head = 0
+    while head < len(queue):
+        i = queue[head]; head += 1
+        x = i % w; y = i // w; d = dist[i] + 1
+        for dx, dy in _D8:
+            nx = x + dx; ny = y + dy
+            if not (0 <= nx < w and 0 <= ny < h): continue
+            j = ny * w + nx
+            if inside[j] and dist[j] < 0:
+                dist[j] = d; down[j] = i
+                queue.append(j)
+
+    # Unreached inside cells drain off site
+    stranded = [i for i in range(n) if inside[i] and dist[i] < 0]
+    queue.reverse()
+    return down, stranded + queue
+
+
+def descent_directions(raster, elevation):
+    """
+    (down, order) by steepest descent on elevation, a function of metres
+    (x, y) -> z or a sequence of one z per raster cell.
+    """
+    w = raster.w; h = raster.h; n = raster.n
+    inside = raster.inside; code = raster.code
+    cistern = TYPE_CODES['cistern']
+    if callable(elevation):
+        z = array.array('d', [0.0]) * n
+        for i in range(n):
+            if inside[i]: z[i] = elevation(*raster.centre(i))
+    else:
+        z = elevation
+    down = array.array('i', [OUT]) * n
+    diag = math.sqrt(2.0)
+
+    cells = [i for i in range(n) if inside[i]]
+    for i in cells:
+        if code[i] == cistern:
+            down[i] = SINK; continue
+        x = i % w; y = i // w; zi = z[i]
+        best = 0.0; target = SINK
+        for dx, dy in _D8:
+            nx = x + dx; ny = y + dy
+            if not (0 <= nx < w and 0 <= ny < h): continue
+            j = ny * w + nx
+            if not inside[j]: continue
+            slope = (zi - z[j]) / (diag if dx and dy else 1.0)
+            if slope > best: best = slope; target = j
+        down[i] = target
+    cells.sort(key=lambda i: -z[i])
+    return down, cells
+
+
+class Hydrology:
+    """Runoff volumes (m3) for one storm over one layout."""
+
+    def __init__(self, raster, rainfall_mm=RAINFALL_MM, elevation=None):
+        self.raster = raster
+        self.routing = 'proximity' if elevation is None else 'descent'
+        if elevation is None: down, order = graded_directions(raster)
+        else: down, order = descent_directions(raster, elevation)
+        self.down = down
+
+        # Runoff generated per cell, then passed downstream, upstream first
+        coeff = _surfaces(raster)
+        depth = rainfall_mm / 1000.0 * raster.grid_unit * raster.grid_unit
+        acc = array.array('d', [0.0]) * raster.n
+        for i in order: acc[i] = coeff[i] * depth
+        self.runoff = sum(acc)
+        for i in order:
+            d = down[i]
+            if d >= 0: acc[d] += acc[i]
+        self.accumulation = acc
+
+        # Catchment label: the cistern block each cell ends up in, downstream first
+        owner = raster.owner; code = raster.code
+        cistern = TYPE_CODES['cistern']
+        label = array.array('i', [-1]) * raster.n
+        for k in range(len(order) - 1, -1, -1):
+            i = order[k]
+            if code[i] == cistern: label[i] = owner[i]
+            elif down[i] >= 0: label[i] = label[down[i]]
+        self.catchment = label
+
+        cell_area = raster.grid_unit * raster.grid_unit
+        self.cisterns = {}   # block index -> [catchment m2, inflow m3]
+        for b in raster.blocks:
+            if b.type == 'cistern': self.cisterns[b.index] = [0.0, 0.0]
+        for i in order:
+            c = label[i]
+            if c < 0: continue
+            self.cisterns[c][0] += cell_area
+            if code[i] == cistern: self.cisterns[c][1] += acc[i]
+        self.captured = sum(v[1] for v in self.cisterns.values())
+
+    def summary(self):
+        """Flat record of the layout's scores; 'routing' says how water was assigned."""
+        areas = [v[0] for v in self.cisterns.values()]
+        return {
+            'routing': self.routing,
+            'runoff_m3': self.runoff,
+            'captured_m3': self.captured,
+            'captured_fraction': min(1.0, self.captured / self.runoff) if self.runoff else 0.0,
+            'cisterns': len(areas),
+            'mean_catchment_m2': sum(areas) / len(areas) if areas else 0.0,
+            'max_catchment_m2': max(areas) if areas else 0.0,
+        }
+
+
+def hydrology(settlement, boundary=None, rainfall_mm=RAINFALL_MM, elevation=None):
+    return Hydrology(Raster(settlement, boundary), rainfall_mm, elevation)
+
+
+def hydrology_batch(settlements, boundary=None, rainfall_mm=RAINFALL_MM, elevation=None):
+    """
+    Yield summary() for each settlement. The boundary is rasterised once
+    for the whole batch; settlements may be a generator.
+    """
+    mask = None
+    for s in settlements:
+        if mask is None and boundary is not None: mask = boundary.cell_mask(s.grid_unit)
+        yield Hydrology(Raster(s, mask=mask), rainfall_mm, elevation).summary()
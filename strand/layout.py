@@ -0,0 +1,54 @@
+"""
+Save / load generated layouts so a settlement can be grown further in a
+later session (see growth.extend).
+
+JSON layout, version 1:
+    {"version": 1, "grid_unit": 3.75, "next_cluster_id": 12, "area": 1234.5,
+     "blocks": [[gx, gy, gw, gh, type, cluster_id, attach_side, parent_index], ...],
+     "tunnel_tips": [block_index, ...]}
+"""
+from strand.blocks import Block
+from strand.settlement import Settlement
+
+LAYOUT_VERSION = 1
+
+
+def settlement_to_dict(settlement):
+    rows = []
+    for b in settlement.blocks:
+        parent = b.parent.index if b.parent is not None else -1
+        rows.append([b.gx, b.gy, b.gw, b.gh, b.type, b.cluster_id, b.attach_side, parent])
+    return {
+        'version': LAYOUT_VERSION,
+        'grid_unit': settlement.grid_unit,
+        'next_cluster_id': settlement.next_cluster_id,
+        'area': settlement.area,
+        'blocks': rows,
+        'tunnel_tips': [t.index for t in settlement.tunnel_tips],
+    }
+
+
+def settlement_from_dict(data):
+    if data.get('version') != LAYOUT_VERSION:
+        raise ValueError("Unsupported layout version: %r" % data.get('version'))
+
+    s = Settlement(data['grid_unit'])
+    for gx, gy, gw, gh, b_type, cluster_id, side, parent in data['blocks']:
+        # Parents always precede their children, so the index is already resolved
+        p = s.blocks[parent] if parent >= 0 else None
+        s.add(Block(gx, gy, gw, gh, b_type, cluster_id, side, p))
+    s.tunnel_tips = [s.blocks[i] for i in data['tunnel_tips']]
+    s.next_cluster_id = max(s.next_cluster_id, data['next_cluster_id'])
+    return s
+
+
+def save_layout(settlement, path):
+    import json
+    with open(path, 'w') as f:
+        json.dump(settlement_to_dict(settlement), f, separators=(',', ':'))
+
+
+def load_layout(path):
+    import json
+    with open(path) as f:
+        return settlement_from_dict(json.load(f))
@@ -0,0 +1,47 @@
+"""
+Lightcore positions (metres). Same perimeter ring as generate_light_matrix
+in the scripts, returned as plain centres so analysis code needs no Rhino.
+"""
+
+# Ring sits one LIGHT_SPACING step in from the walls
+OFFSET_IDX = 1
+
+
+def light_lattice(block, cfg):
+    """
+    (cols, rows, ox, oy) of the LIGHT_SPACING lattice centred in the block:
+    lattice point (i, j) sits at (ox + i * spacing, oy + j * spacing).
+    """
+    g = cfg.GRID_UNIT; spacing = cfg.LIGHT_SPACING
+    w_m = block.gw * g; h_m = block.gh * g
+    cols = int(w_m / spacing); rows = int(h_m / spacing)
+    margin_x = (w_m - (cols * spacing)) / 2.0
+    margin_y = (h_m - (rows * spacing)) / 2.0
+    ox = block.gx * g + margin_x + spacing / 2.0
+    oy = block.gy * g + margin_y + spacing / 2.0
+    return cols, rows, ox, oy
+
+
+def ring_indices(cols, rows):
+    """Lattice points (i, j) of the lightcore ring, in generate_light_matrix order."""
+    # Room too small to have a ring with space in the middle
+    if cols <= (OFFSET_IDX * 2) or rows <= (OFFSET_IDX * 2): return []
+
+    lo = OFFSET_IDX; hi_i = cols - 1 - OFFSET_IDX; hi_j = rows - 1 - OFFSET_IDX
+    ring = []
+    for i in range(cols):
+        for j in range(rows):
+            on_x_ring = (i == lo or i == hi_i)
+            on_y_ring = (j == lo or j == hi_j)
+            in_x_range = (lo <= i <= hi_i)
+            in_y_range = (lo <= j <= hi_j)
+            if (on_x_ring and in_y_range) or (on_y_ring and in_x_range):
+                ring.append((i, j))
+    return ring
+
+
+def light_centres(block, cfg):
+    if block.type not in cfg.LIGHT_TYPES: return []
+    cols, rows, ox, oy = light_lattice(block, cfg)
+    spacing = cfg.LIGHT_SPACING
+    return [(ox + i * spacing, oy + j * spacing) for (i, j) in ring_indices(cols, rows)]
@@ -0,0 +1,148 @@
+"""
+Layout metrics in one pass over the block store.
+
+layout_metrics() reads a Settlement or a memory-mapped PackedLayout column
+by column and returns a flat record of numbers (see FIELDS), ready for a
+CSV row or a sweep over thousands of seeds:
+
+    blocks, clusters, area_total      counts and built area (m2, tunnels excluded)
+    count_<type>, area_<type>         per block type
+    ratio_living, ratio_prod          living / prod units per gathering hub
+    ratio_error                       L1 distance of the living:gather:prod
+                                      mix from UNIT_RATIOS (0 = exact)
+    cluster_blocks_*, cluster_area_mean   cluster sizes
+    block_pa_mean, cluster_pa_mean    perimeter / area (1/m) of the units and
+                                      of each cluster's outline
+    drainage_length                   outline of every built cell (m), the
+                                      line the drainage band follows; the
+                                      band's own offset is not added
+    lights, lights_<type>             lightcores (see strand.lighting)
+    fill                              area_total / boundary area, with a boundary
+
+Outlines are counted on bit-packed rows, one integer per grid row, so the
+perimeter of a cluster is a few XORs and popcounts per row rather than a
+test of every cell edge. Lightcore counts have a closed form per room size
+and are cached by size.
+"""
+from strand.blocks import BLOCK_TYPES
+from strand.config import Config
+
+UNIT_TYPES = tuple(t for t in BLOCK_TYPES if t != 'void')
+RATIO_TYPES = ('gather', 'living', 'prod')
+
+FIELDS = (('blocks', 'clusters', 'area_total') +
+          tuple('count_' + t for t in UNIT_TYPES) + tuple('area_' + t for t in UNIT_TYPES) +
+          ('ratio_living', 'ratio_prod', 'ratio_error',
+           'cluster_blocks_mean', 'cluster_blocks_min', 'cluster_blocks_max', 'cluster_area_mean',
+           'block_pa_mean', 'cluster_pa_mean', 'drainage_length', 'lights') +
+          tuple('lights_' + t for t in UNIT_TYPES) + ('fill',))
+
+
+def _popcount(x):
+    return bin(x).count('1')
+
+
+def outline_edges(rows):
+    """Cell edges on the outline of the cells set in rows ({y: bits})."""
+    edges = 0
+    for y, r in rows.items():
+        # Runs along the row: both ends of each run
+        edges += _popcount(r ^ (r << 1))
+        # Across rows: bits set on one side only (missing rows are empty)
+        edges += _popcount(r ^ rows.get(y - 1, 0))
+        if y + 1 not in rows: edges += _popcount(r)
+    return edges
+
+
+def ring_count(cols, rows):
+    # len(lighting.ring_indices(cols, rows)) without building the ring
+    a = cols - 2; b = rows - 2
+    if a < 1 or b < 1: return 0
+    if a == 1 or b == 1: return a * b
+    return 2 * (a + b) - 4
+
+
+def _columns(source):
+    # (grid unit, gx, gy, gw, gh, type names by code, type codes, cluster ids)
+    if hasattr(source, 'column'):
+        col = source.column
+        return (source.meta['grid_unit'], col('GX  '), col('GY  '), col('GW  '), col('GH  '),
+                source.types, col('TYPE'), col('CLID'))
+    blocks = source.blocks
+    codes = dict((t, i) for i, t in enumerate(BLOCK_TYPES))
+    return (source.grid_unit, [b.gx for b in blocks], [b.gy for b in blocks], [b.gw for b in blocks],
+            [b.gh for b in blocks], BLOCK_TYPES, [codes[b.type] for b in blocks], [b.cluster_id for b in blocks])
+
+
+def layout_metrics(source, config=None, boundary=None):
+    """Flat {field: number} record for a Settlement or PackedLayout (see FIELDS)."""
+    cfg = config or Config()
+    g, gx, gy, gw, gh, names, types, clid = _columns(source)
+    spacing = cfg.LIGHT_SPACING
+    light_types = set(cfg.LIGHT_TYPES)
+
+    count = dict((t, 0) for t in UNIT_TYPES)
+    cells = dict((t, 0) for t in UNIT_TYPES)
+    lights = dict((t, 0) for t in UNIT_TYPES)
+    ring_cache = {}
+    pa_sum = 0.0; pa_n = 0
+    origin = min(gx) if len(gx) else 0
+    built = {}            # y -> bits of every built cell
+    by_cluster = {}       # cluster id -> [blocks, cells, {y: bits}]
+
+    for i in range(len(gx)):
+        t = names[types[i]]
+        if t == 'void': continue
+        w = gw[i]; h = gh[i]
+        count[t] += 1; cells[t] += w * h
+        span = ((1 << w) - 1) << (gx[i] - origin)
+        y0 = gy[i]
+        for y in range(y0, y0 + h): built[y] = built.get(y, 0) | span
+        if t == 'tunnel': continue
+
+        pa_sum += 2.0 * (w + h) / (w * h * g); pa_n += 1
+        c = by_cluster.get(clid[i])
+        if c is None: c = by_cluster[clid[i]] = [0, 0, {}]
+        c[0] += 1; c[1] += w * h
+        rows = c[2]
+        for y in range(y0, y0 + h): rows[y] = rows.get(y, 0) | span
+        if t in light_types:
+            key = (w, h)
+            n = ring_cache.get(key)
+            if n is None: n = ring_cache[key] = ring_count(int(w * g / spacing), int(h * g / spacing))
+            lights[t] += n
+
+    cell_area = g * g
+    out = {'blocks': sum(count.values()), 'clusters': len(by_cluster)}
+    out['area_total'] = sum(cells[t] for t in UNIT_TYPES if t != 'tunnel') * cell_area
+    for t in UNIT_TYPES:
+        out['count_' + t] = count[t]
+        out['area_' + t] = cells[t] * cell_area
+        out['lights_' + t] = lights[t]
+    out['lights'] = sum(lights.values())
+
+    hubs = count['gather']
+    out['ratio_living'] = count['living'] / float(hubs) if hubs else 0.0
+    out['ratio_prod'] = count['prod'] / float(hubs) if hubs else 0.0
+    target = cfg.UNIT_RATIOS
+    t_total = float(sum(target.get(t, 0) for t in RATIO_TYPES))
+    a_total = float(sum(count[t] for t in RATIO_TYPES))
+    out['ratio_error'] = sum(abs(count[t] / a_total - target.get(t, 0) / t_total)
+                             for t in RATIO_TYPES) if a_total and t_total else 0.0
+
+    sizes = [c[0] for c in by_cluster.values()]
+    n = len(sizes)
+    out['cluster_blocks_mean'] = sum(sizes) / float(n) if n else 0.0
+    out['cluster_blocks_min'] = min(sizes) if n else 0
+    out['cluster_blocks_max'] = max(sizes) if n else 0
+    out['cluster_area_mean'] = sum(c[1] for c in by_cluster.values()) * cell_area / n if n else 0.0
+    out['block_pa_mean'] = pa_sum / pa_n if pa_n else 0.0
+    out['cluster_pa_mean'] = sum(outline_edges(c[2]) / (c[1] * g) for c in by_cluster.values()) / n if n else 0.0
+    out['drainage_length'] = outline_edges(built) * g
+    out['fill'] = out['area_total'] / boundary.area if boundary is not None and boundary.area else 0.0
+    return out
+
+
+def metrics_row(record):
+    """The record's values in FIELDS order, e.g. for csv.writer."""
+    return [record[k] for k in FIELDS]
@@ -0,0 +1,188 @@
+"""
+Circulation network over placed blocks, maintained while they are placed.
+
+A new block is linked to every placed block it shares a wall segment with
+(a door), found by owner lookups on the ring of cells around it, and to
+its parent when either of the two is a tunnel. Blocks kept apart by a
+road or a distanced anchor are therefore not linked, whatever their
+parent. Edge weights are the Manhattan distance between block centres in
+metres, a walking-distance proxy.
+
+Connectivity uses union-find with union by size and an undo log instead
+of path compression, so a cluster rollback can be undone exactly; finds
+are O(log n) worst case, effectively constant at settlement sizes.
+"""
+import heapq
+
+
+def shares_wall(a, b):
+    if a.max_x == b.min_x or b.max_x == a.min_x:
+        return min(a.max_y, b.max_y) > max(a.min_y, b.min_y)
+    if a.max_y == b.min_y or b.max_y == a.min_y:
+        return min(a.max_x, b.max_x) > max(a.min_x, b.min_x)
+    return False
+
+
+def walk_length(a, b, grid_unit):
+    dx = abs((2 * a.gx + a.gw) - (2 * b.gx + b.gw))
+    dy = abs((2 * a.gy + a.gh) - (2 * b.gy + b.gh))
+    return (dx + dy) * grid_unit / 2.0
+
+
+class Network:
+    def __init__(self, grid_unit):
+        self.grid_unit = grid_unit
+        self.blocks = []
+        self.adj = []        # index -> [(neighbour index, metres), ...]
+        self.uf_parent = []
+        self.uf_size = []
+        self.undo = []       # per block: roots merged away by its links, in order
+        self.hubs = {}       # cluster id -> index of its first gather block
+        self.components = 0
+
+    # --- UNION-FIND ---
+    def find(self, i):
+        parent = self.uf_parent
+        while parent[i] != i: i = parent[i]
+        return i
+
+    def connected(self, a, b):
+        return self.find(a) == self.find(b)
+
+    def is_connected(self):
+        return self.components <= 1
+
+    def largest_component(self):
+        """Number of blocks in the largest connected component."""
+        size = self.uf_size; best = 0
+        for i in range(len(self.blocks)):
+            if self.uf_parent[i] == i and size[i] > best: best = size[i]
+        return best
+
+    # --- INCREMENTAL UPDATES ---
+    def neighbours(self, block, occupancy=None):
+        """Indices of placed blocks sharing a wall with block, ascending."""
+        blocks = self.blocks
+        found = set()
+        if occupancy is None:
+            for b in blocks:
+                if b is not block and shares_wall(block, b): found.add(b.index)
+            return sorted(found)
+        owner = occupancy.owner
+        ring = [(x, block.min_y - 1) for x in range(block.min_x, block.max_x)]
+        ring.extend((x, block.max_y) for x in range(block.min_x, block.max_x))
+        ring.extend((block.min_x - 1, y) for y in range(block.min_y, block.max_y))
+        ring.extend((block.max_x, y) for y in range(block.min_y, block.max_y))
+        for x, y in ring:
+            b = owner(x, y)
+            # Voids and blocks of another layout are not part of the network
+            i = getattr(b, 'index', -1)
+            if b is not None and 0 <= i < len(blocks) and blocks[i] is b and b is not block: found.add(i)
+        return sorted(found)
+
+    def _link(self, i, j):
+        # Edge i - j; returns the root merged away, or -1
+        w = walk_length(self.blocks[i], self.blocks[j], self.grid_unit)
+        self.adj[i].append((j, w))
+        self.adj[j].append((i, w))
+        ra = self.find(i); rb = self.find(j)
+        if ra == rb: return -1
+        if self.uf_size[ra] > self.uf_size[rb]: ra, rb = rb, ra
+        self.uf_parent[ra] = rb
+        self.uf_size[rb] += self.uf_size[ra]
+        self.components -= 1
+        return ra
+
+    def add(self, block, occupancy=None):
+        """
+        Link block into the network. occupancy is the index block was just
+        added to; without one the wall test runs against every block.
+        """
+        i = len(self.blocks)
+        self.blocks.append(block)
+        self.adj.append([])
+        self.uf_parent.append(i)
+        self.uf_size.append(1)
+        self.components += 1
+        if block.type == 'gather' and block.cluster_id not in self.hubs: self.hubs[block.cluster_id] = i
+
+        links = self.neighbours(block, occupancy)
+        p = block.parent
+        if (p is not None and 0 <= p.index < i and self.blocks[p.index] is p and p.index not in links
+                and (p.type == 'tunnel' or block.type == 'tunnel')):
+            links.append(p.index)
+        merged = []
+        for j in links:
+            root = self._link(i, j)
+            if root >= 0: merged.append(root)
+        self.undo.append(merged)
+
+    def truncate(self, n):
+        # Drop blocks n.. again, newest first (cluster rollback)
+        while len(self.blocks) > n:
+            i = len(self.blocks) - 1
+            for merged in reversed(self.undo.pop()):
+                root = self.uf_parent[merged]
+                self.uf_parent[merged] = merged
+                self.uf_size[root] -= self.uf_size[merged]
+                self.components += 1
+            for j, w in self.adj[i]:
+                self.adj[j] = [e for e in self.adj[j] if e[0] != i]
+            block = self.blocks.pop()
+            self.adj.pop(); self.uf_parent.pop(); self.uf_size.pop()
+            self.components -= 1
+            if self.hubs.get(block.cluster_id) == i: del self.hubs[block.cluster_id]
+
+    # --- QUERIES ---
+    def distances_from(self, source, targets=None):
+        """Walking distance from one block to every reachable block (or until all targets are settled)."""
+        dist = {source: 0.0}
+        remaining = set(targets) if targets is not None else None
+        heap = [(0.0, source)]
+        while heap:
+            d, i = heapq.heappop(heap)
+            if d > dist[i]: continue
+            if remaining is not None:
+                remaining.discard(i)
+                if not remaining: break
+            for j, w in self.adj[i]:
+                nd = d + w
+                if nd < dist.get(j, float('inf')):
+                    dist[j] = nd
+                    heapq.heappush(heap, (nd, j))
+        return dist
+
+    def hub_reach(self, b_types=('living', 'prod', 'cistern')):
+        """(units connected to their cluster's hub, units) over blocks of b_types."""
+        reached = total = 0
+        hubs = self.hubs
+        for b in self.blocks:
+            if b.type not in b_types: continue
+            total += 1
+            hub = hubs.get(b.cluster_id)
+            if hub is not None and self.connected(b.index, hub): reached += 1
+        return reached, total
+
+    def path_length(self, a, b):
+        if not self.connected(a, b): return None
+        return self.distances_from(a, [b]).get(b)
+
+    def hub_distances(self, cluster_id, b_type='living'):
+        """Walking distance from the cluster's hub to each of its blocks of b_type (None = unreachable)."""
+        members = [b.index for b in self.blocks if b.cluster_id == cluster_id and b.type == b_type]
+        hub = self.hubs.get(cluster_id)
+        if hub is None: return dict((i, None) for i in members)
+        dist = self.distances_from(hub, members)
+        return dict((i, dist.get(i)) for i in members)
+
+    def all_hub_distances(self, b_type='living'):
+        """One search per hub, bounded to its own cluster's members: {cluster id: {index: metres or None}}."""
+        members = {}
+        for b in self.blocks:
+            if b.type == b_type: members.setdefault(b.cluster_id, []).append(b.index)
+        out = {}
+        for cid, idx in members.items():
+            hub = self.hubs.get(cid)
+            dist = self.distances_from(hub, idx) if hub is not None else {}
+            out[cid] = dict((i, dist.get(i)) for i in idx)
+        return out
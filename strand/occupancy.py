@@ -0,0 +1,91 @@
+"""
+Cell occupancy index. Replaces the linear check_overlap scan so an
+overlap test costs the candidate's footprint, not the settlement's size.
+
+Every occupancy backend (see settlement.OCCUPANCY) offers the same calls:
+add, remove, add_void, owner, is_free, collides, collides_rect and
+free_run, plus a `planar` flag. The planar ones answer gap rules from a
+shared GapLayer (see strand.gaps) and only scan the ring around a rect
+when the layer cannot decide.
+"""
+from strand.gaps import GapLayer
+
+
+class OccupancyGrid:
+    planar = True
+
+    def __init__(self, config=None):
+        self.cells = {}
+        self.gaps = GapLayer(config)
+
+    def add(self, block):
+        cells = self.cells
+        for x in range(block.min_x, block.max_x):
+            for y in range(block.min_y, block.max_y):
+                cells[(x, y)] = block
+        self.gaps.add(block)
+
+    def remove(self, block):
+        cells = self.cells
+        for x in range(block.min_x, block.max_x):
+            for y in range(block.min_y, block.max_y):
+                if cells.get((x, y)) is block: del cells[(x, y)]
+        self.gaps.remove(block)
+
+    def add_void(self, block):
+        # Voids block cells but never overwrite a placed block
+        cells = self.cells
+        for x in range(block.min_x, block.max_x):
+            for y in range(block.min_y, block.max_y):
+                cells.setdefault((x, y), block)
+
+    def owner(self, x, y):
+        return self.cells.get((x, y))
+
+    def free_run(self, x, y, dx, dy, cap):
+        """Free cells in a straight line from (x, y) in steps of (dx, dy), up to cap."""
+        cells = self.cells
+        n = 0
+        while n < cap and (x, y) not in cells:
+            n += 1; x += dx; y += dy
+        return n
+
+    def is_free(self, min_x, min_y, max_x, max_y, b_type=None):
+        cells = self.cells
+        for x in range(min_x, max_x):
+            for y in range(min_y, max_y):
+                if (x, y) in cells: return False
+        return True
+
+    def collides(self, block, cluster_gap=0, cistern_gap=0, exempt=None):
+        return self.collides_rect(block.min_x, block.min_y, block.max_x, block.max_y,
+                                  block.type, block.cluster_id, cluster_gap, cistern_gap, exempt)
+
+    def collides_rect(self, min_x, min_y, max_x, max_y, b_type, cluster_id, cluster_gap=0, cistern_gap=0, exempt=None):
+        """
+        Gap rules of the scripts' check_overlap in one pass:
+        - nothing may overlap the rect itself
+        - blocks of another cluster keep cluster_gap cells away (voids and
+          the `exempt` parent excepted)
+        - cisterns keep cistern_gap cells from other cisterns
+        """
+        if not self.is_free(min_x, min_y, max_x, max_y): return True
+
+        is_cistern = b_type == 'cistern'
+        reach = max(cluster_gap, cistern_gap if is_cistern else 0)
+        if reach <= 0: return False
+        gaps = self.gaps
+        if gaps.answers(cluster_gap, cistern_gap, is_cistern):
+            if not gaps.hits(min_x, min_y, max_x, max_y, is_cistern, cluster_id): return False
+            if exempt is None: return True
+
+        cells = self.cells
+        for x in range(min_x - reach, max_x + reach):
+            dx = max(min_x - x, x - max_x + 1, 0)
+            for y in range(min_y - reach, max_y + reach):
+                e = cells.get((x, y))
+                if e is None or e is exempt or e.type == 'void': continue
+                required = cluster_gap if e.cluster_id != cluster_id else 0
+                if is_cistern and e.type == 'cistern' and cistern_gap > required: required = cistern_gap
+                if required and max(dx, min_y - y, y - max_y + 1) <= required: return True
+        return False
@@ -0,0 +1,211 @@
+"""
+Columnar binary layout file (.strand) for large settlements.
+
+Every block field is stored as its own fixed-width column, so a reader can
+memory-map the file and slice by type or cluster without building Block
+objects or touching geometry. Layout (little-endian):
+
+    header    '<4sHHI'    magic b'STRL', version, reserved, section count
+    directory '<4sc3xQQ'  per section: name, array typecode, byte offset, item count
+    sections  8-byte aligned arrays
+
+Sections: GX GY GW GH CLID PRNT TIPS (int32), TYPE (uint8, see
+blocks.BLOCK_TYPES), SIDE (int8, -1 = none), MASK (boundary cell mask,
+one bit per cell, rows padded to whole bytes) and META (UTF-8 JSON with
+grid unit, area, seed, config hash and mask extent).
+"""
+import array
+import binascii
+import struct
+import sys
+
+from strand.blocks import Block, BLOCK_TYPES, TYPE_CODES
+from strand.settlement import Settlement
+
+MAGIC = b'STRL'
+PACKED_VERSION = 1
+
+_HEADER = struct.Struct('<4sHHI')
+_ENTRY = struct.Struct('<4sc3xQQ')
+_LITTLE = sys.byteorder == 'little'
+
+_INT_COLUMNS = ('GX  ', 'GY  ', 'GW  ', 'GH  ', 'CLID', 'PRNT')
+
+
+def _int_to_bytes(value, n):
+    # Little-endian, works on IronPython 2.7 which lacks int.to_bytes
+    if n == 0: return b''
+    return binascii.unhexlify('%0*x' % (2 * n, value))[::-1]
+
+
+def _bytes_to_int(data):
+    data = bytes(data)
+    if not data: return 0
+    return int(binascii.hexlify(data[::-1]), 16)
+
+
+def _typed(typecode, values):
+    a = array.array(typecode, values)
+    if not _LITTLE: a.byteswap()
+    return a
+
+
+def write_packed(path, settlement, boundary=None, seed=None, config=None, metadata=None):
+    import json
+    blocks = settlement.blocks
+    columns = [
+        ('GX  ', _typed('i', [b.gx for b in blocks])),
+        ('GY  ', _typed('i', [b.gy for b in blocks])),
+        ('GW  ', _typed('i', [b.gw for b in blocks])),
+        ('GH  ', _typed('i', [b.gh for b in blocks])),
+        ('CLID', _typed('i', [b.cluster_id for b in blocks])),
+        ('PRNT', _typed('i', [b.parent.index if b.parent is not None else -1 for b in blocks])),
+        ('TYPE', _typed('B', [TYPE_CODES[b.type] for b in blocks])),
+        ('SIDE', _typed('b', [b.attach_side if b.attach_side is not None else -1 for b in blocks])),
+        ('TIPS', _typed('i', [t.index for t in settlement.tunnel_tips])),
+    ]
+
+    meta = {
+        'grid_unit': settlement.grid_unit,
+        'area': settlement.area,
+        'next_cluster_id': settlement.next_cluster_id,
+        'seed': seed,
+        'config_hash': config.digest() if config is not None else None,
+        'types': list(BLOCK_TYPES),
+        'mask': None,
+    }
+    if metadata: meta['extra'] = metadata
+
+    if boundary is not None:
+        x0, y0, w, h, rows = boundary.cell_mask(settlement.grid_unit)
+        stride = (w + 7) // 8
+        mask = array.array('B', b''.join(_int_to_bytes(r, stride) for r in rows))
+        meta['mask'] = {'x0': x0, 'y0': y0, 'w': w, 'h': h, 'stride': stride}
+        columns.append(('MASK', mask))
+
+    columns.append(('META', array.array('B', json.dumps(meta, sort_keys=True).encode('utf-8'))))
+
+    offset = _HEADER.size + _ENTRY.size * len(columns)
+    entries = []
+    for name, col in columns:
+        offset = (offset + 7) & ~7
+        entries.append((name, col, offset))
+        offset += len(col) * col.itemsize
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, PACKED_VERSION, 0, len(columns)))
+        for name, col, off in entries:
+            f.write(_ENTRY.pack(name.encode('ascii'), col.typecode.encode('ascii'), off, len(col)))
+        for name, col, off in entries:
+            f.write(b'\0' * (off - f.tell()))
+            f.write(col.tostring() if not hasattr(col, 'tobytes') else col.tobytes())
+
+
+class PackedLayout:
+    """
+    Memory-mapped view of a .strand file. Columns are zero-copy memoryviews
+    on CPython; other runtimes fall back to copying into arrays.
+    """
+    def __init__(self, path):
+        import json, mmap
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._cols = {}
+
+        magic, version, _, n_sections = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC: raise ValueError("Not a Strand layout file: %s" % path)
+        if version != PACKED_VERSION: raise ValueError("Unsupported layout version: %d" % version)
+
+        self._sections = {}
+        for i in range(n_sections):
+            name, code, off, count = _ENTRY.unpack_from(self._map, _HEADER.size + i * _ENTRY.size)
+            self._sections[name.decode('ascii')] = (code.decode('ascii'), off, count)
+
+        self.meta = json.loads(bytes(self._raw('META')).decode('utf-8'))
+        self.types = tuple(self.meta['types'])
+        self.count = self._sections['GX  '][2]
+
+    def _raw(self, name):
+        code, off, count = self._sections[name]
+        size = array.array(code).itemsize
+        return memoryview(self._map)[off:off + count * size]
+
+    def column(self, name):
+        """Raw column by section name, e.g. 'GX  ', 'TYPE', 'CLID'."""
+        col = self._cols.get(name)
+        if col is None:
+            code = self._sections[name][0]
+            raw = self._raw(name)
+            try:
+                if not _LITTLE: raise TypeError
+                col = raw.cast(code)
+            except (AttributeError, TypeError):
+                col = array.array(code, bytes(raw))
+                if not _LITTLE and col.itemsize > 1: col.byteswap()
+            self._cols[name] = col
+        return col
+
+    # --- QUERIES ---
+    def select(self, b_type=None, cluster_id=None):
+        """Indices of blocks matching a type and/or cluster id."""
+        out = range(self.count)
+        if b_type is not None:
+            code = self.types.index(b_type)
+            types = self.column('TYPE')
+            out = [i for i in out if types[i] == code]
+        if cluster_id is not None:
+            clid = self.column('CLID')
+            out = [i for i in out if clid[i] == cluster_id]
+        return list(out)
+
+    def rect(self, i):
+        return (self.column('GX  ')[i], self.column('GY  ')[i], self.column('GW  ')[i], self.column('GH  ')[i])
+
+    def block_type(self, i):
+        return self.types[self.column('TYPE')[i]]
+
+    def tunnel_tips(self):
+        return list(self.column('TIPS'))
+
+    def mask_rows(self):
+        """Boundary mask as (x0, y0, w, h, rows) like Boundary.cell_mask, or None."""
+        m = self.meta['mask']
+        if m is None: return None
+        raw = self._raw('MASK'); stride = m['stride']
+        rows = [_bytes_to_int(raw[j * stride:(j + 1) * stride]) for j in range(m['h'])]
+        return m['x0'], m['y0'], m['w'], m['h'], rows
+
+    def to_settlement(self):
+        s = Settlement(self.meta['grid_unit'])
+        gx, gy, gw, gh = [self.column(n) for n in ('GX  ', 'GY  ', 'GW  ', 'GH  ')]
+        types, clid, side, prnt = self.column('TYPE'), self.column('CLID'), self.column('SIDE'), self.column('PRNT')
+        for i in range(self.count):
+            p = s.blocks[prnt[i]] if prnt[i] >= 0 else None
+            sd = side[i] if side[i] >= 0 else None
+            s.add(Block(gx[i], gy[i], gw[i], gh[i], self.types[types[i]], clid[i], sd, p))
+        s.tunnel_tips = [s.blocks[i] for i in self.column('TIPS')]
+        s.next_cluster_id = max(s.next_cluster_id, self.meta['next_cluster_id'])
+        return s
+
+    def close(self):
+        # Views must be released before the map can close
+        for col in self._cols.values():
+            if isinstance(col, memoryview): col.release()
+        self._cols = {}
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_packed(path):
+    return PackedLayout(path)
+
+
+def load_packed(path):
+    with PackedLayout(path) as layout:
+        return layout.to_settlement()
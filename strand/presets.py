@@ -0,0 +1,87 @@
+"""
+Each Rhino script as a configuration of the shared engine. The keys are
+the scripts' own constants plus the strategy names that reproduce their
+growth loops (see strand.strategies).
+"""
+from strand.config import Config
+
+_ALL_AREAS = {'gather': (800, 1050), 'living': (300, 450), 'prod': (30, 200), 'cistern': (100, 320)}
+
+PRESETS = {
+    # cluster_logic.py: touching units, side tunnels drawn from attach sides
+    'cluster_logic': dict(
+        DENSITY_LIMIT=0.85,
+        UNIT_RATIOS={'gather': 1, 'living': 3, 'prod': 15},
+        AREAS={'gather': (800, 1050), 'living': (300, 600), 'prod': (20, 200), 'cistern': (100, 320)},
+        CLUSTER_CISTERN=False, CISTERN_BUFFER=0,
+        QUEUE='ratio', PARENTS='global', TUNNELS=None, LIVING_FAIL='prod_only',
+        PARENT_SAMPLE=25, SKIP_AFTER_FAILS=None, MAX_FAILS=200, MAX_TOTAL_FAILS=None,
+        LIGHT_TYPES=('living', 'gather'),
+        OUTPUTS=('living', 'prod', 'gather', 'living_holes', 'prod_holes', 'gather_holes',
+                 'walls', 'side_tunnels', 'lights')),
+
+    # cisterns.py: one round cistern per cluster, unit-based drainage
+    'cisterns': dict(
+        AREAS=dict(_ALL_AREAS), CISTERN_BUFFER=0,
+        QUEUE='ratio', PARENTS='global', TUNNELS=None, LIVING_FAIL='abandon',
+        PARENT_SAMPLE=25, SKIP_AFTER_FAILS=None, MAX_FAILS=200, MAX_TOTAL_FAILS=None,
+        OUTPUTS=('living', 'prod', 'gather', 'cisterns', 'living_holes', 'prod_holes',
+                 'gather_holes', 'lights', 'drainage')),
+
+    # cisterns_tunnels.py / 251208_Script: every hub reached through a tunnel
+    'cisterns_tunnels': dict(
+        AREAS=dict(_ALL_AREAS), CISTERN_BUFFER=0,
+        QUEUE='ratio', PARENTS='global', TUNNELS='hub', LIVING_FAIL='abandon',
+        PARENT_SAMPLE=25, SKIP_AFTER_FAILS=None, MAX_FAILS=200, MAX_TOTAL_FAILS=None,
+        OUTPUTS=('living', 'prod', 'gather', 'cisterns', 'tunnels', 'living_holes',
+                 'prod_holes', 'gather_holes', 'lights', 'drainage')),
+
+    # cisterns_empty_spaces.py: as above, tunnels left as empty space
+    'cisterns_empty_spaces': dict(
+        AREAS=dict(_ALL_AREAS), CISTERN_BUFFER=0,
+        QUEUE='ratio', PARENTS='global', TUNNELS='hub', LIVING_FAIL='abandon',
+        PARENT_SAMPLE=25, SKIP_AFTER_FAILS=None, MAX_FAILS=200, MAX_TOTAL_FAILS=None,
+        OUTPUTS=('living', 'prod', 'gather', 'cisterns', 'living_holes', 'prod_holes',
+                 'gather_holes', 'lights', 'drainage')),
+
+    # temp,py: hubs chain from earlier tunnel tips. The Config defaults are
+    # this script, failure rules included: a failed living unit is simply
+    # retried, a unit is skipped after 50 misses in a row (fails % 50) and
+    # the run ends at 300 in a row, which every skip resets. The script has
+    # no cap on the total, so on a site it cannot fill it never stops;
+    # MAX_TOTAL_FAILS is kept far above what a fill needs (~40k misses on a
+    # 900 x 600 m site) purely as a guard against that.
+    'tunnel_chain': dict(),
+
+    # favourite.py: drainage buffer between clusters, hub-first clusters,
+    # cistern retry and cluster rollback
+    'favourite': dict(
+        AREAS=dict(_ALL_AREAS, cistern=(50, 320)), PROD_MAX=15,
+        CLUSTER_GAP=2, GAP_PARENT_EXEMPT=True,  # ceil(2 x DRAINAGE_WIDTH / GRID_UNIT)
+        PARENTS='hub', TUNNELS=None, LIVING_FAIL=None, CISTERN_FAIL='retry_rollback',
+        PARENT_SAMPLE=50, SKIP_AFTER_FAILS=51,  # the script skips once consecutive_fails > 50
+        MAX_FAILS=None, MAX_TOTAL_FAILS=1000,
+        OUTPUTS=('living', 'prod', 'gather', 'cisterns', 'living_holes', 'prod_holes',
+                 'gather_holes', 'lights', 'cluster_drainage', 'cluster_outlines')),
+
+    # favourite2.py: one-cell road between clusters, then a 2x2 filler pass
+    'favourite2': dict(
+        AREAS=dict(_ALL_AREAS, cistern=(50, 320)), PROD_MAX=15,
+        CLUSTER_GAP=1,
+        PARENTS='cluster', TUNNELS=None, LIVING_FAIL=None, POST_PROCESS=('filler',),
+        PARENT_SAMPLE=30, START_SAMPLE=50, SKIP_AFTER_FAILS=31, MAX_FAILS=None, MAX_TOTAL_FAILS=1500,
+        OUTPUTS=('living', 'prod', 'gather', 'cisterns', 'living_holes', 'prod_holes',
+                 'gather_holes', 'lights', 'empty', 'cluster_outlines')),
+}
+PRESETS['251208_Script'] = PRESETS['cisterns_tunnels']
+
+
+def preset(name, **overrides):
+    if name not in PRESETS:
+        raise KeyError("Unknown preset: %s (choose from %s)" % (name, ', '.join(sorted(PRESETS))))
+    cfg = Config(**PRESETS[name])
+    return cfg.update(**overrides)
+
+
+def empty_outputs(name):
+    return tuple([] for _ in preset(name).OUTPUTS)
@@ -0,0 +1,89 @@
+"""
+A settlement rasterised onto its grid cells, for the analysis passes.
+
+Every per-cell quantity is a flat row-major array (cell i is column
+i % w, row i // w of the raster, whose origin is grid cell (x0, y0)), so
+analyses run as linear passes over arrays instead of block-by-block
+geometry, and a boundary mask computed once can be shared by a whole
+batch of layouts.
+"""
+import array
+
+from strand.blocks import TYPE_CODES
+
+SOIL = -1   # Code of a cell no block owns
+
+
+class Raster:
+    def __init__(self, settlement, boundary=None, mask=None, pad=0):
+        """
+        mask is a precomputed boundary.cell_mask(grid_unit); pass it when
+        rasterising many layouts on the same boundary. Without a boundary
+        or mask, every cell of the blocks' bounding box (grown by pad cells)
+        counts as inside.
+        """
+        g = settlement.grid_unit
+        blocks = settlement.blocks
+        if mask is None and boundary is not None: mask = boundary.cell_mask(g)
+
+        if mask is not None:
+            x0, y0, w, h = mask[:4]
+            x1 = x0 + w; y1 = y0 + h
+        else:
+            x0 = y0 = x1 = y1 = None
+        for b in blocks:
+            if x0 is None or b.min_x < x0: x0 = b.min_x
+            if y0 is None or b.min_y < y0: y0 = b.min_y
+            if x1 is None or b.max_x > x1: x1 = b.max_x
+            if y1 is None or b.max_y > y1: y1 = b.max_y
+        if x0 is None: x0 = y0 = x1 = y1 = 0
+        x0 -= pad; y0 -= pad; x1 += pad; y1 += pad
+
+        self.grid_unit = g
+        self.x0 = x0; self.y0 = y0
+        self.w = w = x1 - x0; self.h = h = y1 - y0
+        self.n = n = w * h
+        self.blocks = blocks
+
+        self.code = array.array('b', [SOIL]) * n   # TYPE_CODES of the owner
+        self.owner = array.array('i', [-1]) * n    # Settlement.blocks index
+        if mask is None:
+            self.inside = bytearray([1]) * n
+        else:
+            self.inside = bytearray(n)
+            mx0, my0, mw, mh, rows = mask
+            for j in range(mh):
+                row = rows[j]; base = (my0 - y0 + j) * w + (mx0 - x0)
+                i = 0
+                while row:
+                    if row & 1: self.inside[base + i] = 1
+                    row >>= 1; i += 1
+
+        code = self.code; owner = self.owner; inside = self.inside
+        for k in range(len(blocks)):
+            b = blocks[k]
+            c = TYPE_CODES[b.type]
+            codes = array.array('b', [c]) * b.gw
+            owners = array.array('i', [k]) * b.gw
+            ones = bytearray([1]) * b.gw
+            for y in range(b.min_y, b.max_y):
+                i0 = (y - y0) * w + (b.min_x - x0); i1 = i0 + b.gw
+                code[i0:i1] = codes; owner[i0:i1] = owners; inside[i0:i1] = ones
+
+    def index(self, gx, gy):
+        """Raster index of grid cell (gx, gy), or -1 outside the raster."""
+        x = gx - self.x0; y = gy - self.y0
+        if 0 <= x < self.w and 0 <= y < self.h: return y * self.w + x
+        return -1
+
+    def cell(self, i):
+        return self.x0 + i % self.w, self.y0 + i // self.w
+
+    def centre(self, i):
+        """Centre of raster cell i in metres."""
+        g = self.grid_unit
+        return (self.x0 + i % self.w + 0.5) * g, (self.y0 + i // self.w + 0.5) * g
+
+    def cells_of(self, b_type):
+        c = TYPE_CODES[b_type]; code = self.code
+        return [i for i in range(self.n) if code[i] == c]
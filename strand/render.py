@@ -0,0 +1,189 @@
+"""
+Headless raster rendering of layouts into PNG tiles and contact sheets.
+
+A tile is the layout's cell grid as one byte per cell: a palette index for
+outside, open ground inside the boundary, and each block type. Layouts on
+the same boundary share one Frame, the boundary mask drawn once, so a tile
+is a copy of that frame with one slice assignment per block row. Pixels
+are only made at PNG time, where each cell becomes a scale x scale square
+of an indexed-colour image (extended-slice copies, no per-pixel Python).
+The PNG encoder is stdlib zlib, so nothing beyond Python is needed.
+
+render_seeds() grows and draws a batch of seeds across worker processes
+and assembles the tiles into contact sheets, row by row in seed order;
+render_packed() does the same for saved .strand files.
+"""
+import struct
+import zlib
+
+from strand.blocks import BLOCK_TYPES, TYPE_CODES
+from strand.export import iter_blocks
+
+OUTSIDE = 0
+GROUND = 1
+GAP = 2              # Sheet background between tiles
+_FIRST_TYPE = 3      # Palette index of BLOCK_TYPES[0]
+
+COLOURS = {'outside': (255, 255, 255), 'ground': (236, 228, 212), 'gap': (255, 255, 255),
+           'prod': (217, 164, 65), 'living': (192, 80, 77), 'gather': (79, 129, 189),
+           'cistern': (75, 172, 198), 'tunnel': (154, 154, 154), 'void': (90, 90, 90)}
+PALETTE = [COLOURS['outside'], COLOURS['ground'], COLOURS['gap']] + [COLOURS[t] for t in BLOCK_TYPES]
+
+
+class Frame:
+    """The boundary mask of one site as a base tile, shared by every layout on it."""
+    def __init__(self, boundary, grid_unit):
+        x0, y0, w, h, rows = boundary.cell_mask(grid_unit)
+        self.x0 = x0; self.y0 = y0; self.w = w; self.h = h
+        to_index = {ord('0'): OUTSIDE, ord('1'): GROUND}
+        base = bytearray(w * h)
+        for j in range(h):
+            # Bit i of the row is cell x0 + i; image rows run from the top (max y)
+            bits = ('{0:0%db}' % w).format(rows[j])[::-1][:w]
+            k = (h - 1 - j) * w
+            base[k:k + w] = bytearray(bits.translate(to_index), 'latin-1')
+        self.base = base
+
+
+def _bbox_frame(blocks):
+    # Frame without a boundary: the blocks' bounding box, all open ground
+    f = Frame.__new__(Frame)
+    xs0 = [b.min_x for b in blocks] or [0]; ys0 = [b.min_y for b in blocks] or [0]
+    xs1 = [b.max_x for b in blocks] or [0]; ys1 = [b.max_y for b in blocks] or [0]
+    f.x0 = min(xs0); f.y0 = min(ys0); f.w = max(xs1) - f.x0; f.h = max(ys1) - f.y0
+    f.base = bytearray([GROUND]) * (f.w * f.h)
+    return f
+
+
+def tile(source, frame=None):
+    """(w, h, pixels) of a Settlement or PackedLayout; one palette index per cell."""
+    if frame is None:
+        blocks = list(iter_blocks(source))
+        frame = _bbox_frame(blocks)
+    else: blocks = iter_blocks(source)
+    x0 = frame.x0; y0 = frame.y0; w = frame.w; h = frame.h
+    pix = bytearray(frame.base)
+    for b in blocks:
+        lo = max(b.min_x, x0); hi = min(b.max_x, x0 + w)
+        if hi <= lo: continue
+        run = bytearray([_FIRST_TYPE + TYPE_CODES[b.type]]) * (hi - lo)
+        for y in range(max(b.min_y, y0), min(b.max_y, y0 + h)):
+            k = (h - 1 - (y - y0)) * w + (lo - x0)
+            pix[k:k + hi - lo] = run
+    return w, h, pix
+
+
+# --- PNG ---
+def _chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def png_bytes(w, h, pixels, scale=1, palette=PALETTE):
+    """Indexed-colour PNG of a w x h grid of palette indices, each cell scale x scale px."""
+    out_w = w * scale
+    lines = []
+    row = bytearray(out_w + 1)   # Leading 0: no filter
+    for j in range(h):
+        cells = pixels[j * w:(j + 1) * w]
+        for k in range(scale): row[1 + k::scale] = cells
+        line = bytes(row)
+        for k in range(scale): lines.append(line)
+    plte = b''.join(struct.pack('BBB', *c) for c in palette)
+    return (b'\x89PNG\r\n\x1a\n' +
+            _chunk(b'IHDR', struct.pack('>IIBBBBB', out_w, h * scale, 8, 3, 0, 0, 0)) +
+            _chunk(b'PLTE', plte) +
+            _chunk(b'IDAT', zlib.compress(b''.join(lines), 6)) +
+            _chunk(b'IEND', b''))
+
+
+def write_png(path, w, h, pixels, scale=1):
+    with open(path, 'wb') as f:
+        f.write(png_bytes(w, h, pixels, scale))
+
+
+def contact_sheet(tiles, cols=None, gap=2):
+    """(w, h, pixels) of tiles laid out left to right, top to bottom, gap cells apart."""
+    n = len(tiles)
+    if cols is None:
+        cols = 1
+        while cols * cols < n: cols += 1
+    rows = (n + cols - 1) // cols if n else 0
+    cw = max([t[0] for t in tiles] or [0]); ch = max([t[1] for t in tiles] or [0])
+    sw = cols * cw + (cols + 1) * gap; sh = rows * ch + (rows + 1) * gap
+    sheet = bytearray([GAP]) * (sw * sh)
+    for i, (w, h, pix) in enumerate(tiles):
+        ox = gap + (i % cols) * (cw + gap); oy = gap + (i // cols) * (ch + gap)
+        for j in range(h):
+            k = (oy + j) * sw + ox
+            sheet[k:k + w] = pix[j * w:(j + 1) * w]
+    return sw, sh, sheet
+
+
+# --- BATCHES ---
+def _render_task(task):
+    # Runs in a worker process: one tile per task
+    kind = task[0]
+    if kind == 'seed':
+        _, boundary, cfg_dict, seed, frame = task
+        from strand.config import Config
+        from strand.growth import grow
+        return tile(grow(boundary, Config(**cfg_dict), seed), frame)
+    _, path, frame = task
+    from strand.packed import open_packed
+    with open_packed(path) as layout: return tile(layout, frame)
+
+
+def _map(tasks, workers):
+    if not workers or workers < 2 or len(tasks) < 2: return [_render_task(t) for t in tasks]
+    import multiprocessing
+    pool = multiprocessing.Pool(workers)
+    try: return pool.map(_render_task, tasks, chunksize=max(1, len(tasks) // (4 * workers)))
+    finally:
+        pool.close(); pool.join()
+
+
+def sheet_path(target, index, sheets):
+    """
+    Path of sheet `index`: '%d' in target is replaced by the index; with
+    several sheets and no '%d', '_<index>' goes before the extension. Any
+    other '%' is part of the path.
+    """
+    import os
+    if '%d' in target: return target.replace('%d', str(index))
+    if sheets < 2: return target
+    root, ext = os.path.splitext(target)
+    return '%s_%d%s' % (root, index, ext)
+
+
+def _sheets(tiles, target, per_sheet, cols, scale, gap):
+    per_sheet = per_sheet or len(tiles) or 1
+    sheets = (len(tiles) + per_sheet - 1) // per_sheet
+    paths = []
+    for s in range(0, len(tiles), per_sheet):
+        path = sheet_path(target, s // per_sheet, sheets)
+        w, h, pix = contact_sheet(tiles[s:s + per_sheet], cols, gap)
+        write_png(path, w, h, pix, scale)
+        paths.append(path)
+    return paths
+
+
+def render_seeds(boundary, config, seeds, target, workers=None, cols=None, scale=2, gap=2, per_sheet=None):
+    """Grow each seed, draw it and write contact sheet(s); returns the sheet paths."""
+    from strand.config import Config
+    cfg = config or Config()
+    boundary.prepare(cfg.GRID_UNIT)
+    frame = Frame(boundary, cfg.GRID_UNIT)
+    tasks = [('seed', boundary, cfg.to_dict(), seed, frame) for seed in seeds]
+    return _sheets(_map(tasks, workers), target, per_sheet, cols, scale, gap)
+
+
+def render_packed(paths, target, boundary=None, grid_unit=None, workers=None, cols=None, scale=2, gap=2, per_sheet=None):
+    """Contact sheet(s) of saved .strand layouts; pass the boundary to frame them alike."""
+    frame = None
+    if boundary is not None:
+        if grid_unit is None:
+            from strand.packed import open_packed
+            with open_packed(paths[0]) as layout: grid_unit = layout.meta['grid_unit']
+        frame = Frame(boundary, grid_unit)
+    tasks = [('packed', p, frame) for p in paths]
+    return _sheets(_map(tasks, workers), target, per_sheet, cols, scale, gap)
@@ -0,0 +1,148 @@
+"""
+Dense bit-packed row occupancy for word-parallel overlap tests.
+
+Each grid row is one Python integer with a bit per cell, so "is the span
+[min_x, max_x) free in rows min_y..max_y" is one AND per row however wide
+the span is: a 30 x 30 cell gathering hall costs 30 ANDs, not 900 lookups.
+Gap rules are read from the dilated layers of strand.gaps, so the ring
+around a candidate is not scanned. Owners are kept per cell for owner()
+and for the cases the layers cannot answer (a parent exemption, or gaps
+other than the ones they were grown with), which fall back to the ring scan.
+
+Unlike TiledGrid the rows span the whole built width, which is the faster
+layout for compact sites; bit 0 is cell x = -origin.
+"""
+from strand.gaps import GapLayer
+
+
+def _ones(n):
+    return (1 << n) - 1 if n > 0 else 0
+
+
+class RowMaskGrid:
+    planar = True
+
+    def __init__(self, config=None):
+        self.origin = 0
+        self.rows = {}       # y -> occupied bits
+        self.cells = {}      # (x, y) -> Block
+        self.gaps = GapLayer(config)
+
+    # --- MASKS ---
+    def _span(self, min_x, max_x):
+        lo = min_x + self.origin; hi = max_x + self.origin
+        if lo < 0: self._rebase(-lo); return self._span(min_x, max_x)
+        return _ones(hi - lo) << lo
+
+    def _rebase(self, shift):
+        # A block left of bit 0: move every row so negative x stay addressable
+        shift = max(shift, 64)
+        self.origin += shift
+        rows = self.rows
+        for y in rows: rows[y] <<= shift
+
+    def _query_span(self, min_x, max_x):
+        # Read-only spans are clipped at bit 0; nothing is stored left of it
+        lo = max(min_x + self.origin, 0); hi = max_x + self.origin
+        return _ones(hi - lo) << lo
+
+    def _paint(self, masks, min_x, min_y, max_x, max_y):
+        span = self._span(min_x, max_x)
+        for y in range(min_y, max_y):
+            masks[y] = masks.get(y, 0) | span
+
+    # --- UPDATES ---
+    def add(self, block):
+        cells = self.cells
+        for x in range(block.min_x, block.max_x):
+            for y in range(block.min_y, block.max_y):
+                cells[(x, y)] = block
+        self._paint(self.rows, block.min_x, block.min_y, block.max_x, block.max_y)
+        self.gaps.add(block)
+
+    def add_void(self, block):
+        # Voids block cells but never overwrite a placed block
+        cells = self.cells
+        for x in range(block.min_x, block.max_x):
+            for y in range(block.min_y, block.max_y):
+                cells.setdefault((x, y), block)
+        self._paint(self.rows, block.min_x, block.min_y, block.max_x, block.max_y)
+
+    def remove(self, block):
+        cells = self.cells; rows = self.rows
+        for y in range(block.min_y, block.max_y):
+            bits = rows.get(y, 0)
+            for x in range(block.min_x, block.max_x):
+                if cells.get((x, y)) is block:
+                    del cells[(x, y)]
+                    bits &= ~(1 << (x + self.origin))
+            rows[y] = bits
+        self.gaps.remove(block)
+
+    # --- QUERIES ---
+    def owner(self, x, y):
+        return self.cells.get((x, y))
+
+    def is_free(self, min_x, min_y, max_x, max_y, b_type=None):
+        rows = self.rows
+        span = self._query_span(min_x, max_x)
+        for y in range(min_y, max_y):
+            if rows.get(y, 0) & span: return False
+        return True
+
+    def free_run(self, x, y, dx, dy, cap):
+        """Free cells in a straight line from (x, y) in steps of (dx, dy), up to cap."""
+        p = x + self.origin
+        if dy == 0:
+            row = self.rows.get(y, 0)
+            if dx > 0:
+                bits = row >> p if p >= 0 else row << -p
+                return min((bits & -bits).bit_length() - 1, cap) if bits else cap
+            if p < 0: return cap
+            bits = row & _ones(p + 1)
+            return min(p - bits.bit_length() + 1, cap) if bits else cap
+        rows = self.rows
+        n = 0
+        if p < 0: return cap
+        while n < cap and not rows.get(y, 0) >> p & 1:
+            n += 1; y += dy
+        return n
+
+    def collides(self, block, cluster_gap=0, cistern_gap=0, exempt=None):
+        return self.collides_rect(block.min_x, block.min_y, block.max_x, block.max_y,
+                                  block.type, block.cluster_id, cluster_gap, cistern_gap, exempt)
+
+    def collides_rect(self, min_x, min_y, max_x, max_y, b_type, cluster_id, cluster_gap=0, cistern_gap=0, exempt=None):
+        """The gap rules of OccupancyGrid.collides_rect, on the bit rows."""
+        rows = self.rows
+        span = self._query_span(min_x, max_x)
+        for y in range(min_y, max_y):
+            if rows.get(y, 0) & span: return True
+
+        is_cistern = b_type == 'cistern'
+        if cluster_gap <= 0 and not (is_cistern and cistern_gap > 0): return False
+        gaps = self.gaps
+        if gaps.answers(cluster_gap, cistern_gap, is_cistern):
+            if not gaps.hits(min_x, min_y, max_x, max_y, is_cistern, cluster_id): return False
+            if exempt is None: return True
+        return self._ring_collides(min_x, min_y, max_x, max_y, is_cistern, cluster_id, cluster_gap, cistern_gap, exempt)
+
+    def _ring_collides(self, min_x, min_y, max_x, max_y, is_cistern, cluster_id, cluster_gap, cistern_gap, exempt):
+        # Exact scan of the set bits around a free rect, as TiledGrid does per tile
+        reach = max(cluster_gap, cistern_gap if is_cistern else 0)
+        rows = self.rows; cells = self.cells; origin = self.origin
+        span = self._query_span(min_x - reach, max_x + reach)
+        for y in range(min_y - reach, max_y + reach):
+            bits = rows.get(y, 0) & span
+            if not bits: continue
+            dy = max(min_y - y, y - max_y + 1, 0)
+            while bits:
+                low = bits & -bits
+                bits ^= low
+                x = low.bit_length() - 1 - origin
+                e = cells[(x, y)]
+                if e is exempt or e.type == 'void': continue
+                required = cluster_gap if e.cluster_id != cluster_id else 0
+                if is_cistern and e.type == 'cistern' and cistern_gap > required: required = cistern_gap
+                if required and max(dy, min_x - x, x - max_x + 1) <= required: return True
+        return False
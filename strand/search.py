@@ -0,0 +1,220 @@
+"""
+Search over seeds and growth parameters for the best-scoring layout.
+
+A candidate is a point in the unit cube, decoded into Config overrides
+(DENSITY_LIMIT, the AREAS ranges, LIVING_MIN/MAX, PROD_MIN/MAX) and paired
+with a seed drawn from a small pool fixed per search (SEED_POOL), so a
+(config, seed) pair can come round again. Values are rounded to coarse
+steps and clamped to the cube; a candidate that decodes to a configuration
+already grown with the same seed (a repeated or clamped point, a restart
+revisiting a region, a duplicate within one generation) is answered by the
+memo, keyed on config digest + seed, without growing anything.
+
+METHODS:
+    'random'     independent uniform draws (pure random restarts)
+    'evolution'  (mu, lambda) evolution with a fixed mutation width
+    'cma'        the same with per-parameter step sizes adapted from the
+                 selected steps (separable, diagonal CMA)
+
+Both evolutionary methods restart from fresh random means `restarts` times.
+Candidates of one generation are grown in parallel worker processes when
+workers > 1. A run is aborted early once its built area falls clearly
+behind the incumbent's at the same number of attempts; it scores -inf and
+never becomes the best. The budget caps evaluations, memo hits included,
+so a search never grows more than budget layouts.
+"""
+import math
+import random
+
+from strand.config import Config
+from strand.growth import Growth
+from strand.presets import preset
+
+# Scores are sum(weight * metric); negative weights minimise
+OBJECTIVES = {'fill': 1.0, 'connectivity': 0.5, 'living_distance': -0.002}
+
+ABORT_MARGIN = 0.25   # Abort when built area < (1 - margin) x incumbent's
+CHECK_EVERY = 100     # Attempts between trajectory samples
+AREA_SCALE = (0.7, 1.3)
+AREA_STEP = 10.0
+DENSITY = (0.6, 0.95)
+SEED_POOL = 4         # Seeds a search draws from, so (config, seed) pairs repeat
+
+
+# --- ENCODING ---
+def dimensions(base):
+    return 1 + 2 * len(base.AREAS) + 4
+
+
+def decode(x, base):
+    """Config overrides for a point x in [0, 1]^dimensions(base)."""
+    def lerp(v, lo, hi): return lo + min(1.0, max(0.0, v)) * (hi - lo)
+    out = {'DENSITY_LIMIT': round(lerp(x[0], *DENSITY), 2)}
+    k = 1
+    areas = {}
+    for t in sorted(base.AREAS):
+        lo, hi = base.AREAS[t]
+        a = round(lo * lerp(x[k], *AREA_SCALE) / AREA_STEP) * AREA_STEP
+        b = round(hi * lerp(x[k + 1], *AREA_SCALE) / AREA_STEP) * AREA_STEP
+        areas[t] = (min(a, b), max(a, b))
+        k += 2
+    out['AREAS'] = areas
+    living_min = int(round(lerp(x[k], 1, 6))); living_span = int(round(lerp(x[k + 1], 0, 4)))
+    prod_min = int(round(lerp(x[k + 2], 2, 12))); prod_span = int(round(lerp(x[k + 3], 0, 8)))
+    out.update(LIVING_MIN=living_min, LIVING_MAX=living_min + living_span,
+               PROD_MIN=prod_min, PROD_MAX=prod_min + prod_span)
+    return out
+
+
+# --- EVALUATION (runs in worker processes) ---
+def metrics(settlement, boundary):
+    net = settlement.network
+    placed = [b for b in settlement.blocks if b.type != 'tunnel']
+    dists = []; unreachable = 0
+    for per_cluster in net.all_hub_distances('living').values():
+        for d in per_cluster.values():
+            if d is None: unreachable += 1
+            else: dists.append(d)
+    # Share of units with a path of doors and tunnels to their own hub
+    reached, units = net.hub_reach()
+    return {
+        'fill': settlement.area / boundary.area if boundary.area else 0.0,
+        'connectivity': reached / float(units) if units else 0.0,
+        'living_distance': sum(dists) / len(dists) if dists else 0.0,
+        'unreachable_living': unreachable,
+        'blocks': len(placed),
+    }
+
+
+def score(values, weights):
+    return sum(w * values[name] for name, w in weights.items())
+
+
+def evaluate(task):
+    """
+    Grow one candidate. task = (boundary, config dict, seed, weights,
+    incumbent trajectory or None). Returns (metrics, trajectory, aborted).
+    """
+    boundary, cfg_dict, seed, weights, incumbent = task
+    cfg = Config(**cfg_dict)
+    engine = Growth(boundary, None, cfg, seed)
+    trajectory = []
+
+    def abort(e):
+        attempts = len(e.settlement.blocks) + e.total_fails
+        while (len(trajectory) + 1) * CHECK_EVERY <= attempts: trajectory.append(e.settlement.area)
+        if not incumbent or weights.get('fill', 0) <= 0: return False
+        k = len(trajectory) - 1
+        if k < 0 or k >= len(incumbent): return False
+        return trajectory[k] < (1.0 - ABORT_MARGIN) * incumbent[k]
+
+    engine.run(target_area=boundary.area * cfg.DENSITY_LIMIT, abort=abort)
+    return metrics(engine.settlement, boundary), trajectory, engine.aborted
+
+
+class Search:
+    def __init__(self, boundary, config=None, objectives=None, workers=None, seed=0, seeds=SEED_POOL):
+        if isinstance(config, str): config = preset(config)
+        self.base = config or Config()
+        # Workers receive the boundary with its caches already built
+        self.boundary = boundary.prepare(self.base.GRID_UNIT)
+        self.weights = dict(objectives or OBJECTIVES)
+        self.rng = random.Random(seed)
+        self.seeds = [self.rng.randrange(2 ** 31) for _ in range(max(1, seeds))]
+        self.workers = workers
+        self.pool = None
+        self.memo = {}          # (config digest, seed) -> result
+        self.best = None
+        self.history = []
+        self.grown = 0          # Growth runs started
+        self.hits = 0           # Evaluations answered by the memo
+
+    # --- POOL ---
+    def _map(self, tasks):
+        if not self.workers or self.workers < 2 or len(tasks) < 2:
+            return [evaluate(t) for t in tasks]
+        if self.pool is None:
+            import multiprocessing
+            self.pool = multiprocessing.Pool(self.workers)
+        return self.pool.map(evaluate, tasks)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close(); self.pool.join(); self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- EVALUATION ---
+    def evaluate(self, points):
+        """Score points of the unit cube (each with a pool seed); memoised results are reused."""
+        results = []; pending = {}; fresh = []; tasks = []
+        incumbent = self.best['trajectory'] if self.best else None
+        for x in points:
+            overrides = decode(x, self.base)
+            cfg = self.base.copy(**overrides)
+            seed = self.rng.choice(self.seeds)
+            key = (cfg.digest(), seed)
+            r = self.memo.get(key) or pending.get(key)
+            if r is None:
+                r = {'x': list(x), 'overrides': overrides, 'seed': seed, 'key': key}
+                pending[key] = r; fresh.append(r)
+                tasks.append((self.boundary, cfg.to_dict(), seed, self.weights, incumbent))
+            else: self.hits += 1
+            results.append(r)
+
+        self.grown += len(tasks)
+        for r, (values, trajectory, aborted) in zip(fresh, self._map(tasks)):
+            r['metrics'] = values; r['trajectory'] = trajectory; r['aborted'] = aborted
+            r['score'] = float('-inf') if aborted else score(values, self.weights)
+            self.memo[r['key']] = r
+            self.history.append(r)
+            if not aborted and (self.best is None or r['score'] > self.best['score']): self.best = r
+        return results
+
+    # --- METHODS ---
+    def run(self, budget=100, method='cma', restarts=1, population=None):
+        """Spend at most budget evaluations (memo hits included); returns the best result dict."""
+        d = dimensions(self.base)
+        if method == 'random':
+            for i in range(budget):
+                self.evaluate([[self.rng.random() for _ in range(d)]])
+            return self.best
+
+        lam = population or 4 + int(3 * math.log(d))
+        mu = lam // 2
+        w = [math.log(mu + 0.5) - math.log(i + 1) for i in range(mu)]
+        total = sum(w); w = [v / total for v in w]
+        per_restart = max(1, budget // max(1, restarts))
+        adapt = method == 'cma'
+        c = 0.3
+
+        for restart in range(restarts):
+            mean = [self.rng.random() for _ in range(d)]
+            sigma = [0.3] * d
+            spent = 0
+            while spent < per_restart:
+                # The last generation is cut to what is left of the budget
+                n = min(lam, per_restart - spent)
+                zs = [[self.rng.gauss(0, 1) for _ in range(d)] for _ in range(n)]
+                xs = [[min(1.0, max(0.0, mean[i] + sigma[i] * z[i])) for i in range(d)] for z in zs]
+                scored = self.evaluate(xs)
+                spent += n
+                if spent >= per_restart: break
+                order = sorted(range(lam), key=lambda k: -scored[k]['score'])[:mu]
+                if scored[order[0]]['score'] == float('-inf'): continue
+                mean = [sum(w[r] * xs[order[r]][i] for r in range(mu)) for i in range(d)]
+                if adapt:
+                    for i in range(d):
+                        z2 = sum(w[r] * zs[order[r]][i] ** 2 for r in range(mu))
+                        sigma[i] = min(0.5, max(0.01, sigma[i] * math.sqrt((1 - c) + c * z2)))
+        return self.best
+
+
+def search(boundary, config=None, budget=100, method='cma', restarts=1, objectives=None, workers=None, seed=0):
+    """Best {'score', 'metrics', 'overrides', 'seed', ...} found within budget growth runs."""
+    with Search(boundary, config, objectives, workers, seed) as s:
+        return s.run(budget, method, restarts)
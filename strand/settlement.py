@@ -0,0 +1,69 @@
+"""
+A generated layout: placed blocks plus the bookkeeping needed to keep
+growing it later (tunnel tips, next cluster id, built area) and the
+circulation network, which is updated as blocks are placed.
+"""
+from strand.config import GRID_UNIT
+from strand.network import Network
+from strand.occupancy import OccupancyGrid
+from strand.rows import RowMaskGrid
+from strand.tiles import TiledGrid
+from strand.voxels import VoxelGrid
+
+# Occupancy backends by Config.OCCUPANCY name; each is built from the config
+OCCUPANCY = {'cells': OccupancyGrid, 'rows': RowMaskGrid, 'tiles': TiledGrid, 'voxels': VoxelGrid}
+
+
+class Settlement:
+    def __init__(self, grid_unit=GRID_UNIT, occupancy=None):
+        self.grid_unit = grid_unit
+        self.blocks = []
+        self.tunnel_tips = []      # Tunnel blocks new hubs may chain from
+        self.next_cluster_id = 0
+        self.area = 0.0            # Built area in m2 (tunnels excluded, as in the scripts)
+        self.occupancy = occupancy if occupancy is not None else OccupancyGrid()
+        self.network = Network(grid_unit)
+
+    def add(self, block):
+        block.index = len(self.blocks)
+        self.blocks.append(block)
+        self.occupancy.add(block)
+        self.network.add(block, self.occupancy)
+        if block.type != 'tunnel':
+            self.area += block.gw * block.gh * self.grid_unit * self.grid_unit
+        if block.cluster_id is not None and block.cluster_id >= self.next_cluster_id:
+            self.next_cluster_id = block.cluster_id + 1
+        return block
+
+    def remove_cluster(self, cluster_id):
+        # Rollback of the cluster being built, which is always the tail of the list
+        keep = len(self.blocks)
+        while keep > 0 and self.blocks[keep - 1].cluster_id == cluster_id: keep -= 1
+        removed = self.blocks[keep:]
+        del self.blocks[keep:]
+        self.network.truncate(keep)
+        for b in removed:
+            self.occupancy.remove(b)
+            if b.type != 'tunnel':
+                self.area -= b.gw * b.gh * self.grid_unit * self.grid_unit
+        if removed and self.tunnel_tips:
+            self.tunnel_tips = [t for t in self.tunnel_tips if t.index < keep]
+        return removed
+
+    def use_occupancy(self, occupancy):
+        # Move the placed blocks to another occupancy backend (voids are re-added by the engine)
+        for b in self.blocks: occupancy.add(b)
+        self.occupancy = occupancy
+
+    def add_void(self, block):
+        # Voids block cells but are not part of the layout
+        self.occupancy.add_void(block)
+
+    def clusters(self):
+        out = {}
+        for b in self.blocks:
+            out.setdefault(b.cluster_id, []).append(b)
+        return out
+
+    def __len__(self):
+        return len(self.blocks)
@@ -0,0 +1,230 @@
+"""
+Pluggable pieces of the growth loop. Each registry maps the name used in
+Config to a function; register a new function under a new name to extend
+the engine without touching its hot path.
+
+    QUEUES          (cfg, rng) -> list of unit types for one cluster
+    ANCHORS         (parent, w, h, cfg) -> [(gx, gy, attach_side), ...]
+    PARENT_POLICIES (engine, u_type) -> (parent pool, anchor name, sample limit)
+    TUNNEL_POLICIES (engine, gw, gh, parents) -> placed hub or None
+    LIVING_FAIL     (engine) -> None, called after a living unit failed
+    POST_PROCESS    (engine) -> None, called once growth has finished
+"""
+from strand.blocks import Block
+
+
+def sample(rng, items, limit):
+    # Shuffle a copy and slice, as the scripts do: rng.sample would draw a
+    # different random stream and lose seed-for-seed parity with them
+    items = list(items); rng.shuffle(items)
+    return items[:limit]
+
+
+# --- QUEUE COMPOSITION ---
+def queue_range(cfg, rng):
+    # Order: Gather -> Cistern -> Living -> Prod, prod count drawn from a range
+    queue = ['gather']
+    if cfg.CLUSTER_CISTERN: queue.append('cistern')
+    queue.extend(['living'] * rng.randint(cfg.LIVING_MIN, cfg.LIVING_MAX))
+    queue.extend(['prod'] * rng.randint(cfg.PROD_MIN, cfg.PROD_MAX))
+    return queue
+
+
+def queue_ratio(cfg, rng):
+    # Prod count follows UNIT_RATIOS relative to the size of the cluster
+    queue = ['gather']
+    if cfg.CLUSTER_CISTERN: queue.append('cistern')
+    num_living = rng.randint(cfg.LIVING_MIN, cfg.LIVING_MAX)
+    queue.extend(['living'] * num_living)
+    cluster_weight = len(queue) # Gather + Cistern + Living
+    ratios = cfg.UNIT_RATIOS
+    prod_weight = ratios['prod'] / float(ratios['living'] + ratios['gather'])
+    num_prod = int(round(cluster_weight * prod_weight))
+    num_prod = int(num_prod * rng.uniform(0.8, 1.2))
+    queue.extend(['prod'] * num_prod)
+    return queue
+
+
+QUEUES = {'range': queue_range, 'ratio': queue_ratio}
+
+
+# --- ANCHORS ---
+def anchors_tight(parent, child_w, child_h, cfg):
+    # Touching the parent (Gap=0), two alignments per side
+    anchors = []
+    anchors.append((parent.max_x, parent.max_y - child_h, 1)) # Right
+    anchors.append((parent.max_x, parent.min_y, 1))
+    anchors.append((parent.min_x - child_w, parent.max_y - child_h, 3)) # Left
+    anchors.append((parent.min_x - child_w, parent.min_y, 3))
+    anchors.append((parent.min_x, parent.max_y, 2)) # Top
+    anchors.append((parent.max_x - child_w, parent.max_y, 2))
+    anchors.append((parent.min_x, parent.min_y - child_h, 0)) # Bottom
+    anchors.append((parent.max_x - child_w, parent.min_y - child_h, 0))
+    return anchors
+
+
+def anchors_distanced(parent, child_w, child_h, cfg):
+    # As tight, but CLUSTER_GAP cells away from the parent
+    gap = cfg.CLUSTER_GAP
+    anchors = []
+    anchors.append((parent.max_x + gap, parent.max_y - child_h, 1))
+    anchors.append((parent.max_x + gap, parent.min_y, 1))
+    anchors.append((parent.min_x - child_w - gap, parent.max_y - child_h, 3))
+    anchors.append((parent.min_x - child_w - gap, parent.min_y, 3))
+    anchors.append((parent.min_x, parent.max_y + gap, 2))
+    anchors.append((parent.max_x - child_w, parent.max_y + gap, 2))
+    anchors.append((parent.min_x, parent.min_y - child_h - gap, 0))
+    anchors.append((parent.max_x - child_w, parent.min_y - child_h - gap, 0))
+    return anchors
+
+
+def anchors_gap_strict(parent, child_w, child_h, cfg):
+    # Exactly CLUSTER_GAP cells away, aligned with the parent's origin
+    gap = cfg.CLUSTER_GAP
+    anchors = []
+    anchors.append((parent.max_x + gap, parent.gy, 1))
+    anchors.append((parent.min_x - child_w - gap, parent.gy, 3))
+    anchors.append((parent.gx, parent.max_y + gap, 2))
+    anchors.append((parent.gx, parent.min_y - child_h - gap, 0))
+    return anchors
+
+
+def anchors_with_tunnel(parent, hub_w, hub_h, gap):
+    # (Tunnel rect, Hub origin) pairs; the tunnel is `gap` cells thick
+    candidates = []
+    # Right
+    candidates.append(((parent.max_x, parent.max_y - hub_h, gap, hub_h), (parent.max_x + gap, parent.max_y - hub_h)))
+    candidates.append(((parent.max_x, parent.min_y, gap, hub_h), (parent.max_x + gap, parent.min_y)))
+    # Left
+    candidates.append(((parent.min_x - gap, parent.max_y - hub_h, gap, hub_h), (parent.min_x - gap - hub_w, parent.max_y - hub_h)))
+    candidates.append(((parent.min_x - gap, parent.min_y, gap, hub_h), (parent.min_x - gap - hub_w, parent.min_y)))
+    # Top
+    candidates.append(((parent.min_x, parent.max_y, hub_w, gap), (parent.min_x, parent.max_y + gap)))
+    candidates.append(((parent.max_x - hub_w, parent.max_y, hub_w, gap), (parent.max_x - hub_w, parent.max_y + gap)))
+    # Bottom
+    candidates.append(((parent.min_x, parent.min_y - gap, hub_w, gap), (parent.min_x, parent.min_y - gap - hub_h)))
+    candidates.append(((parent.max_x - hub_w, parent.min_y - gap, hub_w, gap), (parent.max_x - hub_w, parent.min_y - gap - hub_h)))
+    return candidates
+
+
+ANCHORS = {'tight': anchors_tight, 'distanced': anchors_distanced, 'gap_strict': anchors_gap_strict}
+
+
+# --- PARENT POLICIES ---
+def parents_global(engine, u_type):
+    # Anything may parent anything; living units prefer the current hub
+    s = engine.settlement; limit = engine.cfg.PARENT_SAMPLE
+    if u_type == 'living' and engine.current_hub: return [engine.current_hub], 'tight', limit
+    return s.blocks, 'tight', limit
+
+
+def parents_spine(engine, u_type):
+    # Priority for prod: Current Tunnel > Current Prods > Hub
+    s = engine.settlement; limit = engine.cfg.PARENT_SAMPLE
+    if u_type == 'living':
+        return ([engine.current_hub] if engine.current_hub else s.blocks), 'tight', limit
+    if u_type == 'prod':
+        if engine.current_spine: return engine.current_spine + engine.current_prods, 'tight', limit
+        cands = [engine.current_hub] if engine.current_hub else []
+        cands.extend(engine.current_prods)
+        return (cands if cands else s.blocks), 'tight', limit
+    return s.blocks, 'tight', limit
+
+
+def parents_hub(engine, u_type):
+    # Hubs keep CLUSTER_GAP from everything; the rest of the cluster hangs off the hub
+    s = engine.settlement; limit = engine.cfg.PARENT_SAMPLE
+    hub = engine.current_hub
+    if u_type == 'gather': return s.blocks, 'distanced', limit
+    if u_type == 'cistern': return ([hub] if hub else []), 'tight', limit
+    if u_type == 'living': return ([hub] if hub else s.blocks), 'tight', limit
+    cands = [hub] if hub else []
+    cands.extend(engine.current_prods)
+    return (cands if cands else s.blocks), 'tight', limit
+
+
+def parents_cluster(engine, u_type):
+    # A cluster starts one road away from any block, then grows from its own blocks
+    if not engine.current_blocks:
+        return engine.settlement.blocks, 'gap_strict', engine.cfg.START_SAMPLE
+    return engine.current_blocks, 'tight', engine.cfg.PARENT_SAMPLE
+
+
+PARENT_POLICIES = {'global': parents_global, 'spine': parents_spine, 'hub': parents_hub, 'cluster': parents_cluster}
+
+
+# --- TUNNEL INSERTION ---
+def tunnel_hub(engine, gw, gh, parents):
+    # Every hub is reached through a new tunnel; no touching fallback
+    return engine.place_hub_via_tunnel(gw, gh, parents)
+
+
+def tunnel_chain(engine, gw, gh, parents):
+    # Continuity rule: chain from an existing tunnel tip first, then open a
+    # new tunnel from any block, then fall back to a touching hub
+    placed = engine.place_hub_from_tips(gw, gh)
+    if placed is None: placed = engine.place_hub_via_tunnel(gw, gh, parents)
+    if placed is None: placed = engine.place_standard('gather', gw, gh, parents, ANCHORS['tight'])
+    return placed
+
+
+TUNNEL_POLICIES = {'hub': tunnel_hub, 'chain': tunnel_chain}
+
+
+# --- FAILURE HANDLING ---
+def living_fail_prod_only(engine):
+    # Close the cluster but still try one production unit
+    engine.build_queue = ['prod']; engine.current_hub = None
+
+
+def living_fail_abandon(engine):
+    engine.build_queue = []; engine.current_hub = None
+
+
+def living_fail_drop_living(engine):
+    # Living units only hang off the hub: once it is boxed in,
+    # move on to the production units of this cluster
+    if engine.current_hub is None: return
+    engine.build_queue = [u for u in engine.build_queue if u != 'living']
+    engine.fails = 0
+
+
+LIVING_FAIL = {'prod_only': living_fail_prod_only, 'abandon': living_fail_abandon, 'drop_living': living_fail_drop_living}
+
+
+# --- POST-PROCESSING ---
+def fill_gaps_with_production(engine):
+    """
+    Interlocking Pass:
+    Tries to place small production blocks (FILLER_SIZE) against the clusters
+    grown in this run, respecting the gap rules, for a tight 'fitted' look.
+    """
+    cfg = engine.cfg; rng = engine.rng
+    clusters = {}
+    for b in engine.settlement.blocks[engine.start_index:]:
+        clusters.setdefault(b.cluster_id, []).append(b)
+
+    filler_w, filler_h = cfg.FILLER_SIZE
+    for i in range(cfg.FILLER_PASSES):
+        added_this_pass = 0
+        for c_id in sorted(clusters):
+            blocks = clusters[c_id]
+            parent = rng.choice(blocks)
+            anchors = anchors_tight(parent, filler_w, filler_h, cfg)
+            rng.shuffle(anchors)
+            for (nx, ny, side) in anchors:
+                candidate = Block(nx, ny, filler_w, filler_h, 'prod', c_id, side, parent)
+                if not engine.within(candidate):
+                    if engine.trace is not None: engine.reject('prod', parent, nx, ny, filler_w, filler_h, side, 'outside')
+                    continue
+                if engine.collides(candidate):
+                    if engine.trace is not None: engine.reject('prod', parent, nx, ny, filler_w, filler_h, side, 'collides')
+                    continue
+                engine.add_block(candidate)
+                blocks.append(candidate)
+                added_this_pass += 1
+                break
+        if added_this_pass == 0: break
+
+
+POST_PROCESS = {'filler': fill_gaps_with_production}
@@ -0,0 +1,260 @@
+"""
+Transient heat balance of the buried units over a diurnal cycle.
+
+The model is 2.5D: the plan raster carries one soil layer at unit depth
+(UNIT_DEPTH down to UNIT_DEPTH + ROOM_HEIGHT), coupled upwards through the
+overburden to the sun-baked surface and downwards to the deep ground. The
+overburden response is the same under every cell, so it is one 1D
+finite-difference column solved once per layout rather than per cell.
+
+Each room (living, prod, gather block) is one well-mixed air node. It
+exchanges heat with the soil cells around its walls, with neighbouring
+rooms, with the overburden through its ceiling and the deep ground through
+its floor. Internal gains and sun through its lightcores are sources, and
+night flushing through its solar chimney is a sink.
+
+Only soil within ACTIVE_RING cells of a room is simulated; farther soil
+stays at the undisturbed DEEP_TEMP. Every node uses the same update with
+its own value implicit and its neighbours' values from the previous step,
+which stays stable at any step length. Soil, which responds over months,
+takes SOIL_EVERY-hour steps and rooms take hourly ones.
+"""
+import math
+
+from strand.config import Config
+from strand.lighting import light_centres
+from strand.raster import Raster
+
+# Ground (W/mK, J/m3K) and geometry (m)
+SOIL_CONDUCTIVITY = 1.5
+SOIL_HEAT_CAPACITY = 2.0e6
+UNIT_DEPTH = 3.0            # Soil above the ceiling
+ROOM_HEIGHT = 3.0
+DEEP_DEPTH = 10.0           # Depth held at DEEP_TEMP
+DEEP_TEMP = 18.0            # Annual mean ground temperature, also the initial state
+
+# Design day (deg C): surface and air follow a sine peaking mid-afternoon
+SURFACE_MEAN = 32.0
+SURFACE_AMPLITUDE = 18.0    # 14 .. 50
+AIR_MEAN = 30.0
+AIR_AMPLITUDE = 10.0
+PEAK_HOUR = 15.0
+
+# Rooms
+ROOM_TYPES = ('living', 'prod', 'gather')
+FILM = 8.0                  # Surface film coefficient, W/m2K
+ROOM_CAPACITY = 80e3        # Air, furniture and finishes, J/K per m2 floor
+GAINS = {'living': 5.0, 'prod': 15.0, 'gather': 8.0}  # W/m2 floor
+LIGHT_GAIN = 40.0           # W per lightcore at solar noon
+CHIMNEY_TYPES = ('living', 'gather')
+CHIMNEY_FLOW = 1.0          # Air changes per hour while flushing at night
+AIR_HEAT_CAPACITY = 1200.0  # J/m3K
+
+COMFORT = (18.0, 26.0)
+ACTIVE_RING = 2
+DAYS = 2                    # Simulated days after the rooms start at ground temperature
+SOIL_EVERY = 6              # Hours per soil step
+COLUMN_DZ = 0.25
+COLUMN_SPINUP_DAYS = 10
+
+
+def _sine(mean, amplitude, hour):
+    return mean + amplitude * math.cos(2 * math.pi * (hour - PEAK_HOUR) / 24.0)
+
+
+def _sun(hour):
+    # Relative solar gain: zero at night, 1 at noon
+    return max(0.0, math.sin(math.pi * (hour % 24.0 - 6.0) / 12.0))
+
+
+class Overburden:
+    """
+    1D explicit column from the surface to DEEP_DEPTH, shared by every cell.
+    It starts at DEEP_TEMP and is spun up for COLUMN_SPINUP_DAYS of design
+    days, so the diurnal wave has soaked into the top of the overburden.
+    """
+
+    def __init__(self):
+        self.n = int(round(DEEP_DEPTH / COLUMN_DZ)) + 1
+        self.T = [DEEP_TEMP] * self.n
+        self.probe = int(round(UNIT_DEPTH / COLUMN_DZ))
+        self.alpha = SOIL_CONDUCTIVITY / SOIL_HEAT_CAPACITY
+        self.hour = 0.0
+        for step in range(COLUMN_SPINUP_DAYS * 24): self.step(1.0)
+        self.hour = 0.0
+
+    def step(self, hours):
+        # Sub-stepped to stay inside the explicit stability limit
+        dt_max = 0.4 * COLUMN_DZ * COLUMN_DZ / self.alpha
+        sub = max(1, int(math.ceil(hours * 3600.0 / dt_max)))
+        dt = hours * 3600.0 / sub
+        r = self.alpha * dt / (COLUMN_DZ * COLUMN_DZ)
+        T = self.T
+        for s in range(sub):
+            self.hour += hours / sub
+            T[0] = _sine(SURFACE_MEAN, SURFACE_AMPLITUDE, self.hour)
+            prev = T[0]
+            for k in range(1, self.n - 1):
+                cur = T[k]
+                T[k] = cur + r * (prev - 2 * cur + T[k + 1])
+                prev = cur
+        return T[self.probe]
+
+
+class Thermal:
+    """Hourly room temperatures of one layout over DAYS design days."""
+
+    def __init__(self, settlement, config=None, days=DAYS):
+        cfg = config or Config()
+        raster = Raster(settlement, pad=ACTIVE_RING)
+        self.raster = raster
+        g = raster.grid_unit; w = raster.w; h = raster.h
+        owner = raster.owner; blocks = raster.blocks
+
+        # Room nodes, one per room block
+        self.rooms = [b for b in blocks if b.type in ROOM_TYPES]
+        room_of = {}
+        for r in range(len(self.rooms)): room_of[self.rooms[r].index] = r
+        cell_room = [room_of.get(owner[i], -1) if owner[i] >= 0 else -1 for i in range(raster.n)]
+
+        # Active soil: within ACTIVE_RING cells of a room
+        soil_id = {}
+        frontier = [i for i in range(raster.n) if cell_room[i] >= 0]
+        seen = set(frontier)
+        for ring in range(ACTIVE_RING):
+            nxt = []
+            for i in frontier:
+                x = i % w; y = i // w
+                for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                    if 0 <= nx < w and 0 <= ny < h:
+                        j = ny * w + nx
+                        if j not in seen:
+                            seen.add(j); nxt.append(j)
+                            if cell_room[j] < 0: soil_id[j] = len(soil_id)
+            frontier = nxt
+        self.soil_cells = sorted(soil_id, key=soil_id.get)
+
+        # Conductances, W/K
+        k = SOIL_CONDUCTIVITY; H = ROOM_HEIGHT
+        g_soil = k * H                                        # Soil to soil, one face
+        g_face = H * g / (g / (2 * k) + 1.0 / FILM)           # Soil to room air, one face
+        g_wall = H * g / (2.0 / FILM)                         # Room to room, one face
+        below = DEEP_DEPTH - UNIT_DEPTH - H
+        g_up = k * g * g / (H / 2.0)                          # Soil cell to overburden
+        g_down = k * g * g / (H / 2.0 + below)                # Soil cell to deep ground
+        self.t_background = DEEP_TEMP
+
+        n_soil = len(self.soil_cells); n_rooms = len(self.rooms)
+        links = [[] for _ in range(n_soil + n_rooms)]        # node -> [(node, G)]
+        g_fixed_bg = [0.0] * n_soil
+        for s in range(n_soil):
+            i = self.soil_cells[s]; x = i % w; y = i // w
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                j = ny * w + nx if (0 <= nx < w and 0 <= ny < h) else -1
+                if j >= 0 and cell_room[j] >= 0:
+                    r = n_soil + cell_room[j]
+                    links[s].append((r, g_face)); links[r].append((s, g_face))
+                elif j >= 0 and j in soil_id:
+                    links[s].append((soil_id[j], g_soil))
+                else:
+                    g_fixed_bg[s] += g_soil
+        for i in range(raster.n):
+            r = cell_room[i]
+            if r < 0: continue
+            x = i % w; y = i // w
+            for nx, ny in ((x + 1, y), (x, y + 1)):
+                if nx < w and ny < h:
+                    q = cell_room[ny * w + nx]
+                    if q >= 0 and q != r:
+                        links[n_soil + r].append((n_soil + q, g_wall)); links[n_soil + q].append((n_soil + r, g_wall))
+
+        self.n_soil = n_soil
+        self.links = links
+        self.g_fixed_bg = g_fixed_bg
+        self.g_up = g_up; self.g_down = g_down
+        self.c_soil = SOIL_HEAT_CAPACITY * g * g * H
+
+        area = [b.gw * b.gh * g * g for b in self.rooms]
+        self.c_room = [ROOM_CAPACITY * a for a in area]
+        self.g_ceiling = [a / (1.0 / FILM) for a in area]
+        self.g_floor = [a / (1.0 / FILM + below / k) for a in area]
+        self.gain = [GAINS.get(b.type, 0.0) * a for b, a in zip(self.rooms, area)]
+        self.lights = [len(light_centres(b, cfg)) * LIGHT_GAIN for b in self.rooms]
+        self.g_vent = [CHIMNEY_FLOW * a * H * AIR_HEAT_CAPACITY / 3600.0 if b.type in CHIMNEY_TYPES else 0.0
+                       for b, a in zip(self.rooms, area)]
+
+        self.T = [self.t_background] * (n_soil + n_rooms)
+        self.history = [[] for _ in range(n_rooms)]   # Hourly temperatures, last day
+        self.run(days)
+
+    def run(self, days):
+        column = Overburden()
+        T = self.T; links = self.links; n_soil = self.n_soil
+        hours = int(days * 24)
+        t_deep = DEEP_TEMP
+        for hour in range(1, hours + 1):
+            t_roof = column.step(1.0)
+            t_air = _sine(AIR_MEAN, AIR_AMPLITUDE, hour)
+            sun = _sun(hour)
+            old = T[:]
+
+            if hour % SOIL_EVERY == 0:
+                c_dt = self.c_soil / (SOIL_EVERY * 3600.0)
+                bg = self.t_background; g_up = self.g_up; g_down = self.g_down
+                for s in range(n_soil):
+                    num = c_dt * old[s] + self.g_fixed_bg[s] * bg + g_up * t_roof + g_down * t_deep
+                    den = c_dt + self.g_fixed_bg[s] + g_up + g_down
+                    for (j, gl) in links[s]:
+                        num += gl * old[j]; den += gl
+                    T[s] = num / den
+
+            for r in range(len(self.rooms)):
+                node = n_soil + r
+                c_dt = self.c_room[r] / 3600.0
+                g_vent = self.g_vent[r] if t_air < old[node] else 0.0  # Chimneys flush only when it helps
+                num = (c_dt * old[node] + self.g_ceiling[r] * t_roof + self.g_floor[r] * t_deep
+                       + g_vent * t_air + self.gain[r] + self.lights[r] * sun)
+                den = c_dt + self.g_ceiling[r] + self.g_floor[r] + g_vent
+                for (j, gl) in links[node]:
+                    num += gl * old[j]; den += gl
+                T[node] = num / den
+                if hour > hours - 24: self.history[r].append(T[node])
+
+    def room_stats(self):
+        """{block index: (min, mean, max)} over the last simulated day."""
+        out = {}
+        for b, temps in zip(self.rooms, self.history):
+            out[b.index] = (min(temps), sum(temps) / len(temps), max(temps))
+        return out
+
+    def summary(self):
+        """Flat record of the layout's scores."""
+        lo, hi = COMFORT
+        means = []; peak = None; trough = None
+        overheat = 0.0; living = 0; comfortable = 0
+        for b, temps in zip(self.rooms, self.history):
+            means.append(sum(temps) / len(temps))
+            peak = max(temps) if peak is None else max(peak, max(temps))
+            trough = min(temps) if trough is None else min(trough, min(temps))
+            for t in temps:
+                if t > hi: overheat += t - hi
+            if b.type == 'living':
+                living += 1
+                if lo <= min(temps) and max(temps) <= hi: comfortable += 1
+        return {
+            'room_mean_c': sum(means) / len(means) if means else 0.0,
+            'room_min_c': trough if trough is not None else 0.0,
+            'room_max_c': peak if peak is not None else 0.0,
+            'living_comfort_fraction': comfortable / float(living) if living else 0.0,
+            'overheat_degree_hours': overheat,
+        }
+
+
+def thermal(settlement, config=None, days=DAYS):
+    return Thermal(settlement, config, days)
+
+
+def thermal_batch(settlements, config=None, days=DAYS):
+    """Yield summary() for each settlement; settlements may be a generator."""
+    for s in settlements:
+        yield Thermal(s, config, days).summary()
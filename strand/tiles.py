@@ -0,0 +1,198 @@
+"""
+Sparse tiled occupancy for region-scale, long or multi-part sites.
+
+The plane is cut into TILE x TILE cell tiles, created the first time a
+block (or void) is written into them. A tile keeps one TILE-bit integer per
+row for occupancy and an array of owner ids (0 = empty) into a block table,
+so memory follows the built area rather than the bounding box, however far
+apart the parts of the site are. A span test reads one word per row per
+tile: "is [min_x, max_x) free in rows min_y..max_y" is a few ANDs even for
+30 x 30 cell halls, and owners are only looked up for the occupied cells
+in a gap ring.
+"""
+import array
+
+from strand.gaps import GapLayer
+
+TILE = 64
+_SHIFT = 6
+_MASK = TILE - 1
+
+
+def _spans(lo, hi):
+    # (tile index, local start, local end) pieces of [lo, hi)
+    while lo < hi:
+        t = lo >> _SHIFT; a = lo & _MASK
+        b = min(TILE, a + (hi - lo))
+        yield t, a, b
+        lo += b - a
+
+
+class _Tile:
+    __slots__ = ('rows', 'owners')
+
+    def __init__(self):
+        self.rows = [0] * TILE
+        self.owners = array.array('i', [0]) * (TILE * TILE)
+
+
+class TiledGrid:
+    planar = True
+
+    def __init__(self, config=None):
+        self.tiles = {}       # (tx, ty) -> _Tile
+        self.table = [None]   # owner id -> Block
+        self.ids = {}         # Block -> owner id
+        self.spare = []
+        self.gaps = GapLayer(config)
+
+    # --- STORAGE ---
+    def _id(self, block):
+        i = self.ids.get(block)
+        if i is None:
+            if self.spare: i = self.spare.pop(); self.table[i] = block
+            else: i = len(self.table); self.table.append(block)
+            self.ids[block] = i
+        return i
+
+    def _write(self, block, i, only_free):
+        tiles = self.tiles
+        for tx, a, b in _spans(block.min_x, block.max_x):
+            span = ((1 << (b - a)) - 1) << a
+            for ty, c, d in _spans(block.min_y, block.max_y):
+                tile = tiles.get((tx, ty))
+                if tile is None: tile = tiles[(tx, ty)] = _Tile()
+                rows = tile.rows; owners = tile.owners
+                for j in range(c, d):
+                    bits = span & ~rows[j] if only_free else span
+                    rows[j] |= bits
+                    base = j * TILE
+                    for k in range(a, b):
+                        if bits >> k & 1: owners[base + k] = i
+
+    # --- UPDATES ---
+    def add(self, block):
+        self._write(block, self._id(block), False)
+        self.gaps.add(block)
+
+    def add_void(self, block):
+        # Voids block cells but never overwrite a placed block
+        self._write(block, self._id(block), True)
+
+    def remove(self, block):
+        i = self.ids.pop(block, None)
+        if i is None: return
+        for tx, a, b in _spans(block.min_x, block.max_x):
+            for ty, c, d in _spans(block.min_y, block.max_y):
+                tile = self.tiles.get((tx, ty))
+                if tile is None: continue
+                rows = tile.rows; owners = tile.owners
+                for j in range(c, d):
+                    base = j * TILE
+                    for k in range(a, b):
+                        if owners[base + k] == i:
+                            owners[base + k] = 0
+                            rows[j] &= ~(1 << k)
+        self.table[i] = None
+        self.spare.append(i)
+        self.gaps.remove(block)
+
+    # --- QUERIES ---
+    def owner(self, x, y):
+        tile = self.tiles.get((x >> _SHIFT, y >> _SHIFT))
+        if tile is None: return None
+        return self.table[tile.owners[(y & _MASK) * TILE + (x & _MASK)]]
+
+    def is_free(self, min_x, min_y, max_x, max_y, b_type=None):
+        tiles = self.tiles
+        tx = min_x >> _SHIFT; ty = min_y >> _SHIFT
+        if tx == (max_x - 1) >> _SHIFT and ty == (max_y - 1) >> _SHIFT:
+            # Common case: the rect sits in one tile
+            tile = tiles.get((tx, ty))
+            if tile is None: return True
+            span = ((1 << (max_x - min_x)) - 1) << (min_x & _MASK)
+            rows = tile.rows
+            for j in range(min_y & _MASK, ((max_y - 1) & _MASK) + 1):
+                if rows[j] & span: return False
+            return True
+        for tx, a, b in _spans(min_x, max_x):
+            span = ((1 << (b - a)) - 1) << a
+            for ty, c, d in _spans(min_y, max_y):
+                tile = tiles.get((tx, ty))
+                if tile is None: continue
+                rows = tile.rows
+                for j in range(c, d):
+                    if rows[j] & span: return False
+        return True
+
+    def free_run(self, x, y, dx, dy, cap):
+        """Free cells in a straight line from (x, y) in steps of (dx, dy), up to cap."""
+        tiles = self.tiles
+        n = 0
+        if dy == 0:
+            # Whole words at a time along the row
+            j = y & _MASK; ty = y >> _SHIFT
+            while n < cap:
+                tile = tiles.get((x >> _SHIFT, ty))
+                lx = x & _MASK
+                row = tile.rows[j] if tile is not None else 0
+                if dx > 0:
+                    bits = row >> lx
+                    if bits:
+                        n += (bits & -bits).bit_length() - 1; break
+                    step = TILE - lx
+                else:
+                    bits = row & ((2 << lx) - 1)
+                    if bits:
+                        n += lx - (bits.bit_length() - 1); break
+                    step = lx + 1
+                n += step; x += dx * step
+            return min(n, cap)
+        while n < cap:
+            tile = tiles.get((x >> _SHIFT, y >> _SHIFT))
+            if tile is not None and tile.rows[y & _MASK] >> (x & _MASK) & 1: break
+            n += 1; y += dy
+        return n
+
+    def collides(self, block, cluster_gap=0, cistern_gap=0, exempt=None):
+        return self.collides_rect(block.min_x, block.min_y, block.max_x, block.max_y,
+                                  block.type, block.cluster_id, cluster_gap, cistern_gap, exempt)
+
+    def collides_rect(self, min_x, min_y, max_x, max_y, b_type, cluster_id, cluster_gap=0, cistern_gap=0, exempt=None):
+        """The gap rules of OccupancyGrid.collides_rect, on the packed rows."""
+        if not self.is_free(min_x, min_y, max_x, max_y): return True
+
+        is_cistern = b_type == 'cistern'
+        reach = max(cluster_gap, cistern_gap if is_cistern else 0)
+        if reach <= 0: return False
+        gaps = self.gaps
+        if gaps.answers(cluster_gap, cistern_gap, is_cistern):
+            if not gaps.hits(min_x, min_y, max_x, max_y, is_cistern, cluster_id): return False
+            if exempt is None: return True
+
+        # The core is free, so the set bits of the grown rect are the ring's
+        tiles = self.tiles; table = self.table
+        for tx, a, b in _spans(min_x - reach, max_x + reach):
+            span = ((1 << (b - a)) - 1) << a
+            gx = tx << _SHIFT
+            for ty, c, d in _spans(min_y - reach, max_y + reach):
+                tile = tiles.get((tx, ty))
+                if tile is None: continue
+                rows = tile.rows; owners = tile.owners
+                gy = ty << _SHIFT
+                for j in range(c, d):
+                    bits = rows[j] & span
+                    if not bits: continue
+                    y = gy + j
+                    dy = max(min_y - y, y - max_y + 1, 0)
+                    while bits:
+                        low = bits & -bits
+                        k = low.bit_length() - 1
+                        bits ^= low
+                        e = table[owners[j * TILE + k]]
+                        if e is exempt or e.type == 'void': continue
+                        required = cluster_gap if e.cluster_id != cluster_id else 0
+                        if is_cistern and e.type == 'cistern' and cistern_gap > required: required = cistern_gap
+                        x = gx + k
+                        if required and max(dy, min_x - x, x - max_x + 1) <= required: return True
+        return False
@@ -0,0 +1,108 @@
+"""
+Index of live tunnel tips for chaining new hubs.
+
+Every tip is tracked per face (right, left, top, bottom) together with
+its free extent: how many free cells run straight out from that face.
+Faces sit in buckets keyed by (face, extent). A hub of a given size only
+draws from buckets deep enough for a tunnel plus the hub, picking one at
+random in constant time. Extents only ever shrink as the settlement grows,
+so a cached extent is an upper bound: a picked face is re-measured, moved
+down to its true bucket if it shrank, and retired once even the smallest
+hub can no longer fit. Each face is demoted at most CAP times, so picking
+stays O(1) amortised however many tips the settlement has collected.
+"""
+import math
+
+# Face codes follow the anchor side codes: 1 Right, 3 Left, 2 Top, 0 Bottom
+FACES = (1, 3, 2, 0)
+# Slice of strategies.anchors_with_tunnel output belonging to each face
+_PAIR_SLICE = {1: (0, 2), 3: (2, 4), 2: (4, 6), 0: (6, 8)}
+
+
+def hub_side_range(cfg):
+    # Smallest / largest grid side get_grid_dims can return for a hub
+    lo_a, hi_a = cfg.AREAS['gather']
+    g = cfg.GRID_UNIT
+    lo = min(math.sqrt(lo_a * 0.6), lo_a / math.sqrt(hi_a * 1.5))
+    hi = max(math.sqrt(hi_a * 1.5), hi_a / math.sqrt(lo_a * 0.6))
+    return max(1, int(round(lo / g))), max(1, int(round(hi / g)))
+
+
+def face_pairs(pair_fn, side):
+    a, b = _PAIR_SLICE[side]
+    return lambda parent, w, h, gap: pair_fn(parent, w, h, gap)[a:b]
+
+
+class TipIndex:
+    def __init__(self, occupancy, cfg):
+        self.occupancy = occupancy
+        self.gap = cfg.TUNNEL_WIDTH_GRID
+        min_side, max_side = hub_side_range(cfg)
+        self.min_need = self.gap + min_side
+        self.cap = self.gap + max_side
+        self.buckets = {}    # (face, extent) -> [(tip, face), ...]
+        self.where = {}      # (id(tip), face) -> (key, position)
+
+    def __len__(self):
+        return len(self.where)
+
+    # --- EXTENT ---
+    def extent(self, tip, face):
+        occ = self.occupancy; cap = self.cap
+        if face == 1:   return self._run(lambda d: occ.is_free(tip.max_x + d, tip.min_y, tip.max_x + d + 1, tip.max_y, 'gather'), cap)
+        if face == 3:   return self._run(lambda d: occ.is_free(tip.min_x - d - 1, tip.min_y, tip.min_x - d, tip.max_y, 'gather'), cap)
+        if face == 2:   return self._run(lambda d: occ.is_free(tip.min_x, tip.max_y + d, tip.max_x, tip.max_y + d + 1, 'gather'), cap)
+        return self._run(lambda d: occ.is_free(tip.min_x, tip.min_y - d - 1, tip.max_x, tip.min_y - d, 'gather'), cap)
+
+    @staticmethod
+    def _run(free, cap):
+        d = 0
+        while d < cap and free(d): d += 1
+        return d
+
+    # --- BUCKETS ---
+    def _insert(self, tip, face, ext):
+        if ext < self.min_need: return  # Retired for good
+        key = (face, ext)
+        bucket = self.buckets.setdefault(key, [])
+        self.where[(id(tip), face)] = (key, len(bucket))
+        bucket.append((tip, face))
+
+    def _remove(self, tip, face):
+        loc = self.where.pop((id(tip), face), None)
+        if loc is None: return
+        key, pos = loc
+        bucket = self.buckets[key]
+        last = bucket.pop()
+        if pos < len(bucket):
+            bucket[pos] = last
+            self.where[(id(last[0]), last[1])] = (key, pos)
+        if not bucket: del self.buckets[key]
+
+    def add(self, tip):
+        for face in FACES:
+            self._insert(tip, face, self.extent(tip, face))
+
+    def discard(self, tip):
+        for face in FACES:
+            self._remove(tip, face)
+
+    def pick(self, rng, gw, gh):
+        """A random live (tip, face) whose free extent fits a gw x gh hub, or None."""
+        need_x = self.gap + gw; need_y = self.gap + gh
+        while True:
+            keys = [k for k in self.buckets if k[1] >= (need_x if k[0] in (1, 3) else need_y)]
+            if not keys: return None
+            total = 0
+            for k in keys: total += len(self.buckets[k])
+            r = rng.randrange(total)
+            for k in keys:
+                n = len(self.buckets[k])
+                if r < n: break
+                r -= n
+            tip, face = self.buckets[k][r]
+            ext = self.extent(tip, face)
+            if ext == k[1]: return tip, face
+            # Shrunk since it was filed: move it down (or retire it) and draw again
+            self._remove(tip, face)
+            self._insert(tip, face, ext)
@@ -0,0 +1,180 @@
+"""
+Placement trace: a compact binary log of a growth run, and its replay.
+
+With a Trace attached (Growth.trace, or grow(..., trace=path)) the engine
+logs one event per placement attempt and per change to the layout. With
+none attached the cost is a single attribute test per attempt. Events are
+seven int32 each, buffered and written in blocks:
+
+    code      kind | type << 8 | (side + 1) << 16 | reason << 24
+    cluster   cluster id
+    parent    parent block index (-1 = none)
+    gx gy gw gh
+
+Kinds:
+    PLACE     a block was placed (seed, unit, tunnel, hub or filler)
+    REJECT    one candidate of an attempt was turned down: the sampled
+              parent, the anchor's rect and side, and why (outside,
+              overlap, gap, pruned or no_cistern)
+    MISS      an attempt placed nothing; gw, gh is the drawn size and
+              reason sums it up (no_parent, no_room or blocked); the
+              REJECT events before it hold the detail
+    ROLLBACK  the cluster was removed
+    SKIP      the unit at the head of the queue was dropped
+    CLUSTER   a new cluster was started
+
+File layout (little-endian): header '<4sHHI' (magic b'STRT', version,
+reserved, byte length of a UTF-8 JSON metadata block), the metadata,
+then the events. replay() rebuilds the layout after any number of events
+from the log alone, without drawing a single random number, so a stalled
+seed can be scrubbed through step by step and a replayed run compared
+block for block with the engine's own output.
+"""
+import array
+import struct
+import sys
+
+from strand.blocks import Block, BLOCK_TYPES, TYPE_CODES
+from strand.settlement import Settlement
+
+MAGIC = b'STRT'
+TRACE_VERSION = 2
+READABLE = (1, 2)   # Version 1 had no REJECT events
+FIELDS = 7
+BUFFER = 4096   # Events held in memory between writes
+
+PLACE, MISS, ROLLBACK, SKIP, CLUSTER, REJECT = 1, 2, 3, 4, 5, 6
+KINDS = {PLACE: 'place', MISS: 'miss', ROLLBACK: 'rollback', SKIP: 'skip', CLUSTER: 'cluster', REJECT: 'reject'}
+# Why an attempt missed, then why a candidate was rejected:
+#   outside     centre not inside the boundary (or in a void's lattice hole)
+#   overlap     the rect covers a placed block or void
+#   gap         the rect is free but breaks CLUSTER_GAP / CISTERN_BUFFER
+#   pruned      a cached free run is shorter than the rect (strand.extents)
+#   no_cistern  a hub with no free cistern slot beside it (CISTERN_RESERVE)
+REASONS = ('', 'no_parent', 'no_room', 'blocked', 'outside', 'overlap', 'gap', 'pruned', 'no_cistern')
+REASON_CODES = dict((r, i) for i, r in enumerate(REASONS))
+
+_HEADER = struct.Struct('<4sHHI')
+_LITTLE = sys.byteorder == 'little'
+
+
+class Trace:
+    def __init__(self, path, metadata=None):
+        import json
+        self.path = path
+        self.events = 0
+        self.buffer = array.array('i')
+        meta = json.dumps(metadata or {}, sort_keys=True).encode('utf-8')
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(MAGIC, TRACE_VERSION, 0, len(meta)))
+        self._file.write(meta)
+
+    # --- RECORDING ---
+    def _event(self, kind, b_type, side, reason, cluster_id, parent, gx, gy, gw, gh):
+        code = kind | TYPE_CODES.get(b_type, 0) << 8 | ((side if side is not None else -1) + 1) << 16 | reason << 24
+        self.buffer.extend((code, cluster_id if cluster_id is not None else -1, parent, gx, gy, gw, gh))
+        self.events += 1
+        if len(self.buffer) >= BUFFER * FIELDS: self.flush()
+
+    def place(self, block):
+        parent = block.parent.index if block.parent is not None else -1
+        self._event(PLACE, block.type, block.attach_side, 0, block.cluster_id, parent,
+                    block.gx, block.gy, block.gw, block.gh)
+
+    def miss(self, u_type, cluster_id, gw, gh, reason):
+        self._event(MISS, u_type, None, REASON_CODES[reason], cluster_id, -1, 0, 0, gw, gh)
+
+    def reject(self, b_type, cluster_id, parent, gx, gy, gw, gh, side, reason):
+        self._event(REJECT, b_type, side, REASON_CODES[reason], cluster_id,
+                    parent.index if parent is not None else -1, gx, gy, gw, gh)
+
+    def rollback(self, cluster_id):
+        self._event(ROLLBACK, None, None, 0, cluster_id, -1, 0, 0, 0, 0)
+
+    def skip(self, u_type, cluster_id):
+        self._event(SKIP, u_type, None, 0, cluster_id, -1, 0, 0, 0, 0)
+
+    def cluster(self, cluster_id):
+        self._event(CLUSTER, None, None, 0, cluster_id, -1, 0, 0, 0, 0)
+
+    def flush(self):
+        buf = self.buffer
+        if not buf: return
+        if not _LITTLE: buf.byteswap()
+        self._file.write(buf.tostring() if not hasattr(buf, 'tobytes') else buf.tobytes())
+        self.buffer = array.array('i')
+
+    def close(self):
+        if self._file is None: return
+        self.flush()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- READING ---
+def read_trace(path):
+    """(metadata, events); events is a flat int32 array, FIELDS ints per event."""
+    import json
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, _, n_meta = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC: raise ValueError("Not a Strand trace file: %s" % path)
+    if version not in READABLE: raise ValueError("Unsupported trace version: %d" % version)
+    start = _HEADER.size + n_meta
+    meta = json.loads(data[_HEADER.size:start].decode('utf-8'))
+    events = array.array('i')
+    body = data[start:]
+    if hasattr(events, 'frombytes'): events.frombytes(body)
+    else: events.fromstring(body)
+    if not _LITTLE: events.byteswap()
+    return meta, events
+
+
+def iter_events(events):
+    """Each event as a dict, for inspection and scrubbing tools."""
+    for k in range(0, len(events), FIELDS):
+        code, cid, parent, gx, gy, gw, gh = events[k:k + FIELDS]
+        kind = code & 0xFF
+        yield {'kind': KINDS[kind], 'type': BLOCK_TYPES[(code >> 8) & 0xFF] if kind in (PLACE, MISS, SKIP, REJECT) else None,
+               'side': ((code >> 16) & 0xFF) - 1, 'reason': REASONS[(code >> 24) & 0xFF],
+               'cluster_id': cid, 'parent': parent, 'gx': gx, 'gy': gy, 'gw': gw, 'gh': gh}
+
+
+def replay(path, until=None, base=None):
+    """
+    The settlement after the first `until` events (all when None). A trace
+    of extend() needs the layout it started from as `base`; it is copied,
+    never changed.
+    """
+    meta, events = read_trace(path)
+    s = Settlement(meta.get('grid_unit', base.grid_unit if base is not None else 3.75))
+    if base is not None:
+        for b in base.blocks:
+            p = s.blocks[b.parent.index] if b.parent is not None else None
+            s.add(Block(b.gx, b.gy, b.gw, b.gh, b.type, b.cluster_id, b.attach_side, p))
+        s.tunnel_tips = [s.blocks[t.index] for t in base.tunnel_tips]
+        s.next_cluster_id = base.next_cluster_id
+    if len(s.blocks) != meta.get('start_blocks', 0):
+        raise ValueError("Trace starts from %d blocks, base has %d" % (meta.get('start_blocks', 0), len(s.blocks)))
+
+    n = len(events) // FIELDS if until is None else min(until, len(events) // FIELDS)
+    for k in range(0, n * FIELDS, FIELDS):
+        code = events[k]; kind = code & 0xFF
+        if kind == PLACE:
+            parent = events[k + 2]
+            side = ((code >> 16) & 0xFF) - 1
+            s.add(Block(events[k + 3], events[k + 4], events[k + 5], events[k + 6], BLOCK_TYPES[(code >> 8) & 0xFF],
+                        events[k + 1], side if side >= 0 else None, s.blocks[parent] if parent >= 0 else None))
+            # Every tunnel the engine places becomes a tip
+            if s.blocks[-1].type == 'tunnel': s.tunnel_tips.append(s.blocks[-1])
+        elif kind == ROLLBACK:
+            s.remove_cluster(events[k + 1])
+        elif kind == CLUSTER:
+            s.next_cluster_id = max(s.next_cluster_id, events[k + 1] + 1)
+    return s
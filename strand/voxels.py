@@ -0,0 +1,179 @@
+"""
+Sparse 3D voxel occupancy for stacked subterranean layers.
+
+Levels are LEVEL_HEIGHT m thick and counted down from the surface (level
+0). Each block type fills the levels of its DEPTHS range [top, bottom), so
+two blocks only collide where both their footprints and their depth ranges
+overlap: a deep cistern may sit under a shallow unit. Blocks of
+CONNECTOR_TYPES also own a vertical connector, a one-cell lightcore or
+chimney shaft at their centre running from the surface down to their top
+level, which must be clear like the block itself. Gap rules apply between
+blocks at overlapping depths.
+
+Storage is chunked: a chunk holds CHUNK x CHUNK columns of every level as
+one array of small owner ids (0 = empty) into a block table, allocated the
+first time anything is written into it. Memory therefore follows the built
+volume, at 4 bytes per voxel, instead of the site's extent.
+"""
+import array
+
+from strand.config import Config
+
+CHUNK = 16
+_MASK = CHUNK - 1
+_SHIFT = 4
+
+
+class VoxelGrid:
+    planar = False
+
+    def __init__(self, config=None):
+        cfg = config or Config()
+        self.depths = dict((t, tuple(r)) for t, r in cfg.DEPTHS.items())
+        self.levels = max(r[1] for r in self.depths.values())
+        self.level_height = cfg.LEVEL_HEIGHT
+        self.connector_types = tuple(cfg.CONNECTOR_TYPES)
+        # Levels every non-void type occupies: blocked there means blocked for all
+        shared = set(range(self.levels))
+        for t, (z0, z1) in self.depths.items():
+            if t != 'void': shared &= set(range(z0, z1))
+        self.shared = sorted(shared)
+
+        self.chunks = {}      # (cx, cy) -> array('i') of owner ids
+        self.table = [None]   # owner id -> Block
+        self.ids = {}         # Block -> owner id
+        self.spare = []       # Released owner ids
+
+    # --- STORAGE ---
+    def depth(self, b_type):
+        return self.depths.get(b_type, (0, self.levels))
+
+    def depth_m(self, b_type):
+        z0, z1 = self.depth(b_type)
+        return z0 * self.level_height, z1 * self.level_height
+
+    def _base(self, x, y, create=False):
+        key = (x >> _SHIFT, y >> _SHIFT)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if not create: return None, 0
+            chunk = self.chunks[key] = array.array('i', [0]) * (CHUNK * CHUNK * self.levels)
+        return chunk, ((y & _MASK) * CHUNK + (x & _MASK)) * self.levels
+
+    def _id(self, block):
+        i = self.ids.get(block)
+        if i is None:
+            if self.spare: i = self.spare.pop(); self.table[i] = block
+            else: i = len(self.table); self.table.append(block)
+            self.ids[block] = i
+        return i
+
+    def connector(self, block):
+        """(x, y, top, bottom) of the block's shaft, or None."""
+        if block.type not in self.connector_types: return None
+        z0 = self.depth(block.type)[0]
+        if z0 <= 0: return None
+        return block.gx + block.gw // 2, block.gy + block.gh // 2, 0, z0
+
+    def _columns(self, block):
+        z0, z1 = self.depth(block.type)
+        for x in range(block.min_x, block.max_x):
+            for y in range(block.min_y, block.max_y):
+                yield x, y, z0, z1
+        shaft = self.connector(block)
+        if shaft is not None: yield shaft
+
+    # --- UPDATES ---
+    def add(self, block):
+        i = self._id(block)
+        for x, y, z0, z1 in self._columns(block):
+            chunk, base = self._base(x, y, True)
+            for z in range(base + z0, base + z1): chunk[z] = i
+
+    def add_void(self, block):
+        # Voids block every level but never overwrite a placed block
+        i = self._id(block)
+        for x, y, z0, z1 in self._columns(block):
+            chunk, base = self._base(x, y, True)
+            for z in range(base + z0, base + z1):
+                if not chunk[z]: chunk[z] = i
+
+    def remove(self, block):
+        i = self.ids.pop(block, None)
+        if i is None: return
+        for x, y, z0, z1 in self._columns(block):
+            chunk, base = self._base(x, y)
+            if chunk is None: continue
+            for z in range(base + z0, base + z1):
+                if chunk[z] == i: chunk[z] = 0
+        self.table[i] = None
+        self.spare.append(i)
+
+    # --- QUERIES ---
+    def owner(self, x, y, z=None):
+        chunk, base = self._base(x, y)
+        if chunk is None: return None
+        if z is not None: return self.table[chunk[base + z]]
+        for k in range(base, base + self.levels):
+            if chunk[k]: return self.table[chunk[k]]
+        return None
+
+    def _column_free(self, x, y, z0, z1):
+        chunk, base = self._base(x, y)
+        if chunk is None: return True
+        for k in range(base + z0, base + z1):
+            if chunk[k]: return False
+        return True
+
+    def is_free(self, min_x, min_y, max_x, max_y, b_type=None):
+        z0, z1 = self.depth(b_type) if b_type is not None else (0, self.levels)
+        for x in range(min_x, max_x):
+            for y in range(min_y, max_y):
+                if not self._column_free(x, y, z0, z1): return False
+        return True
+
+    def free_run(self, x, y, dx, dy, cap):
+        # Counts a cell as blocked only when it is blocked for every type,
+        # so pruning on these runs stays safe at any depth
+        shared = self.shared
+        n = 0
+        while n < cap:
+            chunk, base = self._base(x, y)
+            if chunk is not None and shared and any(chunk[base + z] for z in shared): break
+            n += 1; x += dx; y += dy
+        return n
+
+    def collides(self, block, cluster_gap=0, cistern_gap=0, exempt=None):
+        return self.collides_rect(block.min_x, block.min_y, block.max_x, block.max_y,
+                                  block.type, block.cluster_id, cluster_gap, cistern_gap, exempt)
+
+    def collides_rect(self, min_x, min_y, max_x, max_y, b_type, cluster_id, cluster_gap=0, cistern_gap=0, exempt=None):
+        """
+        The gap rules of OccupancyGrid.collides_rect, applied to blocks whose
+        depth range overlaps the candidate's, plus a clear shaft for
+        connector types.
+        """
+        z0, z1 = self.depth(b_type)
+        if not self.is_free(min_x, min_y, max_x, max_y, b_type): return True
+        if b_type in self.connector_types and z0 > 0:
+            if not self._column_free(min_x + (max_x - min_x) // 2, min_y + (max_y - min_y) // 2, 0, z0): return True
+
+        is_cistern = b_type == 'cistern'
+        reach = max(cluster_gap, cistern_gap if is_cistern else 0)
+        if reach <= 0: return False
+
+        table = self.table
+        for x in range(min_x - reach, max_x + reach):
+            dx = max(min_x - x, x - max_x + 1, 0)
+            for y in range(min_y - reach, max_y + reach):
+                chunk, base = self._base(x, y)
+                if chunk is None: continue
+                d = max(dx, min_y - y, y - max_y + 1)
+                for k in range(base + z0, base + z1):
+                    if not chunk[k]: continue
+                    e = table[chunk[k]]
+                    if e is exempt or e.type == 'void': continue
+                    required = cluster_gap if e.cluster_id != cluster_id else 0
+                    if is_cistern and e.type == 'cistern' and cistern_gap > required: required = cistern_gap
+                    if required and d <= required: return True
+        return False
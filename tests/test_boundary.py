@@ -0,0 +1,52 @@
+from strand.boundary import CONTAINS_TOL, Boundary, CentreLattice, point_in_polygon
+
+G = 3.75
+# Right edge on a half-cell lattice column (187.5 = 100 x G / 2), slanted top
+PTS = [(0, 0), (187.5, 0), (187.5, 150), (60, 171.3), (0, 150)]
+
+
+def outline_distance(x, y, pts):
+    best = float('inf')
+    for i in range(len(pts)):
+        (ax, ay), (bx, by) = pts[i - 1], pts[i]
+        dx = bx - ax; dy = by - ay
+        t = max(0.0, min(1.0, ((x - ax) * dx + (y - ay) * dy) / float(dx * dx + dy * dy)))
+        best = min(best, ((ax + t * dx - x) ** 2 + (ay + t * dy - y) ** 2) ** 0.5)
+    return best
+
+
+def test_lattice_matches_ray_cast_and_tolerance():
+    lat = CentreLattice(PTS, G)
+    for tx in range(-4, 106):
+        for ty in range(-4, 96):
+            x = tx * G / 2; y = ty * G / 2
+            on_edge = outline_distance(x, y, PTS) <= CONTAINS_TOL
+            inside = point_in_polygon(x, y, PTS)
+            assert lat.contains(tx, ty) == (inside or on_edge)
+            assert lat.interior(tx, ty) == (inside and not on_edge)
+
+
+def test_centres_on_the_outline_are_coincident():
+    # The scripts keep candidates that are not Outside and seeds that are Inside
+    lat = CentreLattice(PTS, G)
+    assert lat.contains(100, 40) and not lat.interior(100, 40)   # on the right edge
+    assert lat.contains(0, 40) and not lat.interior(0, 40)       # on the left edge
+    assert lat.contains(99, 40) and lat.interior(99, 40)
+    assert not lat.contains(101, 40) and not lat.interior(101, 40)
+
+
+def test_tolerance_is_a_distance():
+    x = 187.5 + CONTAINS_TOL * 0.9
+    lat = CentreLattice([(0, 0), (x, 0), (x, 150), (0, 150)], G)
+    assert lat.contains(100, 40) and not lat.interior(100, 40)
+    lat = CentreLattice([(0, 0), (x, 0), (x, 150), (0, 150)], G, tol=0.0)
+    assert lat.contains(100, 40) and lat.interior(100, 40)
+    far = 187.5 - CONTAINS_TOL * 1.1
+    lat = CentreLattice([(0, 0), (far, 0), (far, 150), (0, 150)], G)
+    assert not lat.contains(100, 40)
+
+
+def test_boundary_shares_one_lattice_per_grid_unit():
+    b = Boundary(PTS)
+    assert b.lattice(G) is b.lattice(G)
+    assert b.lattice(G).contains(50, 50)
@@ -0,0 +1,133 @@
+import os
+
+import strand
+from strand.checkpoint import Checkpointer, checkpoint_matches, load_checkpoint, save_checkpoint
+from strand.growth import Growth
+from strand.presets import preset
+
+SITE = strand.Boundary([(0, 0), (300, 0), (300, 220), (0, 220)], [[(120, 80), (160, 80), (160, 120), (120, 120)]])
+
+
+class Stop(Exception):
+    pass
+
+
+def signature(s):
+    return [(b.gx, b.gy, b.gw, b.gh, b.type, b.cluster_id, b.attach_side,
+             b.parent.index if b.parent is not None else -1) for b in s.blocks]
+
+
+def interrupted(cfg, seed, after, hook):
+    # Run until `after` clusters have started, calling hook at each checkpoint
+    g = Growth(SITE, None, cfg, seed)
+    def checkpoint(engine):
+        hook(engine)
+        if engine.clusters_started == after: raise Stop
+    try: g.run(target_area=SITE.area * cfg.DENSITY_LIMIT, checkpoint=checkpoint)
+    except Stop: pass
+    return g
+
+
+def test_resume_continues_bit_for_bit(tmp_path):
+    path = str(tmp_path / 'run.ckpt')
+    for name in ('favourite', 'favourite2', 'tunnel_chain', 'cisterns_tunnels'):
+        for occupancy in ('cells', 'voxels'):
+            cfg = preset(name, OCCUPANCY=occupancy)
+            reference = strand.grow(SITE, cfg, seed=4)
+            for after in (1, 4):
+                interrupted(cfg, 4, after, lambda e: e.clusters_started == after and save_checkpoint(e, path))
+                town = strand.resume(path)
+                assert signature(town) == signature(reference), (name, occupancy, after)
+                assert town.area == reference.area
+                assert not os.path.exists(path)
+
+
+def test_saves_append_blocks_and_keep_the_state_small(tmp_path):
+    path = str(tmp_path / 'run.ckpt')
+    cfg = preset('favourite2')
+    saver = Checkpointer(path)
+    sizes = []
+    def hook(engine):
+        saver(engine)
+        sizes.append(os.path.getsize(path))
+    g = interrupted(cfg, 9, 8, hook)
+    with open(path + '.blocks') as f: rows = sum(1 for _ in f)
+    assert rows == len(g.settlement.blocks)
+    # The state file does not grow with the layout
+    assert max(sizes) < 2 * min(sizes)
+    assert signature(strand.resume(path)) == signature(strand.grow(SITE, cfg, seed=9))
+
+
+def test_rows_past_the_state_are_ignored(tmp_path):
+    path = str(tmp_path / 'run.ckpt')
+    cfg = preset('favourite')
+    interrupted(cfg, 2, 3, lambda e: e.clusters_started == 3 and save_checkpoint(e, path))
+    n = len(load_checkpoint(path).settlement.blocks)
+    # A crash between appending rows and replacing the state
+    with open(path + '.blocks', 'a') as f: f.write('[0,0,1,1,"prod",99,null,-1]\n')
+    assert len(load_checkpoint(path).settlement.blocks) == n
+    assert signature(strand.resume(path)) == signature(strand.grow(SITE, cfg, seed=2))
+
+
+def test_checkpoint_only_matches_its_own_run(tmp_path):
+    path = str(tmp_path / 'run.ckpt')
+    cfg = preset('favourite')
+    assert not checkpoint_matches(path, cfg, 5, SITE)
+    interrupted(cfg, 5, 2, lambda e: e.clusters_started == 2 and save_checkpoint(e, path))
+    other = strand.Boundary([(0, 0), (300, 0), (300, 221), (0, 221)])
+    assert checkpoint_matches(path, cfg, 5, SITE)
+    assert not checkpoint_matches(path, cfg, 6, SITE)
+    assert not checkpoint_matches(path, preset('favourite2'), 5, SITE)
+    assert not checkpoint_matches(path, cfg, 5, other)
+
+
+def test_finished_run_removes_its_checkpoint(tmp_path):
+    path = str(tmp_path / 'run.ckpt')
+    town = strand.grow(SITE, preset('favourite'), seed=1, checkpoint=path)
+    assert town.blocks
+    assert not os.path.exists(path) and not os.path.exists(path + '.blocks')
+
+
+def interrupted_extend(base, cfg, seed, n, after, path):
+    g = Growth(SITE, base, cfg, seed)
+    saver = Checkpointer(path)
+    def checkpoint(engine):
+        saver(engine)
+        if engine.clusters_started == after: raise Stop
+    try: g.run(max_clusters=n, checkpoint=checkpoint)
+    except Stop: pass
+    return g
+
+
+def test_extend_checkpoint_matches_only_its_base_and_mode(tmp_path):
+    path = str(tmp_path / 'run.ckpt')
+    cfg = preset('tunnel_chain')
+    base = strand.grow(SITE, cfg.copy(DENSITY_LIMIT=0.3), seed=1)
+    layout = str(tmp_path / 'base.json')
+    strand.save_layout(base, layout)
+    interrupted_extend(strand.load_layout(layout), cfg, 7, 5, 2, path)
+
+    assert checkpoint_matches(path, cfg, 7, SITE, strand.load_layout(layout), 5)
+    # A fresh grow() with the same config, seed and site is another run
+    assert not checkpoint_matches(path, cfg, 7, SITE)
+    assert not checkpoint_matches(path, cfg, 7, SITE, strand.load_layout(layout), 4)
+    other = strand.grow(SITE, cfg.copy(DENSITY_LIMIT=0.3), seed=2)
+    assert not checkpoint_matches(path, cfg, 7, SITE, other, 5)
+    # One block more or less in the base is a different base
+    shorter = strand.load_layout(layout)
+    shorter.blocks.pop()
+    assert not checkpoint_matches(path, cfg, 7, SITE, shorter, 5)
+
+    # And the extend() it belongs to resumes bit for bit
+    reference = strand.load_layout(layout)
+    strand.extend(reference, SITE, 5, cfg, 7)
+    assert signature(strand.resume(path)) == signature(reference)
+
+
+def test_grow_checkpoint_does_not_match_an_extend(tmp_path):
+    path = str(tmp_path / 'run.ckpt')
+    cfg = preset('favourite')
+    interrupted(cfg, 5, 2, lambda e: e.clusters_started == 2 and save_checkpoint(e, path))
+    empty = strand.Settlement(cfg.GRID_UNIT)
+    assert checkpoint_matches(path, cfg, 5, SITE)
+    assert not checkpoint_matches(path, cfg, 5, SITE, empty, 3)
@@ -0,0 +1,57 @@
+from collections import Counter
+
+import strand
+from strand.growth import Growth
+from strand.presets import preset
+from strand.trace import read_trace, iter_events
+
+# Seed 2 of favourite on this L loses a cluster to its cistern without the reservation
+L_SITE = strand.Boundary([(0, 0), (200, 0), (200, 45), (45, 45), (45, 200), (0, 200)])
+RING = strand.Boundary([(0, 0), (240, 0), (240, 180), (0, 180)], [[(90, 60), (150, 60), (150, 120), (90, 120)]])
+
+
+def rollbacks(path):
+    return sum(1 for e in iter_events(read_trace(path)[1]) if e['kind'] == 'rollback')
+
+
+def test_every_reserved_hub_gets_its_cistern(tmp_path):
+    path = str(tmp_path / 'free.trace')
+    strand.grow(L_SITE, preset('favourite'), seed=2, trace=path)
+    assert rollbacks(path) > 0
+
+    path = str(tmp_path / 'reserved.trace')
+    town = strand.grow(L_SITE, preset('favourite', CISTERN_RESERVE=True), seed=2, trace=path)
+    assert rollbacks(path) == 0
+    hubs = Counter(b.cluster_id for b in town.blocks if b.type == 'gather')
+    cisterns = Counter(b.cluster_id for b in town.blocks if b.type == 'cistern')
+    assert hubs and all(cisterns[cid] >= 1 for cid in hubs)
+
+
+def test_cistern_slot_is_free_and_tight():
+    cfg = preset('favourite', CISTERN_RESERVE=True)
+    g = Growth(RING, None, cfg, 0)
+    g.place_seed()
+    g.start_cluster()
+    assert g.build_queue[:2] == ['gather', 'cistern']
+    assert g.cistern_check('gather') is not None
+    assert g.cistern_check('living') is None
+    assert Growth(RING, None, preset('favourite'), 0).cistern_check('gather') is None
+
+    hx, hy, gw, gh = 2, 2, 6, 6
+    cx, cy, side = g.cistern_slot(hx, hy, gw, gh)
+    cw, ch = cfg.CISTERN_RETRY_SIZE
+    assert g.settlement.occupancy.is_free(cx, cy, cx + cw, cy + ch, 'cistern')
+    # Touches the hub along one face and does not overlap it
+    x_touch = cx + cw == hx or cx == hx + gw
+    y_touch = cy + ch == hy or cy == hy + gh
+    assert x_touch != y_touch
+    # A tunnel over that slot pushes it elsewhere
+    other = g.cistern_slot(hx, hy, gw, gh, tunnel=(cx, cy, cw, ch))
+    assert other is not None and other[:2] != (cx, cy)
+
+
+def test_dropped_hubs_end_the_run():
+    g = Growth(RING, None, preset('tunnel_chain', CISTERN_RESERVE=True), 0)
+    g.run(target_area=RING.area * g.cfg.DENSITY_LIMIT)
+    assert g.fails >= g.cfg.MAX_FAILS
+    assert g.total_fails < g.cfg.MAX_TOTAL_FAILS
@@ -0,0 +1,45 @@
+import math
+
+from strand.blocks import Block
+from strand.config import Config
+from strand.daylight import SHAFT_LUX, Daylight, daylight
+from strand.settlement import Settlement
+
+G = 3.75
+
+
+def test_single_lightcore_by_hand():
+    # A 3 x 3 cell room with 3.75 m spacing has one lightcore, over its middle cell
+    cfg = Config(LIGHT_SPACING=3.75)
+    room = Block(0, 0, 3, 3, 'living', 0)
+    d = Daylight(cfg, falloff='inverse_square', scale=3.0)
+    gw, gh, ox, oy, lux = d.illuminance(room)
+    assert (gw, gh, ox, oy) == (3, 3, G / 2, G / 2)
+
+    def expected(dist): return SHAFT_LUX * (1.0 + (dist / 3.0) ** 2) ** -1.5
+    edge = expected(G); corner = expected(G * math.sqrt(2))
+    assert abs(lux[4] - SHAFT_LUX) < 1e-9
+    for k in (1, 3, 5, 7): assert abs(lux[k] - edge) < 1e-9
+    for k in (0, 2, 6, 8): assert abs(lux[k] - corner) < 1e-9
+    lit, mean = d.coverage(room)
+    assert lit == 1 / 9.0   # Only the middle cell reaches LIT_LUX
+    assert abs(mean - (SHAFT_LUX + 4 * edge + 4 * corner) / 9) < 1e-9
+
+
+def test_spacing_changes_lights_not_the_sample_grid():
+    room = Block(0, 0, 6, 4, 'gather', 0)
+    sparse = Daylight(Config(LIGHT_SPACING=3.75)).illuminance(room)
+    dense = Daylight(Config(LIGHT_SPACING=1.875)).illuminance(room)
+    assert sparse[:4] == dense[:4] and len(sparse[4]) == len(dense[4]) == 24
+    # More lightcores on the same points give more light everywhere
+    assert all(b >= a for a, b in zip(sparse[4], dense[4]))
+
+
+def test_summary_weights_rooms_by_area():
+    s = Settlement(G)
+    s.add(Block(0, 0, 3, 3, 'living', 0))
+    s.add(Block(3, 0, 1, 1, 'living', 0))   # Too small for a ring: dark
+    s.add(Block(0, 3, 3, 3, 'prod', 0))     # Not evaluated
+    m = daylight(s, Config(LIGHT_SPACING=3.75))
+    assert abs(m['living_lit_fraction'] - (1 / 9.0 * 9) / 10) < 1e-12
+    assert m['gather_lit_fraction'] == 0.0 and m['gather_mean_lux'] == 0.0
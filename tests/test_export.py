@@ -0,0 +1,120 @@
+import io
+import json
+import xml.etree.ElementTree as ET
+from collections import Counter
+
+import strand
+from strand.blocks import Block
+from strand.config import Config
+from strand.export import CIRCLE_SEGMENTS, LAYERS, export, write_dxf, write_geojson, write_svg
+from strand.frames import HOLE_TYPES
+from strand.lighting import light_centres
+from strand.settlement import Settlement
+
+G = 3.75
+
+
+def layout():
+    # Same layout as test_metrics: two clusters joined by a tunnel
+    s = Settlement(G)
+    hub = s.add(Block(0, 0, 4, 4, 'gather', 0))
+    living = s.add(Block(4, 0, 3, 3, 'living', 0, 1, hub))
+    s.add(Block(0, 4, 4, 2, 'prod', 0, 2, hub))
+    s.add(Block(4, 4, 2, 2, 'cistern', 0, 1, hub))
+    tunnel = s.add(Block(7, 1, 3, 2, 'tunnel', 1, None, living))
+    s.add(Block(10, 0, 4, 4, 'gather', 1, None, tunnel))
+    return s
+
+
+def expected_counts(s, cfg):
+    counts = Counter(b.type for b in s.blocks)
+    counts['drainage'] = len(s.blocks)
+    counts['holes'] = sum(1 for b in s.blocks if b.type in HOLE_TYPES)
+    counts['lights'] = sum(len(light_centres(b, cfg)) for b in s.blocks)
+    return counts
+
+
+def text(writer, source, cfg):
+    out = io.StringIO()
+    n = writer(source, out, cfg)
+    return n, out.getvalue()
+
+
+def test_geojson_features_per_layer():
+    cfg = Config()
+    s = layout()
+    n, body = text(write_geojson, s, cfg)
+    data = json.loads(body)
+    assert data['type'] == 'FeatureCollection' and len(data['features']) == n
+    assert Counter(f['properties']['layer'] for f in data['features']) == expected_counts(s, cfg)
+    for f in data['features']:
+        props = f['properties']; ring = f['geometry']['coordinates'][0]
+        circle = props['layer'] == 'lights' or props['type'] == 'cistern'
+        assert ring[0] == ring[-1] and len(ring) == (CIRCLE_SEGMENTS + 1 if circle else 5)
+    living = [f for f in data['features'] if f['properties']['layer'] == 'living'][0]
+    assert living['properties']['cluster'] == 0
+    assert living['geometry']['coordinates'][0][:3] == [[15.0, 0.0], [26.25, 0.0], [26.25, 11.25]]
+
+
+def test_svg_layer_groups():
+    cfg = Config()
+    s = layout()
+    n, body = text(write_svg, s, cfg)
+    ns = '{http://www.w3.org/2000/svg}'
+    root = ET.fromstring(body)
+    assert root.tag == ns + 'svg'
+    flip = root.find(ns + 'g')
+    groups = flip.findall(ns + 'g')
+    assert [g.get('class') for g in groups] == list(LAYERS)
+    counts = expected_counts(s, cfg)
+    for g in groups:
+        assert len(list(g)) == counts[g.get('class')]
+        for shape in g: assert shape.tag in (ns + 'rect', ns + 'circle')
+    assert sum(len(list(g)) for g in groups) == n
+
+
+def dxf_pairs(body):
+    lines = body.split('\n')
+    assert lines[-1] == ''
+    return [(int(lines[k]), lines[k + 1]) for k in range(0, len(lines) - 1, 2)]
+
+
+def test_dxf_entity_structure():
+    cfg = Config()
+    s = layout()
+    n, body = text(write_dxf, s, cfg)
+    pairs = dxf_pairs(body)
+    assert pairs[-1] == (0, 'EOF')
+    sections = [pairs[k + 1][1] for k, p in enumerate(pairs) if p == (0, 'SECTION')]
+    assert sections == ['TABLES', 'ENTITIES']
+    declared = set(v for (c, v), prev in zip(pairs[1:], pairs) if c == 2 and prev == (0, 'LAYER'))
+    assert declared == set(l.upper() for l in LAYERS)
+
+    start = pairs.index((2, 'ENTITIES')) + 1
+    entities = [v for c, v in pairs[start:] if c == 0]
+    assert entities[-2:] == ['ENDSEC', 'EOF']
+    entities = entities[:-2]
+    # Every POLYLINE is four VERTEXes and a SEQEND; nothing else nests
+    k = 0; polylines = circles = 0
+    while k < len(entities):
+        if entities[k] == 'CIRCLE': circles += 1; k += 1; continue
+        assert entities[k:k + 6] == ['POLYLINE'] + ['VERTEX'] * 4 + ['SEQEND']
+        polylines += 1; k += 6
+    counts = expected_counts(s, cfg)
+    assert circles == counts['lights'] + 2   # The cistern and its drainage circle
+    assert polylines + circles == n == sum(counts.values())
+    layers = [v for c, v in pairs[start:] if c == 8]
+    assert set(layers) <= declared
+
+
+def test_packed_layout_exports_the_same(tmp_path):
+    cfg = Config()
+    s = layout()
+    path = str(tmp_path / 'plan.strand')
+    strand.write_packed(path, s)
+    with strand.open_packed(path) as packed:
+        for writer in (write_geojson, write_svg, write_dxf):
+            assert text(writer, packed, cfg) == text(writer, s, cfg)
+    svg = str(tmp_path / 'plan.svg')
+    assert export(s, svg, cfg) == text(write_svg, s, cfg)[0]
+    with open(svg) as f: assert f.read() == text(write_svg, s, cfg)[1]
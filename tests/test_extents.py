@@ -0,0 +1,52 @@
+import strand
+from strand.config import Config
+from strand.extents import FreeExtents
+from strand.presets import preset, PRESETS
+from strand.strategies import anchors_tight
+
+SITE = strand.Boundary([(0, 0), (260, 0), (260, 180), (0, 180)], [[(100, 70), (140, 70), (140, 110), (100, 110)]])
+CHECKED = ('tunnel_chain', 'cisterns_tunnels', 'favourite2')
+
+
+def signature(s):
+    return [(b.gx, b.gy, b.gw, b.gh, b.type, b.cluster_id, b.attach_side) for b in s.blocks]
+
+
+def test_size_retries_are_opt_in():
+    # Redrawing sizes changes layouts, so no script preset turns it on
+    assert Config().SIZE_RETRIES == 0
+    assert all(preset(name).SIZE_RETRIES == 0 for name in PRESETS)
+
+
+def test_retries_off_never_measures(monkeypatch):
+    def runs(self, block): raise AssertionError('measured a free run')
+    ref = dict((name, signature(strand.grow(SITE, preset(name), seed=3))) for name in CHECKED)
+    monkeypatch.setattr(FreeExtents, 'runs', runs)
+    for name in CHECKED:
+        assert signature(strand.grow(SITE, preset(name), seed=3)) == ref[name]
+
+
+def test_pruning_leaves_layouts_unchanged(monkeypatch):
+    # Only the size redraws change the layout; pruning alone must not
+    for name in CHECKED:
+        cfg = preset(name, SIZE_RETRIES=3)
+        pruned = signature(strand.grow(SITE, cfg, seed=5))
+        with monkeypatch.context() as m:
+            m.setattr(FreeExtents, 'open_anchors', lambda self, parent, w, h: None)
+            assert signature(strand.grow(SITE, cfg, seed=5)) == pruned, name
+
+
+def test_pruned_anchors_are_blocked():
+    cfg = preset('cisterns_tunnels', SIZE_RETRIES=3)
+    town = strand.grow(SITE, cfg, seed=2)
+    occ = town.occupancy
+    ext = FreeExtents(occ, cfg)
+    pruned = 0
+    for parent in town.blocks[::7]:
+        ext.runs(parent)
+        for w, h in ((2, 3), (4, 4), (6, 5), (8, 8)):
+            for (gx, gy, side), ok in zip(anchors_tight(parent, w, h, cfg), ext.open_anchors(parent, w, h)):
+                if not ok:
+                    pruned += 1
+                    assert not occ.is_free(gx, gy, gx + w, gy + h)
+    assert pruned
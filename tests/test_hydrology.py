@@ -0,0 +1,61 @@
+import strand
+from strand.blocks import Block
+from strand.hydrology import RUNOFF, hydrology, hydrology_batch
+from strand.settlement import Settlement
+
+G = 3.75
+SITE = strand.Boundary([(-15, -15), (45, -15), (45, 45), (-15, 45)])
+
+
+def layout(cistern=True):
+    s = Settlement(G)
+    hub = s.add(Block(0, 0, 4, 4, 'gather', 0))
+    s.add(Block(4, 0, 3, 3, 'living', 0, 1, hub))
+    s.add(Block(0, 4, 4, 2, 'prod', 0, 2, hub))
+    if cistern: s.add(Block(4, 4, 2, 2, 'cistern', 0, 1, hub))
+    return s
+
+
+def inside_cells(h):
+    return sum(1 for v in h.raster.inside if v)
+
+
+def test_graded_site_drains_everything_to_the_cistern():
+    # A proximity assignment: every cell goes to its nearest cistern
+    h = hydrology(layout(), SITE)
+    m = h.summary()
+    assert m['routing'] == 'proximity'
+    assert abs(m['captured_fraction'] - 1.0) < 1e-9
+    assert m['cisterns'] == 1
+    assert inside_cells(h) == 16 * 16
+    assert m['max_catchment_m2'] == inside_cells(h) * G * G
+    # Runoff is bounded by the least and most shedding surfaces
+    rain = 10.0 / 1000.0 * G * G * inside_cells(h)
+    assert RUNOFF['soil'] * rain < m['runoff_m3'] < RUNOFF['cistern'] * rain
+
+
+def test_runoff_scales_with_rainfall():
+    a = hydrology(layout(), SITE, rainfall_mm=10.0).summary()
+    b = hydrology(layout(), SITE, rainfall_mm=20.0).summary()
+    assert abs(b['runoff_m3'] - 2 * a['runoff_m3']) < 1e-9
+    assert abs(b['captured_m3'] - 2 * a['captured_m3']) < 1e-9
+
+
+def test_slope_limits_the_catchment_to_upslope_cells():
+    # Ground falls to the west: only the cistern's rows from it to the east edge reach it
+    h = hydrology(layout(), SITE, elevation=lambda x, y: x)
+    m = h.summary()
+    assert m['routing'] == 'descent'
+    assert m['max_catchment_m2'] == 2 * 8 * G * G
+    assert 0 < m['captured_m3'] < m['runoff_m3']
+
+
+def test_no_cistern_captures_nothing():
+    m = hydrology(layout(cistern=False), SITE).summary()
+    assert m['cisterns'] == 0 and m['captured_m3'] == 0 and m['captured_fraction'] == 0
+    assert m['runoff_m3'] > 0
+
+
+def test_batch_matches_single_runs():
+    layouts = [layout(), layout(cistern=False)]
+    assert list(hydrology_batch(iter(layouts), SITE)) == [hydrology(s, SITE).summary() for s in layouts]
@@ -0,0 +1,55 @@
+import strand
+from strand.layout import settlement_from_dict, settlement_to_dict
+from strand.presets import preset
+
+SITE = strand.Boundary([(0, 0), (300, 0), (300, 220), (0, 220)], [[(120, 80), (160, 80), (160, 120), (120, 120)]])
+
+
+def signature(s):
+    return [(b.gx, b.gy, b.gw, b.gh, b.type, b.cluster_id, b.attach_side,
+             b.parent.index if b.parent is not None else -1) for b in s.blocks]
+
+
+def same_settlement(a, b):
+    assert signature(a) == signature(b)
+    assert [t.index for t in a.tunnel_tips] == [t.index for t in b.tunnel_tips]
+    assert a.next_cluster_id == b.next_cluster_id
+    assert abs(a.area - b.area) < 1e-6
+
+
+def test_json_round_trip(tmp_path):
+    town = strand.grow(SITE, preset('tunnel_chain'), seed=2)
+    assert town.tunnel_tips
+    path = str(tmp_path / 'town.json')
+    strand.save_layout(town, path)
+    same_settlement(strand.load_layout(path), town)
+    same_settlement(settlement_from_dict(settlement_to_dict(town)), town)
+
+
+def test_packed_round_trip(tmp_path):
+    cfg = preset('cisterns_tunnels')
+    town = strand.grow(SITE, cfg, seed=6)
+    path = str(tmp_path / 'town.strand')
+    strand.write_packed(path, town, SITE, seed=6, config=cfg)
+    same_settlement(strand.load_packed(path), town)
+
+    with strand.open_packed(path) as layout:
+        assert layout.count == len(town.blocks)
+        assert layout.meta['config_hash'] == cfg.digest() and layout.meta['seed'] == 6
+        assert layout.select('cistern') == [b.index for b in town.blocks if b.type == 'cistern']
+        assert layout.select(cluster_id=3) == [b.index for b in town.blocks if b.cluster_id == 3]
+        assert layout.rect(5) == (town.blocks[5].gx, town.blocks[5].gy, town.blocks[5].gw, town.blocks[5].gh)
+        assert layout.mask_rows() == SITE.cell_mask(cfg.GRID_UNIT)
+
+
+def test_loaded_layouts_keep_growing_alike(tmp_path):
+    cfg = preset('tunnel_chain')
+    town = strand.grow(SITE, cfg, seed=2)
+    json_path = str(tmp_path / 'town.json'); packed_path = str(tmp_path / 'town.strand')
+    strand.save_layout(town, json_path)
+    strand.write_packed(packed_path, town)
+    a = strand.load_layout(json_path); b = strand.load_packed(packed_path)
+    assert strand.extend(a, SITE, 2, cfg, seed=8)
+    strand.extend(b, SITE, 2, cfg, seed=8)
+    same_settlement(a, b)
+    assert signature(a)[:len(town.blocks)] == signature(town)
@@ -0,0 +1,77 @@
+import strand
+from strand.blocks import Block
+from strand.config import Config
+from strand.lighting import light_centres
+from strand.metrics import FIELDS, layout_metrics, metrics_row, outline_edges
+from strand.presets import preset
+from strand.settlement import Settlement
+
+G = 3.75
+
+
+def layout():
+    # Cluster 0: hub, living, prod, cistern; cluster 1: a hub reached by a tunnel
+    s = Settlement(G)
+    hub = s.add(Block(0, 0, 4, 4, 'gather', 0))
+    living = s.add(Block(4, 0, 3, 3, 'living', 0, 1, hub))
+    s.add(Block(0, 4, 4, 2, 'prod', 0, 2, hub))
+    s.add(Block(4, 4, 2, 2, 'cistern', 0, 1, hub))
+    tunnel = s.add(Block(7, 1, 3, 2, 'tunnel', 1, None, living))
+    s.add(Block(10, 0, 4, 4, 'gather', 1, None, tunnel))
+    return s
+
+
+def naive_outline(blocks):
+    cells = set()
+    for b in blocks:
+        for x in range(b.min_x, b.max_x):
+            for y in range(b.min_y, b.max_y): cells.add((x, y))
+    return sum(1 for (x, y) in cells for n in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)) if n not in cells)
+
+
+def test_counts_areas_and_ratios():
+    m = layout_metrics(layout())
+    assert m['blocks'] == 6 and m['clusters'] == 2
+    assert (m['count_gather'], m['count_living'], m['count_prod'], m['count_cistern'], m['count_tunnel']) == (2, 1, 1, 1, 1)
+    assert m['area_total'] == (16 + 9 + 8 + 4 + 16) * G * G
+    assert m['area_tunnel'] == 6 * G * G
+    assert m['ratio_living'] == 0.5 and m['ratio_prod'] == 0.5
+    assert (m['cluster_blocks_min'], m['cluster_blocks_max'], m['cluster_blocks_mean']) == (1, 4, 2.5)
+    assert m['fill'] == 0.0
+
+
+def test_outlines_match_a_cell_by_cell_count():
+    s = layout()
+    m = layout_metrics(s)
+    assert m['drainage_length'] == naive_outline(s.blocks) * G
+    per_cluster = []
+    for cid in (0, 1):
+        members = [b for b in s.blocks if b.cluster_id == cid and b.type != 'tunnel']
+        per_cluster.append(naive_outline(members) / (sum(b.cells() for b in members) * G))
+    assert abs(m['cluster_pa_mean'] - sum(per_cluster) / 2) < 1e-12
+    units = [b for b in s.blocks if b.type != 'tunnel']
+    assert abs(m['block_pa_mean'] - sum(2.0 * (b.gw + b.gh) / (b.cells() * G) for b in units) / len(units)) < 1e-12
+    assert outline_edges({0: 0b111, 1: 0b101}) == naive_outline([Block(0, 0, 3, 1, 'prod', 0), Block(0, 1, 1, 1, 'prod', 0),
+                                                                 Block(2, 1, 1, 1, 'prod', 0)])
+
+
+def test_lights_match_light_centres():
+    cfg = Config()
+    s = layout()
+    m = layout_metrics(s, cfg)
+    for t in ('living', 'gather', 'prod'):
+        want = sum(len(light_centres(b, cfg)) for b in s.blocks if b.type == t) if t in cfg.LIGHT_TYPES else 0
+        assert m['lights_' + t] == want
+
+
+def test_settlement_and_packed_file_agree(tmp_path):
+    site = strand.Boundary([(0, 0), (250, 0), (250, 180), (0, 180)])
+    cfg = preset('favourite2')
+    town = strand.grow(site, cfg, seed=1)
+    path = str(tmp_path / 'town.strand')
+    strand.write_packed(path, town)
+    with strand.open_packed(path) as packed:
+        assert metrics_row(layout_metrics(packed, cfg, site)) == metrics_row(layout_metrics(town, cfg, site))
+    m = layout_metrics(town, cfg, site)
+    assert set(m) == set(FIELDS)
+    assert abs(m['fill'] - town.area / site.area) < 1e-12
@@ -0,0 +1,73 @@
+from strand.blocks import Block, void_block
+from strand.network import Network
+from strand.settlement import Settlement
+
+
+def layout():
+    """
+    Two clusters two cells apart. Cluster 0: a hub with a living unit on
+    its right and a prod on top; a second living unit only touches the hub
+    at a corner. Cluster 1: a hub whose living unit is placed against
+    cluster 0's prod, so its parent link says nothing about its doors.
+    """
+    s = Settlement(3.75)
+    hub = s.add(Block(0, 0, 4, 4, 'gather', 0))
+    s.add(Block(4, 0, 3, 3, 'living', 0, 1, hub))
+    s.add(Block(0, 4, 4, 2, 'prod', 0, 2, hub))
+    s.add(Block(4, 4, 2, 2, 'living', 0, 1, hub))          # corner only
+    hub1 = s.add(Block(9, 0, 4, 4, 'gather', 1))
+    s.add(Block(4, 6, 3, 3, 'living', 1, 2, hub1))          # shares a wall with cluster 0's prod
+    return s
+
+
+def test_links_follow_shared_walls_not_parents():
+    s = layout()
+    net = s.network
+    b = s.blocks
+    assert net.connected(b[0].index, b[1].index)
+    assert net.connected(b[0].index, b[2].index)
+    # The corner unit shares walls with the first living unit and the prod
+    assert net.connected(b[3].index, b[0].index)
+    # Cluster 1's living unit reaches cluster 0 through the wall it shares, not its own hub
+    assert net.connected(b[5].index, b[0].index)
+    assert not net.connected(b[5].index, b[4].index)
+    assert net.components == 2 and not net.is_connected()
+    assert net.largest_component() == 5
+    assert net.hub_reach() == (3, 4)
+    dist = net.all_hub_distances()
+    assert dist[0][b[1].index] is not None and dist[1][b[5].index] is None
+
+
+def test_tunnel_links_hub_and_parent():
+    s = Settlement(3.75)
+    a = s.add(Block(0, 0, 4, 4, 'gather', 0))
+    t = s.add(Block(4, 1, 2, 2, 'tunnel', 1, None, a))
+    s.add(Block(6, 0, 4, 4, 'gather', 1, None, t))
+    assert s.network.is_connected()
+    assert s.network.path_length(0, 2) == 6 * 3.75
+
+
+def test_voids_are_not_part_of_the_network():
+    s = Settlement(3.75)
+    s.add_void(void_block(4, 0, 6, 4))
+    s.add(Block(0, 0, 4, 4, 'gather', 0))
+    s.add(Block(6, 0, 4, 4, 'gather', 1))
+    assert s.network.components == 2
+
+
+def test_rollback_restores_the_graph():
+    s = layout()
+    before = (s.network.components, [sorted(a) for a in s.network.adj])
+    hub = s.add(Block(0, -5, 4, 4, 'gather', 2))
+    s.add(Block(0, -1, 4, 1, 'prod', 2, 2, hub))           # bridges into cluster 0
+    s.add(Block(4, -4, 9, 4, 'living', 2, 1, hub))         # and into cluster 1
+    assert s.network.is_connected()
+    s.remove_cluster(2)
+    assert (s.network.components, [sorted(a) for a in s.network.adj]) == before
+
+
+def test_occupancy_lookup_matches_the_plain_wall_test():
+    s = layout()
+    plain = Network(3.75)
+    for b in s.blocks: plain.add(b)
+    assert [sorted(a) for a in plain.adj] == [sorted(a) for a in s.network.adj]
@@ -0,0 +1,49 @@
+import pytest
+
+import strand
+from strand.presets import preset, PRESETS
+from strand.settlement import OCCUPANCY
+
+BACKENDS = ('cells', 'rows', 'tiles', 'voxels')
+SITE = strand.Boundary([(0, 0), (240, 0), (240, 60), (300, 60), (300, 200), (0, 200)],
+                       [[(100, 80), (140, 80), (140, 120), (100, 120)]])
+
+
+def signature(s):
+    return [(b.gx, b.gy, b.gw, b.gh, b.type, b.cluster_id, b.attach_side,
+             b.parent.index if b.parent is not None else -1) for b in s.blocks]
+
+
+@pytest.mark.parametrize('name', sorted(PRESETS))
+def test_every_backend_grows_the_same_layout(name):
+    for seed in (0, 1):
+        layouts = [signature(strand.grow(SITE, preset(name, OCCUPANCY=o), seed=seed)) for o in BACKENDS]
+        assert layouts[0], (name, seed)
+        for o, layout in zip(BACKENDS[1:], layouts[1:]):
+            assert layout == layouts[0], (name, seed, o)
+
+
+def test_backends_agree_on_queries():
+    town = strand.grow(SITE, preset('favourite2'), seed=4)
+    grids = [OCCUPANCY[o](preset('favourite2')) for o in BACKENDS]
+    for g in grids:
+        for b in town.blocks: g.add(b)
+    for x in range(-2, 84, 3):
+        for y in range(-2, 56, 3):
+            assert len(set(id(g.owner(x, y)) for g in grids)) == 1
+            answers = set(g.collides_rect(x, y, x + 3, y + 2, 'prod', 999, 1, 1) for g in grids)
+            assert len(answers) == 1, (x, y)
+            assert len(set(g.free_run(x, y, 1, 0, 12) for g in grids)) == 1
+
+    # Removing a cluster leaves the same answers as never adding it
+    last = town.blocks[-1].cluster_id
+    gone = [b for b in town.blocks if b.cluster_id == last]
+    for g in grids:
+        for b in gone: g.remove(b)
+    fresh = OCCUPANCY['cells'](preset('favourite2'))
+    for b in town.blocks:
+        if b.cluster_id != last: fresh.add(b)
+    for x in range(0, 84, 2):
+        for y in range(0, 56, 2):
+            want = fresh.collides_rect(x, y, x + 2, y + 2, 'cistern', 999, 1, 1)
+            assert all(g.collides_rect(x, y, x + 2, y + 2, 'cistern', 999, 1, 1) == want for g in grids)
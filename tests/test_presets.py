@@ -0,0 +1,58 @@
+import hashlib
+
+import pytest
+
+import strand
+from strand.presets import preset, PRESETS
+
+# Right edge on a half-cell lattice column (187.5 = 100 x 3.75 / 2), so some
+# centres land on the outline and the 0.1 m Contains tolerance decides them
+SITE = strand.Boundary([(0.0, 0.0), (187.5, 0.0), (187.5, 120.0), (96.4, 161.3), (3.2, 128.9)])
+
+# (preset, seed): (blocks, digest) of each script's own output on SITE for
+# that seed, run through a minimal stand-in for RhinoCommon's rectangles,
+# circles and Curve.Contains(pt, plane, 0.1). favourite2.py overwrites its
+# seed input with 2024. tunnel_chain is not pinned: temp,py shuffles every
+# tunnel tip for each hub, while the engine picks from its tip index, so
+# the preset keeps the script's rules but not its random stream.
+SCRIPT_LAYOUTS = {
+    ('cluster_logic', 1): (59, 'b0cce6202623704b'),
+    ('cluster_logic', 2): (56, 'a56c634dd76e9503'),
+    ('cisterns', 1): (75, '3c006597d579c7d6'),
+    ('cisterns', 2): (75, '1200ba023b0b5db2'),
+    ('cisterns_tunnels', 1): (75, '124a8acda52205b7'),
+    ('cisterns_tunnels', 2): (67, '7dcffd331e6b0977'),
+    ('cisterns_empty_spaces', 1): (63, '50a9874195544f65'),
+    ('cisterns_empty_spaces', 2): (55, '5f33a2813a5e3668'),
+    ('favourite', 1): (68, '593c3d6e3b1d85a6'),
+    ('favourite', 2): (38, '97b889363c3aa894'),
+    ('favourite2', 2024): (128, 'cf78ba4af00d292f'),
+    ('251208_Script', 1): (75, '124a8acda52205b7'),
+    ('251208_Script', 2): (67, '7dcffd331e6b0977'),
+}
+
+
+def script_signature(settlement, cfg):
+    # What the script outputs: rects in cells, round cisterns as centre and
+    # radius in half cells, tunnels only where the script draws them
+    out = []
+    for b in settlement.blocks:
+        if b.type == 'tunnel' and 'tunnels' not in cfg.OUTPUTS: continue
+        if b.type == 'cistern': out.append(('cistern', 2 * b.gx + b.gw, 2 * b.gy + b.gh, min(b.gw, b.gh)))
+        else: out.append((b.type, b.gx, b.gy, b.gw, b.gh))
+    return sorted(out)
+
+
+def digest(signature):
+    return hashlib.sha1(repr(signature).encode('ascii')).hexdigest()[:16]
+
+
+@pytest.mark.parametrize('name, seed', sorted(SCRIPT_LAYOUTS))
+def test_preset_reproduces_its_script(name, seed):
+    cfg = preset(name)
+    sig = script_signature(strand.grow(SITE, cfg, seed=seed), cfg)
+    assert (len(sig), digest(sig)) == SCRIPT_LAYOUTS[(name, seed)]
+
+
+def test_every_script_preset_is_pinned():
+    assert set(name for name, seed in SCRIPT_LAYOUTS) == set(PRESETS) - set(['tunnel_chain'])
@@ -0,0 +1,115 @@
+import os
+import struct
+import zlib
+
+import strand
+from strand.blocks import BLOCK_TYPES, Block
+from strand.presets import preset
+from strand.render import (GAP, GROUND, OUTSIDE, PALETTE, Frame, contact_sheet, png_bytes, render_seeds,
+                           sheet_path, tile)
+from strand.settlement import Settlement
+
+G = 3.75
+
+
+def index(b_type):
+    return 3 + BLOCK_TYPES.index(b_type)
+
+
+def layout():
+    s = Settlement(G)
+    hub = s.add(Block(0, 0, 4, 4, 'gather', 0))
+    s.add(Block(4, 0, 3, 3, 'living', 0, 1, hub))
+    s.add(Block(0, 4, 4, 2, 'prod', 0, 2, hub))
+    s.add(Block(4, 4, 2, 2, 'cistern', 0, 1, hub))
+    return s
+
+
+def decode_png(data):
+    """(width, height, palette, rows of palette indices) of an 8-bit indexed PNG."""
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    k = 8; chunks = []
+    while k < len(data):
+        n, = struct.unpack('>I', data[k:k + 4]); kind = data[k + 4:k + 8]; body = data[k + 8:k + 8 + n]
+        crc, = struct.unpack('>I', data[k + 8 + n:k + 12 + n])
+        assert crc == zlib.crc32(kind + body) & 0xFFFFFFFF
+        chunks.append((kind, body)); k += 12 + n
+    assert [c[0] for c in chunks] == [b'IHDR', b'PLTE', b'IDAT', b'IEND']
+    w, h, depth, colour, comp, filt, interlace = struct.unpack('>IIBBBBB', chunks[0][1])
+    assert (depth, colour, comp, filt, interlace) == (8, 3, 0, 0, 0)
+    plte = chunks[1][1]
+    palette = [tuple(bytearray(plte[i:i + 3])) for i in range(0, len(plte), 3)]
+    raw = bytearray(zlib.decompress(chunks[2][1]))
+    assert len(raw) == h * (w + 1)
+    rows = []
+    for j in range(h):
+        line = raw[j * (w + 1):(j + 1) * (w + 1)]
+        assert line[0] == 0   # No filter
+        rows.append(list(line[1:]))
+    return w, h, palette, rows
+
+
+def test_tile_palette_indices():
+    w, h, pix = tile(layout())
+    assert (w, h) == (7, 6)
+    # Image rows run from the top: row 0 is grid y = 5
+    def at(x, y): return pix[(h - 1 - y) * w + x]
+    assert at(0, 0) == at(3, 3) == index('gather')
+    assert at(4, 0) == at(6, 2) == index('living')
+    assert at(0, 4) == at(3, 5) == index('prod')
+    assert at(4, 4) == at(5, 5) == index('cistern')
+    assert at(6, 3) == at(6, 5) == GROUND
+
+
+def test_frame_marks_outside_cells():
+    site = strand.Boundary([(0, 0), (30, 0), (0, 30)])   # 8 x 8 cells, half outside
+    frame = Frame(site, G)
+    w, h, pix = tile(layout(), frame)
+    assert (w, h) == (frame.w, frame.h) == (8, 8)
+    def at(x, y): return pix[(h - 1 - y) * w + x]
+    assert at(7, 7) == at(7, 1) == OUTSIDE
+    assert at(0, 6) == GROUND
+    assert at(0, 0) == index('gather') and at(5, 1) == index('living')
+    # Blocks are drawn over the mask, inside or not
+    assert at(5, 5) == index('cistern')
+
+
+def test_png_header_size_and_pixels():
+    w, h, pix = tile(layout())
+    pw, ph, palette, rows = decode_png(png_bytes(w, h, pix, scale=3))
+    assert (pw, ph) == (w * 3, h * 3)
+    assert palette == [tuple(c) for c in PALETTE]
+    for j in range(ph):
+        assert rows[j] == [pix[(j // 3) * w + i // 3] for i in range(pw)]
+
+
+def test_contact_sheet_layout():
+    a = (2, 1, bytearray([3, 4])); b = (1, 2, bytearray([5, 6])); c = (1, 1, bytearray([7]))
+    w, h, pix = contact_sheet([a, b, c], gap=1)
+    # Two columns of 2 x 2 cells, one gap cell around and between
+    assert (w, h) == (2 * 2 + 3, 2 * 2 + 3)
+    def at(x, y): return pix[y * w + x]
+    assert (at(1, 1), at(2, 1)) == (3, 4) and at(1, 2) == GAP
+    assert (at(4, 1), at(4, 2)) == (5, 6)
+    assert at(1, 4) == 7 and at(0, 0) == GAP
+
+
+def test_sheet_path_splitting():
+    assert sheet_path('sheet_%d.png', 3, 5) == 'sheet_3.png'
+    assert sheet_path('sheet_%d.png', 0, 1) == 'sheet_0.png'
+    assert sheet_path('sheet.png', 0, 1) == 'sheet.png'
+    assert sheet_path('sheet.png', 2, 3) == 'sheet_2.png'
+    assert sheet_path('runs/100%/sheet.png', 1, 2) == 'runs/100%/sheet_1.png'
+    assert sheet_path('runs.v2/sheet', 1, 2) == 'runs.v2/sheet_1'
+
+
+def test_render_seeds_writes_one_png_per_sheet(tmp_path):
+    site = strand.Boundary([(0, 0), (120, 0), (120, 90), (0, 90)])
+    target = str(tmp_path / 'sheet.png')
+    paths = render_seeds(site, preset('cisterns'), range(3), target, cols=2, scale=1, gap=1, per_sheet=2)
+    assert paths == [str(tmp_path / 'sheet_0.png'), str(tmp_path / 'sheet_1.png')]
+    frame = Frame(site, G)
+    for p in paths:
+        with open(p, 'rb') as f: w, h, palette, rows = decode_png(f.read())
+        assert (w, h) == (2 * frame.w + 3, frame.h + 2)
+    assert not os.path.exists(target)
@@ -0,0 +1,56 @@
+import pytest
+
+import strand
+import strand.search as search_module
+from strand.search import Search, dimensions
+
+SITE = strand.Boundary([(0, 0), (120, 0), (120, 90), (0, 90)])
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    calls = []
+    real = search_module.evaluate
+
+    def evaluate(task):
+        calls.append(task[2])
+        return real(task)
+    monkeypatch.setattr(search_module, 'evaluate', evaluate)
+    return calls
+
+
+@pytest.mark.parametrize('method, restarts', [('cma', 1), ('evolution', 2), ('random', 1)])
+def test_budget_caps_growth_runs(counted, method, restarts):
+    with Search(SITE, 'cisterns', seed=3) as s:
+        best = s.run(budget=7, method=method, restarts=restarts, population=4)
+        assert len(counted) == s.grown <= 7
+        assert s.grown + s.hits <= 7
+        assert best is not None and best['score'] > float('-inf')
+
+
+def test_repeated_config_and_seed_come_from_the_memo(counted):
+    with Search(SITE, 'cisterns', seeds=1) as s:
+        x = [0.33] * dimensions(s.base)
+        first = s.evaluate([x])[0]
+        again = s.evaluate([x, list(x)])
+        assert len(counted) == s.grown == 1 and s.hits == 2
+        assert again[0] is first and again[1] is first
+        # A point that decodes to the same config counts as the same candidate
+        s.evaluate([[v + 1e-9 for v in x]])
+        assert s.grown == 1 and s.hits == 3
+        assert len(s.seeds) == 1 and first['seed'] == s.seeds[0]
+
+
+def test_aborted_runs_score_minus_inf_and_never_win(monkeypatch):
+    outcomes = iter([(0.4, False), (0.9, True), (0.5, False)])
+
+    def evaluate(task):
+        fill, aborted = next(outcomes)
+        return {'fill': fill, 'connectivity': 1.0, 'living_distance': 0.0}, [], aborted
+    monkeypatch.setattr(search_module, 'evaluate', evaluate)
+    with Search(SITE, 'cisterns', seeds=1) as s:
+        d = dimensions(s.base)
+        first, aborted, third = [s.evaluate([[v] * d])[0] for v in (0.1, 0.5, 0.9)]
+        assert aborted['aborted'] and aborted['score'] == float('-inf')
+        assert s.best is third and third['score'] > first['score']
+        assert aborted not in (s.best, first, third)
@@ -0,0 +1,75 @@
+import strand
+from strand.growth import Growth
+from strand.blocks import Block
+from strand.presets import preset
+
+# The bbox centre sits in the void of RING and outside the outline of U
+RING = strand.Boundary([(0, 0), (240, 0), (240, 180), (0, 180)], [[(90, 60), (150, 60), (150, 120), (90, 120)]])
+U = strand.Boundary([(0, 0), (240, 0), (240, 180), (170, 180), (170, 50), (70, 50), (70, 180), (0, 180)])
+
+
+def overlaps(a, b):
+    return a.gx < b.gx + b.gw and b.gx < a.gx + a.gw and a.gy < b.gy + b.gh and b.gy < a.gy + a.gh
+
+
+def valid(engine):
+    blocks = engine.settlement.blocks
+    assert all(engine.within(b) for b in blocks)
+    assert not any(overlaps(a, b) for i, a in enumerate(blocks) for b in blocks[i + 1:])
+
+
+def grown(site, cfg, seed):
+    g = Growth(site, None, cfg, seed)
+    g.run(target_area=site.area * g.cfg.DENSITY_LIMIT)
+    return g
+
+
+def test_centre_in_a_void_falls_back_to_the_deepest_cell():
+    cfg = preset('favourite')
+    g = Growth(RING, None, cfg, 1)
+    cx, cy = RING.center()
+    centre = Block(int(cx / cfg.GRID_UNIT), int(cy / cfg.GRID_UNIT), 3, 3, 'prod', 0)
+    assert g.collides(centre)
+
+    g = grown(RING, cfg, 1)
+    seed = g.settlement.blocks[0]
+    assert seed.parent is None and g.inside(seed)
+    assert len(g.settlement.blocks) > 20
+    valid(g)
+
+
+def test_centre_outside_the_outline_still_grows():
+    assert not U.contains(*U.center())
+    for name in ('favourite', 'cisterns_tunnels', 'tunnel_chain'):
+        g = grown(U, preset(name), 1)
+        assert len(g.settlement.blocks) > 20, name
+        valid(g)
+
+
+def test_deepest_seed_point():
+    g = grown(RING, preset('favourite', SEED_POINT='deepest'), 2)
+    seed = g.settlement.blocks[0]
+    gx, gy = g.seed_cells(1)[0]
+    assert (seed.gx + seed.gw // 2, seed.gy + seed.gh // 2) == (gx, gy)
+
+
+def test_seed_count_spreads_several_seeds():
+    g = grown(RING, preset('favourite', SEED_COUNT=3), 1)
+    seeds = [b for b in g.settlement.blocks if b.parent is None]
+    assert len(seeds) == 3
+    assert len(set(b.cluster_id for b in seeds)) == 3
+    for i, a in enumerate(seeds):
+        for b in seeds[i + 1:]:
+            assert (a.gx - b.gx) ** 2 + (a.gy - b.gy) ** 2 >= 10 ** 2
+    valid(g)
+
+
+def test_interior_bias_grows_valid_layouts():
+    for name in ('favourite', 'cisterns'):
+        cfg = preset(name, INTERIOR_BIAS=True)
+        g = grown(U, cfg, 3)
+        assert len(g.settlement.blocks) > 20, name
+        valid(g)
+        again = grown(U, cfg, 3)
+        assert [(b.gx, b.gy, b.gw, b.gh, b.type) for b in again.settlement.blocks] == \
+               [(b.gx, b.gy, b.gw, b.gh, b.type) for b in g.settlement.blocks]
@@ -0,0 +1,53 @@
+from strand.blocks import Block
+from strand.settlement import Settlement
+from strand.thermal import COMFORT, ROOM_TYPES, SURFACE_AMPLITUDE, SURFACE_MEAN, thermal, thermal_batch
+
+G = 3.75
+
+
+def layout():
+    s = Settlement(G)
+    hub = s.add(Block(0, 0, 4, 4, 'gather', 0))
+    s.add(Block(4, 0, 3, 3, 'living', 0, 1, hub))
+    s.add(Block(0, 4, 4, 2, 'prod', 0, 2, hub))
+    s.add(Block(4, 4, 2, 2, 'cistern', 0, 1, hub))
+    return s
+
+
+def test_rooms_stay_between_deep_ground_and_surface():
+    t = thermal(layout())
+    stats = t.room_stats()
+    # Only room types get air nodes; the cistern does not
+    assert sorted(stats) == sorted(b.index for b in t.rooms)
+    assert [b.type for b in t.rooms] == ['gather', 'living', 'prod']
+    assert all(b.type in ROOM_TYPES for b in t.rooms)
+    for lo, mean, hi in stats.values():
+        assert SURFACE_MEAN - SURFACE_AMPLITUDE < lo <= mean <= hi < SURFACE_MEAN + SURFACE_AMPLITUDE
+    assert all(len(temps) == 24 for temps in t.history)
+
+
+def test_runs_are_deterministic():
+    assert thermal(layout()).summary() == thermal(layout()).summary()
+    assert list(thermal_batch(iter([layout(), layout()]))) == [thermal(layout()).summary()] * 2
+
+
+def test_summary_is_consistent():
+    m = thermal(layout()).summary()
+    assert m['room_min_c'] <= m['room_mean_c'] <= m['room_max_c']
+    assert 0.0 <= m['living_comfort_fraction'] <= 1.0
+    assert m['overheat_degree_hours'] >= 0.0
+    if m['room_max_c'] <= COMFORT[1]: assert m['overheat_degree_hours'] == 0.0
+
+
+def test_higher_gains_run_warmer():
+    # Two rooms far enough apart not to share any soil
+    s = Settlement(G)
+    prod = s.add(Block(0, 0, 4, 4, 'prod', 0))
+    living = s.add(Block(40, 0, 4, 4, 'living', 1))
+    stats = thermal(s).room_stats()
+    assert stats[prod.index][1] > stats[living.index][1]
+
+
+def test_empty_layout():
+    m = thermal(Settlement(G)).summary()
+    assert m['room_mean_c'] == 0.0 and m['living_comfort_fraction'] == 0.0
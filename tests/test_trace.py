@@ -0,0 +1,58 @@
+from collections import Counter
+
+import strand
+from strand.layout import settlement_to_dict, settlement_from_dict
+from strand.presets import preset
+from strand.trace import read_trace, iter_events, replay
+
+SITE = strand.Boundary([(0, 0), (300, 0), (300, 220), (0, 220)], [[(120, 80), (160, 80), (160, 120), (120, 120)]])
+
+
+def signature(s):
+    return [(b.gx, b.gy, b.gw, b.gh, b.type, b.cluster_id, b.attach_side,
+             b.parent.index if b.parent is not None else -1) for b in s.blocks]
+
+
+def test_replay_equals_engine(tmp_path):
+    for name in ('favourite', 'favourite2', 'tunnel_chain', 'cisterns_tunnels'):
+        path = str(tmp_path / (name + '.trace'))
+        town = strand.grow(SITE, preset(name), seed=3, trace=path)
+        again = replay(path)
+        assert signature(again) == signature(town), name
+        assert [t.index for t in again.tunnel_tips] == [t.index for t in town.tunnel_tips]
+        assert again.next_cluster_id == town.next_cluster_id
+
+
+def test_replay_of_extend_needs_its_base(tmp_path):
+    base = strand.grow(SITE, preset('tunnel_chain'), seed=1)
+    before = signature(base)
+    path = str(tmp_path / 'extend.trace')
+    grown = settlement_from_dict(settlement_to_dict(base))
+    strand.extend(grown, SITE, 2, preset('tunnel_chain'), seed=5, trace=path)
+    assert signature(replay(path, base=base)) == signature(grown)
+    assert signature(base) == before
+
+
+def test_rejections_carry_parent_anchor_and_reason(tmp_path):
+    path = str(tmp_path / 'fav.trace')
+    strand.grow(SITE, preset('favourite'), seed=3, trace=path)
+    _, events = read_trace(path)
+    events = list(iter_events(events))
+    rejects = [e for e in events if e['kind'] == 'reject']
+    reasons = Counter(e['reason'] for e in rejects)
+    assert set(reasons) <= {'outside', 'overlap', 'gap', 'pruned', 'no_cistern'}
+    assert reasons['overlap'] and reasons['gap'] and reasons['outside']
+    assert all(e['parent'] >= 0 and e['gw'] > 0 and e['gh'] > 0 for e in rejects)
+    # A miss only sums its attempt up; the detail is in the rejections
+    assert all(e['reason'] in ('no_parent', 'no_room', 'blocked') for e in events if e['kind'] == 'miss')
+
+
+def test_replay_stops_after_until_events(tmp_path):
+    path = str(tmp_path / 'partial.trace')
+    town = strand.grow(SITE, preset('favourite2'), seed=2, trace=path)
+    _, events = read_trace(path)
+    places = 0
+    for k, e in enumerate(iter_events(events)):
+        if e['kind'] == 'place': places += 1
+        if places == 10: break
+    assert signature(replay(path, until=k + 1)) == signature(town)[:10]